@@ -13,6 +13,11 @@ bode_deg = True                 # Bode Plot phase units
 bode_Hz = False                 # Bode plot frequency units
 bode_number_of_samples = None   # Bode plot number of samples
 bode_feature_periphery_decade = 1.0  # Bode plot feature periphery in decades
+bode_adaptive_sampling = False  # Refine default frequency grids adaptively
+
+# Frequency response defaults
+freqresp_cache_size = 0         # Max number of memoised responses (0 = off)
+freqresp_workers = 1            # Threads for state space freqresp (-1 = all)
 
 # Set defaults to match MATLAB
 def use_matlab_defaults():
@@ -48,15 +48,18 @@ import math
 __all__ = ['unwrap', 'issys', 'db2mag', 'mag2db']
 
 # Utility function to unwrap an angle measurement
-def unwrap(angle, period=2*math.pi):
+def unwrap(angle, period=2*math.pi, axis=-1):
     """Unwrap a phase angle to give a continuous curve
 
     Parameters
     ----------
     angle : array_like
-        Array of angles to be unwrapped
+        Array of angles to be unwrapped.  Multi-dimensional arrays (for
+        instance outputs x inputs x frequencies) are unwrapped along `axis`.
     period : float, optional
         Period (defaults to `2*pi`)
+    axis : int, optional
+        Axis along which to unwrap (defaults to the last axis)
 
     Returns
     -------
@@ -68,13 +71,18 @@ def unwrap(angle, period=2*math.pi):
     >>> import numpy as np
     >>> theta = [5.74, 5.97, 6.19, 0.13, 0.35, 0.57]
     >>> unwrap(theta, period=2 * np.pi)
-    [5.74, 5.97, 6.19, 6.413185307179586, 6.633185307179586, 6.8531853071795865]
+    array([5.74      , 5.97      , 6.19      , 6.41318531, 6.63318531, 6.85318531])
 
     """
-    dangle = np.diff(angle)
+    angle = np.array(angle, dtype=float)
+    dangle = np.diff(angle, axis=axis)
     dangle_desired = (dangle + period/2.) % period - period/2.
-    correction = np.cumsum(dangle_desired - dangle)
-    angle[1:] += correction
+    correction = np.cumsum(dangle_desired - dangle, axis=axis)
+
+    # correct all but the first element along the unwrapping axis
+    tail = [slice(None)] * angle.ndim
+    tail[axis] = slice(1, None)
+    angle[tuple(tail)] += correction
     return angle
 
 def issys(obj):
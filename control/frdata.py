@@ -51,9 +51,10 @@ $Id: frd.py 185 2012-08-30 05:44:32Z murrayrm $
 # External function declarations
 import numpy as np
 from numpy import angle, array, empty, ones, \
-    real, imag, matrix, absolute, eye, linalg, where, dot
+    real, imag, absolute, eye, linalg, where
 from scipy.interpolate import splprep, splev
-from .lti import LTI
+from warnings import warn
+from .lti import LTI, _hash_data
 
 __all__ = ['FRD', 'frd']
 
@@ -97,7 +98,10 @@ class FRD(LTI):
         FRD object.
 
         To construct frequency response data for an existing LTI
-        object, other than an FRD, call FRD(sys, omega)
+        object, other than an FRD, call FRD(sys, omega).  If omega is
+        left out, FRD(sys), the frequency points are chosen adaptively
+        (see :func:`default_frequency_range`), so that resonances of sys
+        are resolved with a small number of points.
 
         """
         smooth = kwargs.get('smooth', False)
@@ -109,14 +113,9 @@ class FRD(LTI):
                 otherlti = args[0]
                 self.omega = array(args[1], dtype=float)
                 self.omega.sort()
-                numfreq = len(self.omega)
 
                 # calculate frequency response at my points
-                self.fresp = empty(
-                    (otherlti.outputs, otherlti.inputs, numfreq),
-                    dtype=complex)
-                for k, w in enumerate(self.omega):
-                    self.fresp[:, :, k] = otherlti._evalfr(w)
+                self.fresp = _lti_fresp(otherlti, self.omega)
 
             else:
                 # The user provided a response and a freq vector
@@ -132,12 +131,20 @@ class FRD(LTI):
                         " response data array and a matching frequency vector"
                         " size")
 
+        elif len(args) == 1 and isinstance(args[0], LTI) and \
+                not isinstance(args[0], FRD):
+            # Sample another system on an adaptively refined grid
+            from .freqplot import default_frequency_range
+            self.omega = default_frequency_range(args[0], adaptive=True)
+            self.fresp = _lti_fresp(args[0], self.omega)
+
         elif len(args) == 1:
             # Use the copy constructor.
             if not isinstance(args[0], FRD):
                 raise TypeError(
                     "The one-argument constructor can only take in"
-                    " an FRD object.  Received %s." % type(args[0]))
+                    " an FRD or other LTI object.  Received %s." %
+                    type(args[0]))
             self.omega = args[0].omega
             self.fresp = args[0].fresp
         else:
@@ -236,12 +243,7 @@ second has %i." % (self.outputs, other.outputs))
                 " G1 has %i input(s), G2 has %i output(s)." %
                 (self.inputs, other.outputs))
 
-        inputs = other.inputs
-        outputs = self.outputs
-        fresp = empty((outputs, inputs, len(self.omega)),
-                      dtype=self.fresp.dtype)
-        for i in range(len(self.omega)):
-            fresp[:,:,i] = dot(self.fresp[:,:,i], other.fresp[:,:,i])
+        fresp = _fresp_matmul(self.fresp, other.fresp)
         return FRD(fresp, self.omega,
                    smooth=(self.ifunc is not None) and
                           (other.ifunc is not None))
@@ -262,13 +264,7 @@ second has %i." % (self.outputs, other.outputs))
                 " G1 has %i input(s), G2 has %i output(s)." %
                 (other.inputs, self.outputs))
 
-        inputs = self.inputs
-        outputs = other.outputs
-
-        fresp = empty((outputs, inputs, len(self.omega)),
-                      dtype=self.fresp.dtype)
-        for i in range(len(self.omega)):
-            fresp[:,:,i] = dot(other.fresp[:,:,i], self.fresp[:,:,i])
+        fresp = _fresp_matmul(other.fresp, self.fresp)
         return FRD(fresp, self.omega,
                    smooth=(self.ifunc is not None) and
                           (other.ifunc is not None))
@@ -323,11 +319,21 @@ second has %i." % (self.outputs, other.outputs))
         if other == 0:
             return FRD(ones(self.fresp.shape),self.omega,
                        smooth=(self.ifunc is not None)) #unity
+        if other == 1:
+            return self
         if other > 0:
             return self * (self**(other-1))
         if other < 0:
-            return (FRD(ones(self.fresp.shape), self.omega) / self) * \
-                (self**(other+1))
+            return self._inv() ** (-other)
+
+    def _inv(self):
+        """Inverse of a square FRD, computed at all frequencies at once."""
+        if self.inputs != self.outputs:
+            raise ValueError("FRD inverse requires a square system;"
+                             " got %i output(s) and %i input(s)." %
+                             (self.outputs, self.inputs))
+        fresp = _fresp_from_batch(linalg.inv(_fresp_to_batch(self.fresp)))
+        return FRD(fresp, self.omega, smooth=(self.ifunc is not None))
 
     def evalfr(self, omega):
         """Evaluate a transfer function at a single angular frequency.
@@ -364,33 +370,37 @@ second has %i." % (self.outputs, other.outputs))
 
     # Internal function to evaluate the frequency responses
     def _evalfr(self, omega):
-        """Evaluate a transfer function at a single angular frequency."""
-        # Preallocate the output.
+        """Evaluate a transfer function at a single angular frequency.
+
+        If omega is an iterable, the response is evaluated at all points
+        at once and returned as an outputs x inputs x len(omega) array.
+        """
         if getattr(omega, '__iter__', False):
-            out = empty((self.outputs, self.inputs, len(omega)), dtype=complex)
-        else:
-            out = empty((self.outputs, self.inputs), dtype=complex)
+            return self._evalfr_grid(array(omega, dtype=float))
+
+        return self._evalfr_grid(array([omega], dtype=float))[:, :, 0]
 
+    def _evalfr_grid(self, omega):
+        """Evaluate the response on a 1-d array of frequencies."""
         if self.ifunc is None:
-            try:
-                out = self.fresp[:, :, where(self.omega == omega)[0][0]]
-            except:
+            # look up all points in the stored frequency vector at once
+            idx = np.searchsorted(self.omega, omega)
+            idx[idx == len(self.omega)] = len(self.omega) - 1
+            missing = where(self.omega[idx] != omega)[0]
+            if len(missing):
                 raise ValueError(
                     "Frequency %f not in frequency list, try an interpolating"
-                    " FRD if you want additional points" % omega)
-        else:
-            if getattr(omega, '__iter__', False):
-                for i in range(self.outputs):
-                    for j in range(self.inputs):
-                        for k,w in enumerate(omega):
-                            frraw = splev(w, self.ifunc[i,j], der=0)
-                            out[i,j,k] = frraw[0] + 1.0j*frraw[1]
-            else:
-                for i in range(self.outputs):
-                    for j in range(self.inputs):
-                        frraw = splev(omega, self.ifunc[i,j], der=0)
-                        out[i,j] = frraw[0] + 1.0j*frraw[1]
-
+                    " FRD if you want additional points" % omega[missing[0]])
+            return self.fresp[:, :, idx]
+
+        # splev evaluates a whole vector of points per spline
+        out = empty((self.outputs, self.inputs, len(omega)), dtype=complex)
+        if not len(omega):
+            return out
+        for i in range(self.outputs):
+            for j in range(self.inputs):
+                frraw = splev(omega, self.ifunc[i, j], der=0)
+                out[i, j, :] = frraw[0] + 1.0j*frraw[1]
         return out
 
     # Method for generating the frequency response of the system
@@ -405,19 +415,16 @@ second has %i." % (self.outputs, other.outputs))
 
         """
 
-        # Preallocate outputs.
-        numfreq = len(omega)
-        mag = empty((self.outputs, self.inputs, numfreq))
-        phase = empty((self.outputs, self.inputs, numfreq))
-
+        omega = np.asarray(omega, dtype=float)
         omega.sort()
 
-        for k, w in enumerate(omega):
-            fresp = self._evalfr(w)
-            mag[:, :, k] = abs(fresp)
-            phase[:, :, k] = angle(fresp)
+        fresp = self._evalfr_grid(omega)
+        return abs(fresp), angle(fresp), omega
 
-        return mag, phase, omega
+    def _fingerprint(self):
+        """Digest of the frequency points and response data"""
+        return _hash_data('FRD(smooth=%r)' % (self.ifunc is not None),
+                          self.dt, (self.omega, self.fresp))
 
     def feedback(self, other=1, sign=-1):
         """Feedback interconnection between two FRD objects."""
@@ -428,20 +435,38 @@ second has %i." % (self.outputs, other.outputs))
             self.inputs != other.outputs):
             raise ValueError(
                 "FRD.feedback, inputs/outputs mismatch")
-        fresp = empty((self.outputs, self.inputs, len(other.omega)),
-                      dtype=complex)
-        # TODO: vectorize this
         # TODO: handle omega re-mapping
-        for k, w in enumerate(other.omega):
-            fresp[:, :, k] = self.fresp[:, :, k].view(type=matrix)* \
-                linalg.solve(
-                eye(self.inputs) +
-                other.fresp[:, :, k].view(type=matrix) *
-                self.fresp[:, :, k].view(type=matrix),
-                eye(self.inputs))
+        # H = G (I - sign K G)^-1, solved for all frequencies in one
+        # batched call as (I - sign K G)^T H^T = G^T
+        G = _fresp_to_batch(self.fresp)
+        K = _fresp_to_batch(other.fresp)
+        F = eye(self.inputs) - sign * np.matmul(K, G)
+        H = linalg.solve(F.transpose(0, 2, 1), G.transpose(0, 2, 1))
+        fresp = _fresp_from_batch(H.transpose(0, 2, 1))
 
         return FRD(fresp, other.omega, smooth=(self.ifunc is not None))
 
+# The fresp array is stored outputs x inputs x frequency, which is the
+# convenient layout for per-channel access.  Batched linear algebra in
+# numpy works over leading dimensions, so the helpers below move the
+# frequency axis to the front (a strided view, no copy) and back.
+def _fresp_to_batch(fresp):
+    """Frequency-major view (freq x outputs x inputs) of a response array."""
+    return np.moveaxis(fresp, -1, 0)
+
+def _fresp_from_batch(batch):
+    """Convert a frequency-major array back to the fresp layout."""
+    return np.ascontiguousarray(np.moveaxis(batch, 0, -1))
+
+def _fresp_matmul(fresp1, fresp2):
+    """Matrix product fresp1 * fresp2 at every frequency point."""
+    return np.einsum('ijk,jlk->ilk', fresp1, fresp2)
+
+def _lti_fresp(sys, omega):
+    """Complex response of an LTI system on a sorted frequency array."""
+    mag, phase, omega = sys.freqresp(omega)
+    return mag * np.exp(1j * phase)
+
 def _convertToFRD(sys, omega, inputs=1, outputs=1):
     """Convert a system to frequency response data form (if needed).
 
@@ -471,9 +496,7 @@ def _convertToFRD(sys, omega, inputs=1, outputs=1):
 
     elif isinstance(sys, LTI):
         omega.sort()
-        fresp = empty((sys.outputs, sys.inputs, len(omega)), dtype=complex)
-        for k, w in enumerate(omega):
-            fresp[:, :, k] = sys._evalfr(w)
+        fresp = _lti_fresp(sys, omega)
 
         return FRD(fresp, omega, smooth=True)
 
@@ -45,12 +45,19 @@ import matplotlib.pyplot as plt
 import scipy as sp
 import numpy as np
 import math
+from collections import namedtuple
 from .ctrlutil import unwrap
 from .bdalg import feedback
+from .lti import freqresp, _freqresp_cache, _cache_key
 from .margins import stability_margins
 
 __all__ = ['bode_plot', 'nyquist_plot', 'gangof4_plot',
-           'bode', 'nyquist', 'gangof4']
+           'bode', 'nyquist', 'gangof4',
+           'bode_response', 'nyquist_response', 'gangof4_response',
+           'BodeResponse', 'NyquistResponse', 'GangOf4Response',
+           'bode_render', 'nyquist_render',
+           'singular_values_response', 'singular_values_plot',
+           'SingularValuesResponse', 'sigma']
 
 #
 # Main plotting functions
@@ -131,261 +138,92 @@ def bode_plot(syslist, omega=None, dB=None, Hz=None, deg=None,
     if not getattr(syslist, '__iter__', False):
         syslist = (syslist,)
 
-    if omega is None:
-        if omega_limits is None:
-            # Select a default range if none is provided
-            omega = default_frequency_range(syslist, Hz=Hz, number_of_samples=omega_num)
-        else:
-            omega_limits = np.array(omega_limits)
+    responses = bode_response(syslist, omega, Hz=Hz,
+                              omega_limits=omega_limits, omega_num=omega_num)
+
+    mags, phases, omegas, nyquistfrqs = [], [], [], []
+    for sys, (mag, phase, omega_sys, nyquistfrq) in zip(syslist, responses):
+        mags.append(mag)
+        phases.append(phase)
+        omegas.append(omega_sys)
+        nyquistfrqs.append(nyquistfrq)
+        # Get the dimensions of the current axis, which we will divide up
+        # TODO: Not current implemented; just use subplot for now
+
+        if Plot:
+            nyquistfrq_plot = None
             if Hz:
-                omega_limits *= 2. * math.pi
-            if omega_num:
-                omega = sp.logspace(np.log10(omega_limits[0]), 
-                                    np.log10(omega_limits[1]), 
-                                    num=omega_num, 
-                                    endpoint=True)
+                omega_plot = omega_sys / (2. * math.pi)
+                if nyquistfrq:
+                    nyquistfrq_plot = nyquistfrq / (2. * math.pi)
             else:
-                omega = sp.logspace(np.log10(omega_limits[0]), 
-                                    np.log10(omega_limits[1]), 
-                                    endpoint=True)
+                omega_plot = omega_sys
+                if nyquistfrq:
+                    nyquistfrq_plot = nyquistfrq
+
+            # Set up the axes with labels so that multiple calls to
+            # bode_plot will superimpose the data.  This was implicit
+            # before matplotlib 2.1, but changed after that (See
+            # https://github.com/matplotlib/matplotlib/issues/9024).
+            # The code below should work on all cases.
+
+            # Get the current figure
+
+            if 'sisotool' in kwargs:
+                fig = kwargs['fig']
+                ax_mag = fig.axes[0]
+                ax_phase = fig.axes[2]
+                sisotool = kwargs['sisotool']
+                del kwargs['fig']
+                del kwargs['sisotool']
+            else:
+                fig = plt.gcf()
+                ax_mag, ax_phase = _bode_axes(fig)
+                sisotool = False
+
+            # Magnitude plot
+            if dB:
+                pltline = ax_mag.semilogx(omega_plot, 20 * np.log10(mag),
+                                          *args, **kwargs)
+            else:
+                pltline = ax_mag.loglog(omega_plot, mag, *args, **kwargs)
 
-    mags, phases, omegas, nyquistfrqs = [], [], [], []
-    for sys in syslist:
-        if sys.inputs > 1 or sys.outputs > 1:
-            # TODO: Add MIMO bode plots.
-            raise NotImplementedError("Bode is currently only implemented for SISO systems.")
-        else:
-            omega_sys = np.array(omega)
-            if sys.isdtime(True):
-                nyquistfrq = 2. * math.pi * 1. / sys.dt / 2.
-                omega_sys = omega_sys[omega_sys < nyquistfrq]
-                # TODO: What distance to the Nyquist frequency is appropriate?
+            if nyquistfrq_plot:
+                ax_mag.axvline(nyquistfrq_plot,
+                               color=pltline[0].get_color())
+
+            # Add a grid to the plot + labeling
+            ax_mag.grid(False if margins else True, which='both')
+            ax_mag.set_ylabel("Magnitude (dB)" if dB else "Magnitude")
+
+            # Phase plot
+            if deg:
+                phase_plot = phase * 180. / math.pi
             else:
-                nyquistfrq = None
-            # Get the magnitude and phase of the system
-            mag_tmp, phase_tmp, omega_sys = sys.freqresp(omega_sys)
-            mag = np.atleast_1d(np.squeeze(mag_tmp))
-            phase = np.atleast_1d(np.squeeze(phase_tmp))
-            phase = unwrap(phase)
-
-            mags.append(mag)
-            phases.append(phase)
-            omegas.append(omega_sys)
-            nyquistfrqs.append(nyquistfrq)
-            # Get the dimensions of the current axis, which we will divide up
-            # TODO: Not current implemented; just use subplot for now
-
-            if Plot:
-                nyquistfrq_plot = None
-                if Hz:
-                    omega_plot = omega_sys / (2. * math.pi)
-                    if nyquistfrq:
-                        nyquistfrq_plot = nyquistfrq / (2. * math.pi)
-                else:
-                    omega_plot = omega_sys
-                    if nyquistfrq:
-                        nyquistfrq_plot = nyquistfrq
-
-                # Set up the axes with labels so that multiple calls to
-                # bode_plot will superimpose the data.  This was implicit
-                # before matplotlib 2.1, but changed after that (See
-                # https://github.com/matplotlib/matplotlib/issues/9024).
-                # The code below should work on all cases.
-
-                # Get the current figure
-
-                if 'sisotool' in kwargs:
-                    fig = kwargs['fig']
-                    ax_mag = fig.axes[0]
-                    ax_phase = fig.axes[2]
-                    sisotool = kwargs['sisotool']
-                    del kwargs['fig']
-                    del kwargs['sisotool']
-                else:
-                    fig = plt.gcf()
-                    ax_mag = None
-                    ax_phase = None
-                    sisotool = False
-
-                    # Get the current axes if they already exist
-                    for ax in fig.axes:
-                        if ax.get_label() == 'control-bode-magnitude':
-                            ax_mag = ax
-                        elif ax.get_label() == 'control-bode-phase':
-                            ax_phase = ax
-
-                    # If no axes present, create them from scratch
-                    if ax_mag is None or ax_phase is None:
-                        plt.clf()
-                        ax_mag = plt.subplot(211,
-                                             label='control-bode-magnitude')
-                        ax_phase = plt.subplot(212,
-                                               label='control-bode-phase',
-                                               sharex=ax_mag)
-
-                # Magnitude plot
-                if dB:
-                    pltline = ax_mag.semilogx(omega_plot, 20 * np.log10(mag),
-                                              *args, **kwargs)
-                else:
-                    pltline = ax_mag.loglog(omega_plot, mag, *args, **kwargs)
+                phase_plot = phase
+            ax_phase.semilogx(omega_plot, phase_plot, *args, **kwargs)
 
-                if nyquistfrq_plot:
-                    ax_mag.axvline(nyquistfrq_plot,
-                                   color=pltline[0].get_color())
+            # Show the phase and gain margins in the plot
+            if margins:
+                _bode_margins(ax_mag, ax_phase, stability_margins(sys),
+                              phases[0], omegas[0], dB, Hz, deg, sisotool)
 
-                # Add a grid to the plot + labeling
-                ax_mag.grid(False if margins else True, which='both')
-                ax_mag.set_ylabel("Magnitude (dB)" if dB else "Magnitude")
+            if nyquistfrq_plot:
+                ax_phase.axvline(nyquistfrq_plot, color=pltline[0].get_color())
 
-                # Phase plot
-                if deg:
-                    phase_plot = phase * 180. / math.pi
-                else:
-                    phase_plot = phase
-                ax_phase.semilogx(omega_plot, phase_plot, *args, **kwargs)
-
-                # Show the phase and gain margins in the plot
-                if margins:
-                    margin = stability_margins(sys)
-                    gm, pm, Wcg, Wcp = margin[0], margin[1], margin[3], margin[4]
-                    # TODO: add some documentation describing why this is here
-                    phase_at_cp = phases[0][(np.abs(omegas[0] - Wcp)).argmin()]
-                    if phase_at_cp >= 0.:
-                        phase_limit = 180.
-                    else:
-                        phase_limit = -180.
-
-                    if Hz:
-                        Wcg, Wcp = Wcg/(2*math.pi),Wcp/(2*math.pi)
-
-                    ax_mag.axhline(y=0 if dB else 1, color='k', linestyle=':',
-                                   zorder=-20)
-                    ax_phase.axhline(y=phase_limit if deg else math.radians(phase_limit), 
-                                     color='k', linestyle=':', zorder=-20)
-                    mag_ylim = ax_mag.get_ylim()
-                    phase_ylim = ax_phase.get_ylim()
-
-                    if pm != float('inf') and Wcp != float('nan'):
-                        if dB:
-                            ax_mag.semilogx([Wcp, Wcp], [0.,-1e5],
-                                            color='k', linestyle=':',
-                                            zorder=-20)
-                        else:
-                            ax_mag.loglog([Wcp,Wcp], [1.,1e-8],color='k',
-                                          linestyle=':', zorder=-20)
-
-                        if deg:
-                            ax_phase.semilogx([Wcp, Wcp],
-                                              [1e5, phase_limit+pm], 
-                                              color='k', linestyle=':',
-                                              zorder=-20)
-                            ax_phase.semilogx([Wcp, Wcp],
-                                              [phase_limit + pm, phase_limit], 
-                                              color='k', zorder=-20)
-                        else:
-                            ax_phase.semilogx([Wcp, Wcp],
-                                              [1e5, math.radians(phase_limit) +
-                                               math.radians(pm)],
-                                              color='k', linestyle=':',
-                                              zorder=-20)
-                            ax_phase.semilogx([Wcp, Wcp],
-                                              [math.radians(phase_limit) +
-                                               math.radians(pm),
-                                               math.radians(phase_limit)], 
-                                              color='k', zorder=-20)
-
-                    if gm != float('inf') and Wcg != float('nan'):
-                        if dB:
-                            ax_mag.semilogx([Wcg, Wcg],
-                                            [-20.*np.log10(gm), -1e5],
-                                            color='k', linestyle=':',
-                                            zorder=-20)
-                            ax_mag.semilogx([Wcg, Wcg], [0,-20*np.log10(gm)],
-                                            color='k', zorder=-20)
-                        else:
-                            ax_mag.loglog([Wcg, Wcg],
-                                          [1./gm,1e-8],color='k',
-                                          linestyle=':', zorder=-20)
-                            ax_mag.loglog([Wcg, Wcg],
-                                          [1.,1./gm],color='k', zorder=-20)
-
-                        if deg:
-                            ax_phase.semilogx([Wcg, Wcg], [1e-8, phase_limit],
-                                              color='k', linestyle=':',
-                                              zorder=-20)
-                        else:
-                            ax_phase.semilogx([Wcg, Wcg],
-                                              [1e-8, math.radians(phase_limit)],
-                                              color='k', linestyle=':',
-                                              zorder=-20)
-
-                    ax_mag.set_ylim(mag_ylim)
-                    ax_phase.set_ylim(phase_ylim)
-
-                    if sisotool:
-                        ax_mag.text(0.04, 0.06,
-                                    'G.M.: %.2f %s\nFreq: %.2f %s' % 
-                                    (20*np.log10(gm) if dB else gm,
-                                     'dB ' if dB else '',
-                                     Wcg, 'Hz' if Hz else 'rad/s'), 
-                                    horizontalalignment='left',
-                                    verticalalignment='bottom',
-                                    transform=ax_mag.transAxes,
-                                    fontsize=8 if int(matplotlib.__version__[0]) == 1 else 6)
-                        ax_phase.text(0.04, 0.06,
-                                      'P.M.: %.2f %s\nFreq: %.2f %s' %
-                                      (pm if deg else math.radians(pm),
-                                       'deg' if deg else 'rad',
-                                       Wcp, 'Hz' if Hz else 'rad/s'), 
-                                      horizontalalignment='left',
-                                      verticalalignment='bottom',
-                                      transform=ax_phase.transAxes,
-                                      fontsize=8 if int(matplotlib.__version__[0]) == 1 else 6)
-                    else:
-                        plt.suptitle('Gm = %.2f %s(at %.2f %s), Pm = %.2f %s (at %.2f %s)' % 
-                                     (20*np.log10(gm) if dB else gm, 
-                                      'dB ' if dB else '\b',
-                                      Wcg, 'Hz' if Hz else 'rad/s', 
-                                      pm if deg else math.radians(pm),
-                                      'deg' if deg else 'rad',
-                                      Wcp, 'Hz' if Hz else 'rad/s'))
-
-                if nyquistfrq_plot:
-                    ax_phase.axvline(nyquistfrq_plot, color=pltline[0].get_color())
-
-                # Add a grid to the plot + labeling
-                ax_phase.set_ylabel("Phase (deg)" if deg else "Phase (rad)")
-
-                def gen_zero_centered_series(val_min, val_max, period):
-                    v1 = np.ceil(val_min / period - 0.2)
-                    v2 = np.floor(val_max / period + 0.2)
-                    return np.arange(v1, v2 + 1) * period
-                if deg:
-                    ylim = ax_phase.get_ylim()
-                    ax_phase.set_yticks(gen_zero_centered_series(ylim[0],
-                                                                 ylim[1], 45.))
-                    ax_phase.set_yticks(gen_zero_centered_series(ylim[0],
-                                                                 ylim[1], 15.),
-                                        minor=True)
-                else:
-                    ylim = ax_phase.get_ylim()
-                    ax_phase.set_yticks(gen_zero_centered_series(ylim[0],
-                                                                 ylim[1],
-                                                                 math.pi / 4.))
-                    ax_phase.set_yticks(gen_zero_centered_series(ylim[0],
-                                                                 ylim[1],
-                                                                 math.pi / 12.),
-                                        minor=True)
-                ax_phase.grid(False if margins else True, which='both')
-                # ax_mag.grid(which='minor', alpha=0.3)
-                # ax_mag.grid(which='major', alpha=0.9)
-                # ax_phase.grid(which='minor', alpha=0.3)
-                # ax_phase.grid(which='major', alpha=0.9)
-
-                # Label the frequency axis
-                ax_phase.set_xlabel("Frequency (Hz)" if Hz
-                                    else "Frequency (rad/sec)")
+            # Add a grid to the plot + labeling
+            ax_phase.set_ylabel("Phase (deg)" if deg else "Phase (rad)")
+
+            _bode_phase_ticks(ax_phase, deg)
+            ax_phase.grid(False if margins else True, which='both')
+            # ax_mag.grid(which='minor', alpha=0.3)
+            # ax_mag.grid(which='major', alpha=0.9)
+            # ax_phase.grid(which='minor', alpha=0.3)
+            # ax_phase.grid(which='major', alpha=0.9)
+
+            # Label the frequency axis
+            ax_phase.set_xlabel("Frequency (Hz)" if Hz
+                                else "Frequency (rad/sec)")
 
     if len(syslist) == 1:
         return mags[0], phases[0], omegas[0]
@@ -393,6 +231,79 @@ def bode_plot(syslist, omega=None, dB=None, Hz=None, deg=None,
         return mags, phases, omegas
 
 
+class BodeResponse(namedtuple('BodeResponse',
+                              ['mag', 'phase', 'omega', 'nyquistfrq'])):
+    """Bode data for a SISO system: magnitude, unwrapped phase in radians,
+    frequencies in rad/sec and the Nyquist frequency in rad/sec (None for
+    continuous time systems)."""
+    __slots__ = ()
+
+
+def bode_response(syslist, omega=None, Hz=None, omega_limits=None,
+                  omega_num=None):
+    """Bode data for a list of systems, without any plotting
+
+    Computes the same frequency responses as :func:`bode_plot`, but does
+    not use matplotlib.  The results can be drawn in a single pass with
+    :func:`bode_render`.
+
+    Parameters
+    ----------
+    syslist : linsys
+        List of linear input/output systems (single system is OK)
+    omega : list
+        List of frequencies in rad/sec to be used for frequency response
+    Hz : boolean
+        If True, omega_limits are given in Hz
+    omega_limits: tuple, list, ... of two values
+        Limits of the to generate frequency vector.
+    omega_num: int
+        number of samples
+
+    Returns
+    -------
+    response : BodeResponse (list if syslist is a list)
+        Named tuple (mag, phase, omega, nyquistfrq) for each system
+
+    Examples
+    --------
+    >>> sys = ss("1. -2; 3. -4", "5.; 7", "6. 8", "9.")
+    >>> mag, phase, omega, nyquistfrq = bode_response(sys)
+    """
+    from . import config
+    if Hz is None:
+        Hz = config.bode_Hz
+
+    # If argument was a singleton, turn it into a list
+    single = not getattr(syslist, '__iter__', False)
+    if single:
+        syslist = (syslist,)
+
+    omega = _response_frequencies(syslist, omega, Hz, omega_limits, omega_num)
+    responses = []
+    for sys in syslist:
+        if sys.inputs > 1 or sys.outputs > 1:
+            # TODO: Add MIMO bode plots.
+            raise NotImplementedError("Bode is currently only implemented for SISO systems.")
+
+        omega_sys = np.array(omega)
+        if sys.isdtime(True):
+            nyquistfrq = 2. * math.pi * 1. / sys.dt / 2.
+            omega_sys = omega_sys[omega_sys < nyquistfrq]
+            # TODO: What distance to the Nyquist frequency is appropriate?
+        else:
+            nyquistfrq = None
+        # Get the magnitude and phase of the system
+        mag_tmp, phase_tmp, omega_sys = freqresp(sys, omega_sys)
+        mag = np.atleast_1d(np.squeeze(mag_tmp))
+        phase = np.atleast_1d(np.squeeze(phase_tmp))
+        phase = unwrap(phase)
+
+        responses.append(BodeResponse(mag, phase, omega_sys, nyquistfrq))
+
+    return responses[0] if single else responses
+
+
 def nyquist_plot(syslist, omega=None, Plot=True, color=None,
                  labelFreq=0, *args, **kwargs):
     """
@@ -434,6 +345,87 @@ def nyquist_plot(syslist, omega=None, Plot=True, color=None,
     if not getattr(syslist, '__iter__', False):
         syslist = (syslist,)
 
+    for x, y, omega in nyquist_response(syslist, omega):
+        if Plot:
+            # Plot the primary curve and mirror image
+            p = plt.plot(x, y, '-', color=color, *args, **kwargs)
+            c = p[0].get_color()
+            ax = plt.gca()
+            # Plot arrow to indicate Nyquist encirclement orientation
+            ax.arrow(x[0], y[0], (x[1]-x[0])/2, (y[1]-y[0])/2, fc=c, ec=c,
+                     head_width=0.2, head_length=0.2)
+
+            plt.plot(x, -y, '-', color=c, *args, **kwargs)
+            ax.arrow(x[-1], -y[-1], (x[-1]-x[-2])/2, (y[-1]-y[-2])/2, fc=c, ec=c,
+                     head_width=0.2, head_length=0.2)
+
+            # Mark the -1 point
+            plt.plot([-1], [0], 'r+')
+
+        # Label the frequencies of the points
+        if labelFreq:
+            ind = slice(None, None, labelFreq)
+            for xpt, ypt, omegapt in zip(x[ind], y[ind], omega[ind]):
+                # Convert to Hz
+                f = omegapt / (2 * sp.pi)
+
+                # Factor out multiples of 1000 and limit the
+                # result to the range [-8, 8].
+                pow1000 = max(min(get_pow1000(f), 8), -8)
+
+                # Get the SI prefix.
+                prefix = gen_prefix(pow1000)
+
+                # Apply the text. (Use a space before the text to
+                # prevent overlap with the data.)
+                #
+                # np.round() is used because 0.99... appears
+                # instead of 1.0, and this would otherwise be
+                # truncated to 0.
+                plt.text(xpt, ypt, ' ' + str(int(np.round(f / 1000 ** pow1000, 0))) + ' ' +
+                         prefix + 'Hz')
+
+    if Plot:
+        ax = plt.gca()
+        ax.set_xlabel("Real axis")
+        ax.set_ylabel("Imaginary axis")
+        ax.grid(color="lightgray")
+
+    return x, y, omega
+
+
+class NyquistResponse(namedtuple('NyquistResponse',
+                                 ['real', 'imag', 'omega'])):
+    """Nyquist data for a SISO system: real and imaginary parts of the
+    frequency response and the frequencies in rad/sec."""
+    __slots__ = ()
+
+
+def nyquist_response(syslist, omega=None):
+    """Nyquist data for a list of systems, without any plotting
+
+    Parameters
+    ----------
+    syslist : list of LTI
+        List of linear input/output systems (single system is OK)
+    omega : freq_range
+        Range of frequencies (list or bounds) in rad/sec
+
+    Returns
+    -------
+    response : NyquistResponse (list if syslist is a list)
+        Named tuple (real, imag, omega) for each system
+
+    Examples
+    --------
+    >>> sys = ss("1. -2; 3. -4", "5.; 7", "6. 8", "9.")
+    >>> real, imag, freq = nyquist_response(sys)
+    """
+    # If argument was a singleton, turn it into a list
+    single = not getattr(syslist, '__iter__', False)
+    if single:
+        syslist = (syslist,)
+
     # Select a default range if none is provided
     if omega is None:
         omega = default_frequency_range(syslist)
@@ -447,66 +439,22 @@ def nyquist_plot(syslist, omega=None, Plot=True, color=None,
         omega = np.logspace(np.log10(omega[0]), np.log10(omega[1]),
                             num=50, endpoint=True, base=10.0)
 
+    responses = []
     for sys in syslist:
         if sys.inputs > 1 or sys.outputs > 1:
             # TODO: Add MIMO nyquist plots.
             raise NotImplementedError("Nyquist is currently only implemented for SISO systems.")
-        else:
-            # Get the magnitude and phase of the system
-            mag_tmp, phase_tmp, omega = sys.freqresp(omega)
-            mag = np.squeeze(mag_tmp)
-            phase = np.squeeze(phase_tmp)
-
-            # Compute the primary curve
-            x = sp.multiply(mag, sp.cos(phase))
-            y = sp.multiply(mag, sp.sin(phase))
-
-            if Plot:
-                # Plot the primary curve and mirror image
-                p = plt.plot(x, y, '-', color=color, *args, **kwargs)
-                c = p[0].get_color()
-                ax = plt.gca()
-                # Plot arrow to indicate Nyquist encirclement orientation
-                ax.arrow(x[0], y[0], (x[1]-x[0])/2, (y[1]-y[0])/2, fc=c, ec=c,
-                         head_width=0.2, head_length=0.2)
-
-                plt.plot(x, -y, '-', color=c, *args, **kwargs)
-                ax.arrow(x[-1], -y[-1], (x[-1]-x[-2])/2, (y[-1]-y[-2])/2, fc=c, ec=c,
-                         head_width=0.2, head_length=0.2)
-
-                # Mark the -1 point
-                plt.plot([-1], [0], 'r+')
-
-            # Label the frequencies of the points
-            if labelFreq:
-                ind = slice(None, None, labelFreq)
-                for xpt, ypt, omegapt in zip(x[ind], y[ind], omega[ind]):
-                    # Convert to Hz
-                    f = omegapt / (2 * sp.pi)
-
-                    # Factor out multiples of 1000 and limit the
-                    # result to the range [-8, 8].
-                    pow1000 = max(min(get_pow1000(f), 8), -8)
-
-                    # Get the SI prefix.
-                    prefix = gen_prefix(pow1000)
-
-                    # Apply the text. (Use a space before the text to
-                    # prevent overlap with the data.)
-                    #
-                    # np.round() is used because 0.99... appears
-                    # instead of 1.0, and this would otherwise be
-                    # truncated to 0.
-                    plt.text(xpt, ypt, ' ' + str(int(np.round(f / 1000 ** pow1000, 0))) + ' ' +
-                             prefix + 'Hz')
 
-    if Plot:
-        ax = plt.gca()
-        ax.set_xlabel("Real axis")
-        ax.set_ylabel("Imaginary axis")
-        ax.grid(color="lightgray")
+        # Get the magnitude and phase of the system
+        mag_tmp, phase_tmp, omega_sys = freqresp(sys, omega)
+        mag = np.squeeze(mag_tmp)
+        phase = np.squeeze(phase_tmp)
 
-    return x, y, omega
+        # Compute the primary curve
+        responses.append(NyquistResponse(mag * np.cos(phase),
+                                         mag * np.sin(phase), omega_sys))
+
+    return responses[0] if single else responses
 
 
 # TODO: think about how (and whether) to handle lists of systems
@@ -527,60 +475,369 @@ def gangof4_plot(P, C, omega=None):
     -------
     None
     """
+    response = gangof4_response(P, C, omega)
+
+    # Set up the axes with labels so that multiple calls to
+    # gangof4_plot will superimpose the data.  See details in bode_plot.
+    plot_axes = {'t': None, 's': None, 'ps': None, 'cs': None}
+    for ax in plt.gcf().axes:
+        label = ax.get_label()
+        if label.startswith('control-gangof4-'):
+            key = label[len('control-gangof4-'):]
+            if key not in plot_axes:
+                raise RuntimeError("unknown gangof4 axis type '{}'".format(label))
+            plot_axes[key] = ax
+
+    # if any of the axes are missing, start from scratch
+    if any((ax is None for ax in plot_axes.values())):
+        plt.clf()
+        plot_axes = {'t': plt.subplot(221, label='control-gangof4-t'),
+                     'ps': plt.subplot(222, label='control-gangof4-ps'),
+                     'cs': plt.subplot(223, label='control-gangof4-cs'),
+                     's': plt.subplot(224, label='control-gangof4-s')}
+
+    #
+    # Plot the four sensitivity functions
+    #
+
+    # TODO: Need to add in the mag = 1 lines
+    plot_axes['t'].loglog(response.omega, response.T)
+    plot_axes['ps'].loglog(response.omega, response.PS)
+    plot_axes['cs'].loglog(response.omega, response.CS)
+    plot_axes['s'].loglog(response.omega, response.S)
+
+
+class GangOf4Response(namedtuple('GangOf4Response',
+                                 ['T', 'PS', 'CS', 'S', 'omega'])):
+    """Magnitudes of the "Gang of 4" sensitivity functions [T, PS; CS, S]
+    and the frequencies in rad/sec at which they were evaluated."""
+    __slots__ = ()
+
+
+def gangof4_response(P, C, omega=None):
+    """Gang of 4 data for a process and controller, without any plotting
+
+    Parameters
+    ----------
+    P, C : LTI
+        Linear input/output systems (process and control)
+    omega : array
+        Range of frequencies (list or bounds) in rad/sec
+
+    Returns
+    -------
+    response : GangOf4Response
+        Named tuple (T, PS, CS, S, omega) of magnitudes and frequencies
+    """
     if P.inputs > 1 or P.outputs > 1 or C.inputs > 1 or C.outputs > 1:
         # TODO: Add MIMO go4 plots.
         raise NotImplementedError("Gang of four is currently only implemented for SISO systems.")
+
+    # Select a default range if none is provided
+    # TODO: This needs to be made more intelligent
+    if omega is None:
+        omega = default_frequency_range((P, C))
+
+    # Compute the senstivity functions
+    L = P * C
+    S = feedback(1, L)
+    T = L * S
+
+    mags = []
+    for sys in (T, P * S, C * S, S):
+        mag_tmp, phase_tmp, omega = freqresp(sys, omega)
+        mags.append(np.squeeze(mag_tmp))
+
+    return GangOf4Response(mags[0], mags[1], mags[2], mags[3], omega)
+
+class SingularValuesResponse(namedtuple('SingularValuesResponse',
+                                        ['sigma', 'omega'])):
+    """Singular values of the frequency response of a system, as an
+    array of shape (min(outputs, inputs), len(omega)) in decreasing order
+    at each frequency, and the frequencies in rad/sec."""
+    __slots__ = ()
+
+
+def singular_values_response(syslist, omega=None, Hz=None,
+                             omega_limits=None, omega_num=None):
+    """Singular values of the frequency response, without any plotting
+
+    The singular values at all frequencies are computed in a single
+    batched SVD of the frequency response.  Works for StateSpace,
+    TransferFunction and FRD systems with any number of inputs and
+    outputs.
+
+    Parameters
+    ----------
+    syslist : linsys
+        List of linear input/output systems (single system is OK)
+    omega : list
+        List of frequencies in rad/sec to be used for frequency response
+    Hz : boolean
+        If True, omega_limits are given in Hz
+    omega_limits: tuple, list, ... of two values
+        Limits of the to generate frequency vector.
+    omega_num: int
+        number of samples
+
+    Returns
+    -------
+    response : SingularValuesResponse (list if syslist is a list)
+        Named tuple (sigma, omega) for each system
+
+    Examples
+    --------
+    >>> sys = rss(10, 4, 3)
+    >>> sigma, omega = singular_values_response(sys)
+    """
+    from . import config
+    if Hz is None:
+        Hz = config.bode_Hz
+
+    # If argument was a singleton, turn it into a list
+    single = not getattr(syslist, '__iter__', False)
+    if single:
+        syslist = (syslist,)
+
+    omega = _response_frequencies(syslist, omega, Hz, omega_limits, omega_num)
+    responses = []
+    for sys in syslist:
+        omega_sys = np.array(omega)
+        if sys.isdtime(True):
+            nyquistfrq = 2. * math.pi * 1. / sys.dt / 2.
+            omega_sys = omega_sys[omega_sys < nyquistfrq]
+
+        mag, phase, omega_sys = freqresp(sys, omega_sys)
+        fresp = mag * np.exp(1j * phase)
+
+        # one SVD per frequency, all computed in a single call on the
+        # frequency-major stack of response matrices
+        sigma = np.linalg.svd(np.moveaxis(fresp, -1, 0), compute_uv=False)
+        responses.append(SingularValuesResponse(sigma.T, omega_sys))
+
+    return responses[0] if single else responses
+
+
+def singular_values_plot(syslist, omega=None, dB=None, Hz=None, Plot=True,
+                         omega_limits=None, omega_num=None, *args, **kwargs):
+    """Singular value plot for a system
+
+    Plots the singular values of the frequency response of a (MIMO)
+    system over a (optional) frequency range.
+
+    Parameters
+    ----------
+    syslist : linsys
+        List of linear input/output systems (single system is OK)
+    omega : list
+        List of frequencies in rad/sec to be used for frequency response
+    dB : boolean
+        If True, plot result in dB
+    Hz : boolean
+        If True, plot frequency in Hz (omega must be provided in rad/sec)
+    Plot : boolean
+        If True, plot the singular values
+    omega_limits: tuple, list, ... of two values
+        Limits of the to generate frequency vector.
+        If Hz=True the limits are in Hz otherwise in rad/s.
+    omega_num: int
+        number of samples
+    \*args, \**kwargs:
+        Additional options to matplotlib (color, linestyle, etc)
+
+    Returns
+    -------
+    sigma : array (list if len(syslist) > 1)
+        singular values, one row per singular value
+    omega : array (list if len(syslist) > 1)
+        frequency in rad/sec
+
+    Examples
+    --------
+    >>> sys = rss(10, 4, 3)
+    >>> sigma, omega = singular_values_plot(sys)
+    """
+    # Set default values for options
+    from . import config
+    if dB is None:
+        dB = config.bode_dB
+    if Hz is None:
+        Hz = config.bode_Hz
+
+    # If argument was a singleton, turn it into a list
+    if not getattr(syslist, '__iter__', False):
+        syslist = (syslist,)
+
+    responses = singular_values_response(
+        syslist, omega, Hz=Hz, omega_limits=omega_limits, omega_num=omega_num)
+
+    if Plot:
+        ax = plt.gca()
+        sys_color = kwargs.pop('color', None)
+        for sigma, omega_sys in responses:
+            omega_plot = omega_sys / (2. * math.pi) if Hz else omega_sys
+            color = sys_color
+            for sv in sigma:
+                if dB:
+                    line = ax.semilogx(omega_plot, 20 * np.log10(sv),
+                                       color=color, *args, **kwargs)
+                else:
+                    line = ax.loglog(omega_plot, sv, color=color,
+                                     *args, **kwargs)
+                # use the same color for all singular values of a system
+                color = line[0].get_color()
+
+        ax.grid(True, which='both')
+        ax.set_ylabel("Singular Values (dB)" if dB else "Singular Values")
+        ax.set_xlabel("Frequency (Hz)" if Hz else "Frequency (rad/sec)")
+
+    if len(syslist) == 1:
+        return responses[0].sigma, responses[0].omega
     else:
+        return ([sigma for sigma, omega_sys in responses],
+                [omega_sys for sigma, omega_sys in responses])
 
-        # Select a default range if none is provided
-        # TODO: This needs to be made more intelligent
-        if omega is None:
-            omega = default_frequency_range((P, C))
-
-        # Compute the senstivity functions
-        L = P * C
-        S = feedback(1, L)
-        T = L * S
-
-        # Set up the axes with labels so that multiple calls to
-        # gangof4_plot will superimpose the data.  See details in bode_plot.
-        plot_axes = {'t': None, 's': None, 'ps': None, 'cs': None}
-        for ax in plt.gcf().axes:
-            label = ax.get_label()
-            if label.startswith('control-gangof4-'):
-                key = label[len('control-gangof4-'):]
-                if key not in plot_axes:
-                    raise RuntimeError("unknown gangof4 axis type '{}'".format(label))
-                plot_axes[key] = ax
-
-        # if any of the axes are missing, start from scratch
-        if any((ax is None for ax in plot_axes.values())):
-            plt.clf()
-            plot_axes = {'t': plt.subplot(221, label='control-gangof4-t'),
-                         'ps': plt.subplot(222, label='control-gangof4-ps'),
-                         'cs': plt.subplot(223, label='control-gangof4-cs'),
-                         's': plt.subplot(224, label='control-gangof4-s')}
-
-        #
-        # Plot the four sensitivity functions
-        #
-
-        # TODO: Need to add in the mag = 1 lines
-        mag_tmp, phase_tmp, omega = T.freqresp(omega)
-        mag = np.squeeze(mag_tmp)
-        plot_axes['t'].loglog(omega, mag)
 
-        mag_tmp, phase_tmp, omega = (P * S).freqresp(omega)
-        mag = np.squeeze(mag_tmp)
-        plot_axes['ps'].loglog(omega, mag)
+#
+# Batched rendering
+#
+# This section of the code draws data computed by bode_response and
+# nyquist_response.  All systems are drawn with a single LineCollection
+# per axis instead of one line per system, which keeps the cost of
+# plotting many systems in one figure low.
+#
 
-        mag_tmp, phase_tmp, omega = (C * S).freqresp(omega)
-        mag = np.squeeze(mag_tmp)
-        plot_axes['cs'].loglog(omega, mag)
+def bode_render(responses, dB=None, deg=None, Hz=None, max_points=None,
+                fig=None, **kwargs):
+    """Draw Bode data for any number of systems
 
-        mag_tmp, phase_tmp, omega = S.freqresp(omega)
-        mag = np.squeeze(mag_tmp)
-        plot_axes['s'].loglog(omega, mag)
+    Parameters
+    ----------
+    responses : BodeResponse or list of BodeResponse
+        Data computed by :func:`bode_response`
+    dB : boolean
+        If True, plot result in dB
+    deg : boolean
+        If True, plot phase in degrees (else radians)
+    Hz : boolean
+        If True, plot frequency in Hz
+    max_points : int, optional
+        If given, each curve is decimated to about this many points,
+        keeping the local extrema so that resonance peaks are preserved
+    fig : matplotlib Figure, optional
+        Figure to draw into (default: current figure)
+    \**kwargs:
+        Additional options to matplotlib LineCollection (colors,
+        linewidths, etc)
+
+    Returns
+    -------
+    ax_mag, ax_phase : matplotlib Axes
+        Magnitude and phase axes
+
+    Examples
+    --------
+    >>> responses = bode_response([rss(4) for i in range(100)])
+    >>> ax_mag, ax_phase = bode_render(responses, max_points=200)
+    """
+    # Set default values for options
+    from . import config
+    if dB is None:
+        dB = config.bode_dB
+    if deg is None:
+        deg = config.bode_deg
+    if Hz is None:
+        Hz = config.bode_Hz
+
+    if isinstance(responses, BodeResponse):
+        responses = [responses]
+    if fig is None:
+        fig = plt.gcf()
+    ax_mag, ax_phase = _bode_axes(fig)
+
+    freq_scale = 1. / (2. * math.pi) if Hz else 1.
+    mag_curves, phase_curves, nyquistfrqs = [], [], []
+    for mag, phase, omega, nyquistfrq in responses:
+        omega_plot = omega * freq_scale
+        mag_curves.append((omega_plot, 20 * np.log10(mag) if dB else mag))
+        phase_curves.append((omega_plot,
+                             phase * 180. / math.pi if deg else phase))
+        nyquistfrqs.append(nyquistfrq)
+
+    ax_mag.set_xscale('log')
+    ax_phase.set_xscale('log')
+    if not dB:
+        ax_mag.set_yscale('log')
+    mag_lines = _line_collection(mag_curves, max_points, **kwargs)
+    _add_collection(ax_mag, mag_lines)
+    _add_collection(ax_phase,
+                    _line_collection(phase_curves, max_points, **kwargs))
+
+    # Mark the Nyquist frequency of discrete time systems
+    colors = mag_lines.get_colors()
+    for i, nyquistfrq in enumerate(nyquistfrqs):
+        if nyquistfrq:
+            color = colors[i % len(colors)]
+            ax_mag.axvline(nyquistfrq * freq_scale, color=color)
+            ax_phase.axvline(nyquistfrq * freq_scale, color=color)
+
+    ax_mag.grid(True, which='both')
+    ax_mag.set_ylabel("Magnitude (dB)" if dB else "Magnitude")
+    ax_phase.set_ylabel("Phase (deg)" if deg else "Phase (rad)")
+    _bode_phase_ticks(ax_phase, deg)
+    ax_phase.grid(True, which='both')
+    ax_phase.set_xlabel("Frequency (Hz)" if Hz else "Frequency (rad/sec)")
+
+    return ax_mag, ax_phase
+
+
+def nyquist_render(responses, max_points=None, ax=None, **kwargs):
+    """Draw Nyquist data for any number of systems
+
+    The curves for positive and negative frequencies are drawn for each
+    system, but unlike :func:`nyquist_plot` no direction arrows or
+    frequency labels are added.
+
+    Parameters
+    ----------
+    responses : NyquistResponse or list of NyquistResponse
+        Data computed by :func:`nyquist_response`
+    max_points : int, optional
+        If given, each curve is decimated to about this many points,
+        keeping the local extrema
+    ax : matplotlib Axes, optional
+        Axes to draw into (default: current axes)
+    \**kwargs:
+        Additional options to matplotlib LineCollection (colors,
+        linewidths, etc)
+
+    Returns
+    -------
+    ax : matplotlib Axes
+        The axes that were drawn into
+    """
+    if isinstance(responses, NyquistResponse):
+        responses = [responses]
+    if ax is None:
+        ax = plt.gca()
+
+    # Primary curves and mirror images, in matching colors
+    curves = [(x, y) for x, y, omega in responses]
+    mirrors = [(x, -y) for x, y, omega in responses]
+    lines = _line_collection(curves, max_points, **kwargs)
+    _add_collection(ax, lines)
+    kwargs.pop('color', None)
+    kwargs['colors'] = lines.get_colors()
+    _add_collection(ax, _line_collection(mirrors, max_points, **kwargs))
+
+    # Mark the -1 point
+    ax.plot([-1], [0], 'r+')
+
+    ax.set_xlabel("Real axis")
+    ax.set_ylabel("Imaginary axis")
+    ax.grid(color="lightgray")
+
+    return ax
 
 #
 # Utility functions
@@ -592,7 +849,7 @@ def gangof4_plot(P, C, omega=None):
 
 # Compute reasonable defaults for axes
 def default_frequency_range(syslist, Hz=None, number_of_samples=None, 
-                            feature_periphery_decade=None):
+                            feature_periphery_decade=None, adaptive=None):
     """Compute a reasonable default frequency range for frequency
     domain plots.
 
@@ -615,6 +872,12 @@ def default_frequency_range(syslist, Hz=None, number_of_samples=None,
         Example: If there is a feature, e.g. a pole, at 1Hz and feature_periphery_decade=1.
         then the range of frequencies shall span 0.1 .. 10 Hz.
         The default value is read from config.bode_feature_periphery_decade.
+    adaptive: boolean
+        If True, start from a coarse grid over the same range and refine it
+        where the magnitude or phase of the response bends sharply, e.g.
+        around lightly damped resonances.  number_of_samples then bounds
+        the total number of points.  The default value is read from
+        config.bode_adaptive_sampling.
 
     Returns
     -------
@@ -639,15 +902,34 @@ def default_frequency_range(syslist, Hz=None, number_of_samples=None,
         number_of_samples = config.bode_number_of_samples
     if feature_periphery_decade is None:
         feature_periphery_decade = config.bode_feature_periphery_decade
-
-    # Find the list of all poles and zeros in the systems
-    features = np.array(())
-    freq_interesting = []
+    if adaptive is None:
+        adaptive = config.bode_adaptive_sampling
 
     # detect if single sys passed by checking if it is sequence-like
     if not getattr(syslist, '__iter__', False):
         syslist = (syslist,)
 
+    # The range only depends on the system data and the options; reuse it
+    # from the frequency response cache if that is enabled
+    def compute():
+        return _default_frequency_range(syslist, Hz, number_of_samples,
+                                        feature_periphery_decade, adaptive)
+    if not config.freqresp_cache_size:
+        return compute()
+    key = _cache_key('frequency_range', syslist, Hz, number_of_samples,
+                     feature_periphery_decade, adaptive)
+    if key is None:
+        return compute()
+    return _freqresp_cache.lookup(key, compute).copy()
+
+
+def _default_frequency_range(syslist, Hz, number_of_samples,
+                             feature_periphery_decade, adaptive):
+    """Compute the default frequency range, see default_frequency_range"""
+    # Find the list of all poles and zeros in the systems
+    features = np.array(())
+    freq_interesting = []
+
     for sys in syslist:
         try:
             # Add new features to the list
@@ -702,13 +984,367 @@ def default_frequency_range(syslist, Hz=None, number_of_samples=None,
     # (Attention: there is a list of system but only one omega vector)
 
     # Set the range to be an order of magnitude beyond any features
-    if number_of_samples:
+    if adaptive:
+        omega = _adaptive_frequency_grid(syslist, lsp_min, lsp_max,
+                                         number_of_samples)
+    elif number_of_samples:
         omega = sp.logspace(lsp_min, lsp_max, num=number_of_samples, endpoint=True)
     else:
         omega = sp.logspace(lsp_min, lsp_max, endpoint=True)
     return omega
 
 
+def _adaptive_frequency_grid(syslist, lsp_min, lsp_max, max_points=None,
+                             mag_tol=0.5, phase_tol=5., max_depth=16):
+    """Adaptively sampled frequency grid between 10**lsp_min and 10**lsp_max.
+
+    The grid starts with a few points per decade plus the natural
+    frequencies of all poles and zeros in range.  Each pass then evaluates
+    the responses at the (logarithmic) midpoints of the current intervals,
+    all midpoints at once, and keeps those midpoints where the response
+    deviates from interpolation between the interval ends by more than
+    mag_tol (dB) or phase_tol (degrees).  Only intervals that were split
+    are examined again in the next pass.
+    """
+    from .frdata import FRD
+
+    if max_points is None:
+        max_points = 2000
+    lw = np.linspace(lsp_min, lsp_max,
+                     max(int(np.ceil(3 * (lsp_max - lsp_min))), 4) + 1)
+
+    systems = [sys for sys in syslist if not isinstance(sys, FRD)]
+    for sys in systems:
+        features = sys.pole()
+        try:
+            features = np.concatenate((features, sys.zero()))
+        except NotImplementedError:
+            pass
+        if sys.isdtime(strict=True):
+            with np.errstate(divide='ignore'):
+                features = np.abs(np.log(features) / sys.dt)
+        features = np.abs(features)
+        features = np.log10(features[(features > 0) & np.isfinite(features)])
+        lw = np.concatenate(
+            (lw, features[(features > lsp_min) & (features < lsp_max)]))
+    lw = np.unique(lw)
+    lw = lw[np.concatenate(([True], np.diff(lw) > 1e-10))]
+    if not systems:
+        return 10. ** lw
+
+    def log_response(lwk):
+        # complex log of all channels of all systems, one row per channel
+        # (points beyond the Nyquist frequency are returned as nan)
+        w = 10. ** lwk
+        out = []
+        for sys in systems:
+            resp = np.full((sys.outputs * sys.inputs, len(w)), np.nan,
+                           dtype=complex)
+            valid = np.ones(len(w), dtype=bool)
+            if sys.isdtime(strict=True):
+                valid = w * sys.dt < math.pi
+            mag, phase, _ = sys.freqresp(w[valid])
+            with np.errstate(divide='ignore'):
+                resp[:, valid] = (np.log(mag) + 1j * phase).reshape(
+                    -1, np.count_nonzero(valid))
+            out.append(resp)
+        return np.concatenate(out, axis=0)
+
+    resp = log_response(lw)
+    active = np.ones(len(lw) - 1, dtype=bool)
+    for depth in range(max_depth):
+        if not active.any() or len(lw) >= max_points:
+            break
+
+        # evaluate all candidate midpoints in one call per system
+        idx = np.where(active)[0]
+        lw_mid = (lw[idx] + lw[idx + 1]) / 2.
+        resp_mid = log_response(lw_mid)
+        lo, hi = resp[:, idx], resp[:, idx + 1]
+
+        # deviation from interpolation, in dB and degrees; phase
+        # differences are wrapped so that jumps of 2 pi do not count
+        dmag = 20. / math.log(10.) * (
+            resp_mid.real - (lo.real + hi.real) / 2.)
+        dphase = np.angle(np.exp(1j * (
+            resp_mid.imag - lo.imag -
+            np.angle(np.exp(1j * (hi.imag - lo.imag))) / 2.)))
+        with np.errstate(invalid='ignore'):
+            refine = ((np.abs(dmag) > mag_tol) |
+                      (np.abs(dphase) > math.radians(phase_tol)))
+        refine = refine.any(axis=0)
+        if not refine.any():
+            break
+
+        # respect the point budget, refining the worst intervals first
+        budget = max_points - len(lw)
+        if np.count_nonzero(refine) > budget:
+            with np.errstate(invalid='ignore'):
+                score = np.nan_to_num(np.abs(dmag)).max(axis=0)
+            keep = np.argsort(-np.where(refine, score, -1.))[:budget]
+            refine[:] = False
+            refine[keep] = True
+
+        # merge the new points in one pass; every accepted midpoint splits
+        # its interval into two halves that are checked next time
+        new_lw = lw_mid[refine]
+        order = np.argsort(np.concatenate((lw, new_lw)), kind='mergesort')
+        lw = np.concatenate((lw, new_lw))[order]
+        resp = np.concatenate((resp, resp_mid[:, refine]), axis=1)[:, order]
+        split = np.zeros(len(active), dtype=bool)
+        split[idx[refine]] = True
+        active = np.repeat(split, np.where(split, 2, 1))
+
+    return 10. ** lw
+
+
+def _response_frequencies(syslist, omega, Hz, omega_limits, omega_num):
+    """Frequency vector for bode_response and singular_values_response"""
+    from . import config
+    if omega is None:
+        if omega_limits is None:
+            # Select a default range if none is provided
+            omega = default_frequency_range(syslist, Hz=Hz, number_of_samples=omega_num)
+        else:
+            omega_limits = np.array(omega_limits)
+            if Hz:
+                omega_limits *= 2. * math.pi
+            if config.bode_adaptive_sampling:
+                omega = _adaptive_frequency_grid(
+                    syslist, np.log10(omega_limits[0]),
+                    np.log10(omega_limits[1]), omega_num)
+            elif omega_num:
+                omega = sp.logspace(np.log10(omega_limits[0]), 
+                                    np.log10(omega_limits[1]), 
+                                    num=omega_num, 
+                                    endpoint=True)
+            else:
+                omega = sp.logspace(np.log10(omega_limits[0]), 
+                                    np.log10(omega_limits[1]), 
+                                    endpoint=True)
+
+    return omega
+
+
+def _bode_axes(fig):
+    """Find the Bode plot axes in fig, creating them if needed"""
+    ax_mag = None
+    ax_phase = None
+
+    # Get the current axes if they already exist
+    for ax in fig.axes:
+        if ax.get_label() == 'control-bode-magnitude':
+            ax_mag = ax
+        elif ax.get_label() == 'control-bode-phase':
+            ax_phase = ax
+
+    # If no axes present, create them from scratch
+    if ax_mag is None or ax_phase is None:
+        fig.clf()
+        ax_mag = fig.add_subplot(211, label='control-bode-magnitude')
+        ax_phase = fig.add_subplot(212, label='control-bode-phase',
+                                   sharex=ax_mag)
+    return ax_mag, ax_phase
+
+
+def _bode_margins(ax_mag, ax_phase, margin, phase, omega, dB, Hz, deg,
+                  sisotool=False):
+    """Draw the gain and phase margins on a pair of Bode axes.
+
+    The margins are given as returned by stability_margins, with the phase
+    response (in radians) and frequencies they were computed from.  The
+    artists are returned, so that they can be replaced when the margins
+    change."""
+    artists = []
+    gm, pm, Wcg, Wcp = margin[0], margin[1], margin[3], margin[4]
+    # TODO: add some documentation describing why this is here
+    phase_at_cp = phase[(np.abs(omega - Wcp)).argmin()]
+    if phase_at_cp >= 0.:
+        phase_limit = 180.
+    else:
+        phase_limit = -180.
+
+    if Hz:
+        Wcg, Wcp = Wcg/(2*math.pi),Wcp/(2*math.pi)
+
+    artists.append(ax_mag.axhline(y=0 if dB else 1, color='k', linestyle=':',
+                                  zorder=-20))
+    artists.append(ax_phase.axhline(
+        y=phase_limit if deg else math.radians(phase_limit),
+        color='k', linestyle=':', zorder=-20))
+    mag_ylim = ax_mag.get_ylim()
+    phase_ylim = ax_phase.get_ylim()
+
+    if pm != float('inf') and Wcp != float('nan'):
+        if dB:
+            artists += ax_mag.semilogx([Wcp, Wcp], [0.,-1e5],
+                                       color='k', linestyle=':',
+                                       zorder=-20)
+        else:
+            artists += ax_mag.loglog([Wcp,Wcp], [1.,1e-8],color='k',
+                                     linestyle=':', zorder=-20)
+
+        if deg:
+            artists += ax_phase.semilogx([Wcp, Wcp],
+                                         [1e5, phase_limit+pm],
+                                         color='k', linestyle=':',
+                                         zorder=-20)
+            artists += ax_phase.semilogx([Wcp, Wcp],
+                                         [phase_limit + pm, phase_limit],
+                                         color='k', zorder=-20)
+        else:
+            artists += ax_phase.semilogx([Wcp, Wcp],
+                                         [1e5, math.radians(phase_limit) +
+                                          math.radians(pm)],
+                                         color='k', linestyle=':',
+                                         zorder=-20)
+            artists += ax_phase.semilogx([Wcp, Wcp],
+                                         [math.radians(phase_limit) +
+                                          math.radians(pm),
+                                          math.radians(phase_limit)],
+                                         color='k', zorder=-20)
+
+    if gm != float('inf') and Wcg != float('nan'):
+        if dB:
+            artists += ax_mag.semilogx([Wcg, Wcg],
+                                       [-20.*np.log10(gm), -1e5],
+                                       color='k', linestyle=':',
+                                       zorder=-20)
+            artists += ax_mag.semilogx([Wcg, Wcg], [0,-20*np.log10(gm)],
+                                       color='k', zorder=-20)
+        else:
+            artists += ax_mag.loglog([Wcg, Wcg],
+                                     [1./gm,1e-8],color='k',
+                                     linestyle=':', zorder=-20)
+            artists += ax_mag.loglog([Wcg, Wcg],
+                                     [1.,1./gm],color='k', zorder=-20)
+
+        if deg:
+            artists += ax_phase.semilogx([Wcg, Wcg], [1e-8, phase_limit],
+                                         color='k', linestyle=':',
+                                         zorder=-20)
+        else:
+            artists += ax_phase.semilogx([Wcg, Wcg],
+                                         [1e-8, math.radians(phase_limit)],
+                                         color='k', linestyle=':',
+                                         zorder=-20)
+
+    ax_mag.set_ylim(mag_ylim)
+    ax_phase.set_ylim(phase_ylim)
+
+    if sisotool:
+        artists.append(ax_mag.text(
+            0.04, 0.06,
+            'G.M.: %.2f %s\nFreq: %.2f %s' %
+            (20*np.log10(gm) if dB else gm,
+             'dB ' if dB else '',
+             Wcg, 'Hz' if Hz else 'rad/s'),
+            horizontalalignment='left',
+            verticalalignment='bottom',
+            transform=ax_mag.transAxes,
+            fontsize=8 if int(matplotlib.__version__[0]) == 1 else 6))
+        artists.append(ax_phase.text(
+            0.04, 0.06,
+            'P.M.: %.2f %s\nFreq: %.2f %s' %
+            (pm if deg else math.radians(pm),
+             'deg' if deg else 'rad',
+             Wcp, 'Hz' if Hz else 'rad/s'),
+            horizontalalignment='left',
+            verticalalignment='bottom',
+            transform=ax_phase.transAxes,
+            fontsize=8 if int(matplotlib.__version__[0]) == 1 else 6))
+    else:
+        artists.append(plt.suptitle(
+            'Gm = %.2f %s(at %.2f %s), Pm = %.2f %s (at %.2f %s)' %
+            (20*np.log10(gm) if dB else gm,
+             'dB ' if dB else '\b',
+             Wcg, 'Hz' if Hz else 'rad/s',
+             pm if deg else math.radians(pm),
+             'deg' if deg else 'rad',
+             Wcp, 'Hz' if Hz else 'rad/s')))
+    return artists
+
+
+def _bode_phase_ticks(ax_phase, deg):
+    """Put phase ticks at multiples of 45 and 15 degrees (or pi/4, pi/12)"""
+    def gen_zero_centered_series(val_min, val_max, period):
+        v1 = np.ceil(val_min / period - 0.2)
+        v2 = np.floor(val_max / period + 0.2)
+        return np.arange(v1, v2 + 1) * period
+
+    major, minor = (45., 15.) if deg else (math.pi / 4., math.pi / 12.)
+    ylim = ax_phase.get_ylim()
+    ax_phase.set_yticks(gen_zero_centered_series(ylim[0], ylim[1], major))
+    ax_phase.set_yticks(gen_zero_centered_series(ylim[0], ylim[1], minor),
+                        minor=True)
+
+
+def _decimate(x, y, max_points):
+    """Reduce a curve to about max_points points, keeping the extremes
+
+    The curve is split into bins of consecutive points, and only the
+    points where x or y reach their minimum or maximum within a bin are
+    kept, so that peaks survive the decimation.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(x)
+    if max_points is None or n <= max_points:
+        return x, y
+
+    nbins = max(max_points // 4, 1)
+    binlen = -(-n // nbins)
+    idx = np.minimum(np.arange(nbins * binlen), n - 1).reshape(nbins, binlen)
+    rows = np.arange(nbins)
+    keep = [[0, n - 1]]
+    for v in (x, y):
+        vals = v[idx]
+        keep.append(idx[rows, np.argmin(vals, axis=1)])
+        keep.append(idx[rows, np.argmax(vals, axis=1)])
+    keep = np.unique(np.concatenate(keep))
+    return x[keep], y[keep]
+
+
+def _line_collection(curves, max_points=None, **kwargs):
+    """LineCollection for a list of (x, y) curves
+
+    Unless a color is given, the curves are colored using the
+    matplotlib color cycle.
+    """
+    from matplotlib.collections import LineCollection
+
+    segments = [np.column_stack(_decimate(np.ravel(x), np.ravel(y),
+                                          max_points))
+                for x, y in curves]
+    if 'color' not in kwargs and 'colors' not in kwargs:
+        cycle = plt.rcParams['axes.prop_cycle'].by_key()['color']
+        kwargs['colors'] = [cycle[i % len(cycle)]
+                            for i in range(len(segments))]
+    return LineCollection(segments, **kwargs)
+
+
+def _add_collection(ax, lines):
+    """Add a LineCollection to ax and rescale the axes to fit its data
+
+    The data limits are computed here from the points that can be shown
+    on the axis scales, since collections on logarithmic axes are not
+    autoscaled reliably by matplotlib.
+    """
+    ax.add_collection(lines, autolim=False)
+    segments = lines.get_segments()
+    if not segments:
+        return
+    points = np.concatenate(segments)
+    visible = np.all(np.isfinite(points), axis=1)
+    if ax.get_xscale() == 'log':
+        visible &= points[:, 0] > 0
+    if ax.get_yscale() == 'log':
+        visible &= points[:, 1] > 0
+    if np.any(visible):
+        ax.update_datalim(points[visible])
+    ax.autoscale_view()
+
+
 #
 # KLD 5/23/11: Two functions to create nice looking labels
 #
@@ -762,3 +1398,4 @@ def find_nearest_omega(omega_list, omega):
 bode = bode_plot
 nyquist = nyquist_plot
 gangof4 = gangof4_plot
+sigma = singular_values_plot
@@ -12,11 +12,15 @@ timebase()
 timebaseEqual()
 """
 
+import hashlib
 import numpy as np
 from numpy import absolute, real
+from collections import OrderedDict, namedtuple
+from copy import deepcopy
 
 __all__ = ['issiso', 'timebase', 'timebaseEqual', 'isdtime', 'isctime',
-           'pole', 'zero', 'damp', 'evalfr', 'freqresp', 'dcgain']
+           'pole', 'zero', 'damp', 'evalfr', 'freqresp', 'dcgain',
+           'freqresp_cache_info', 'freqresp_cache_clear']
 
 class LTI:
     """LTI is a parent class to linear time-invariant (LTI) system objects.
@@ -112,6 +116,100 @@ class LTI:
         raise NotImplementedError("dcgain not implemented for %s objects" %
                                   str(self.__class__))
 
+    def _fingerprint(self):
+        """Digest of the system data, used to key cached results.
+
+        Subclasses hash all the data that defines their response, so that
+        a system that is modified in place gets a new fingerprint.
+        """
+        raise NotImplementedError("_fingerprint not implemented for %s "
+                                  "objects" % str(self.__class__))
+
+    def _cached(self, name, compute):
+        """Return a derived quantity, computing it only when needed.
+
+        Derived data such as poles and zeros is stored on the object
+        together with the fingerprint of the system data it was computed
+        from, and is recomputed once the system is modified in place.
+        A copy is returned, so callers may modify the result freely.
+        """
+        fingerprint = self._fingerprint()
+        cache = getattr(self, '_derived', None)
+        if cache is None or cache[0] != fingerprint:
+            cache = self._derived = (fingerprint, {})
+        if name not in cache[1]:
+            cache[1][name] = compute()
+        return deepcopy(cache[1][name])
+
+def _hash_data(tag, dt, arrays):
+    """Hex digest of a class tag, a timebase and a sequence of arrays"""
+    h = hashlib.sha1(('%s:%r' % (tag, dt)).encode())
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(('%s%r' % (a.dtype.str, a.shape)).encode())
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+class _ResultCache(object):
+    """Size-bounded least-recently-used store for computed responses.
+
+    The size bound is read from config.freqresp_cache_size on every
+    access; a size of 0 disables the cache.
+    """
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def maxsize():
+        from . import config
+        return config.freqresp_cache_size
+
+    def lookup(self, key, compute):
+        """Return the value stored under key, computing it if needed"""
+        maxsize = self.maxsize()
+        if not maxsize:
+            return compute()
+
+        if key in self._data:
+            # move to the most recently used end
+            value = self._data.pop(key)
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = compute()
+        self._data[key] = value
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+        return value
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize(),
+                         len(self._data))
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+_freqresp_cache = _ResultCache()
+
+def _cache_key(tag, syslist, *args):
+    """Cache key for a result depending on systems and other parameters.
+
+    Returns None if any of the systems cannot be fingerprinted.
+    """
+    try:
+        return (tag, tuple(sys._fingerprint() for sys in syslist)) + args
+    except (AttributeError, NotImplementedError):
+        return None
+
 # Test to see if a system is SISO
 def issiso(sys, strict=False):
     """
@@ -409,6 +507,10 @@ def freqresp(sys, omega):
     TransferFunction.freqresp.  The output omega is a sorted version of the
     input omega.
 
+    If config.freqresp_cache_size is nonzero, responses are memoised on
+    the system data and the frequency vector, see
+    :func:`freqresp_cache_info`.
+
     Examples
     --------
     >>> sys = ss("1. -2; 3. -4", "5.; 7", "6. 8", "9.")
@@ -432,8 +534,52 @@ def freqresp(sys, omega):
         #>>> # frequency response from the 1st input to the 2nd output, for
         #>>> # s = 0.1i, i, 10i.
     """
+    from . import config
+    if not config.freqresp_cache_size:
+        return sys.freqresp(omega)
+
+    omega = np.sort(np.array(omega, dtype=float))
+    key = _cache_key('freqresp', (sys,),
+                     hashlib.sha1(omega.tobytes()).hexdigest())
+    if key is None:
+        return sys.freqresp(omega)
+
+    # hand out copies, so that callers can modify the results in place
+    mag, phase, omega = _freqresp_cache.lookup(
+        key, lambda: sys.freqresp(omega.copy()))
+    return mag.copy(), phase.copy(), omega.copy()
+
+def freqresp_cache_info():
+    """Statistics of the frequency response cache
+
+    Frequency responses computed through :func:`freqresp` and the
+    frequency plotting functions, default frequency ranges and stability
+    margins are memoised when config.freqresp_cache_size is set to the
+    maximum number of results to keep (the default, 0, disables the
+    cache).  Results are keyed by a hash of the system data, so a system
+    that is modified in place is recomputed.  When the cache is full the
+    least recently used result is discarded.
 
-    return sys.freqresp(omega)
+    Returns
+    -------
+    info : CacheInfo
+        Named tuple with the number of hits and misses, the maximum size
+        and the current size of the cache.
+
+    See Also
+    --------
+    freqresp_cache_clear
+    """
+    return _freqresp_cache.info()
+
+def freqresp_cache_clear():
+    """Remove all results from the frequency response cache
+
+    See Also
+    --------
+    freqresp_cache_info
+    """
+    _freqresp_cache.clear()
 
 def dcgain(sys):
     """Return the zero-frequency (or DC) gain of the given system
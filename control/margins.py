@@ -5,8 +5,11 @@ Functions for computing stability margins and related functions.
 Routines in this module:
 
 margin.stability_margins
+margin.stability_margins_batch
 margin.phase_crossover_frequencies
 margin.margin
+margin.nyquist_stability
+margin.mimo_margins
 """
 
 # Python 3 compatibility (needs to go here)
@@ -54,17 +57,24 @@ import math
 import numpy as np
 import scipy as sp
 from . import xferfcn
-from .lti import issiso
+from collections import namedtuple
+from warnings import warn
+from .lti import LTI, issiso, isdtime, _freqresp_cache, _cache_key
+from .statesp import StateSpace
 from . import frdata
 
-__all__ = ['stability_margins', 'phase_crossover_frequencies', 'margin']
+__all__ = ['stability_margins', 'stability_margins_batch',
+           'phase_crossover_frequencies', 'margin',
+           'nyquist_stability', 'NyquistStability', 'mimo_margins',
+           'MIMOMargins', 'LoopMargins', 'DiskMargins']
 
 # helper functions for stability_margins
 def _polyimsplit(pol):
     """split a polynomial with (iw) applied into a real and an
     imaginary part with w applied"""
-    rpencil = np.zeros_like(pol)
-    ipencil = np.zeros_like(pol)
+    pol = np.asarray(pol)
+    rpencil = np.zeros(pol.shape[-1], dtype=pol.dtype)
+    ipencil = np.zeros(pol.shape[-1], dtype=pol.dtype)
     rpencil[-1::-4] = 1.
     rpencil[-3::-4] = -1.
     ipencil[-2::-4] = 1.
@@ -75,6 +85,206 @@ def _polysqr(pol):
     """return a polynomial squared"""
     return np.polymul(pol, pol)
 
+# Batched polynomial helpers; each row of a 2D array is one polynomial,
+# highest power first, as for the np.poly* functions
+def _bpolyadd(a, b):
+    """add two stacks of polynomials"""
+    n = max(a.shape[-1], b.shape[-1])
+    return (np.pad(a, ((0, 0), (n - a.shape[-1], 0)), 'constant') +
+            np.pad(b, ((0, 0), (n - b.shape[-1], 0)), 'constant'))
+
+def _bpolymul(a, b):
+    """multiply two stacks of polynomials"""
+    out = np.zeros((a.shape[0], a.shape[-1] + b.shape[-1] - 1),
+                   dtype=np.result_type(a, b))
+    for i in range(a.shape[-1]):
+        out[:, i:i + b.shape[-1]] += a[:, i:i + 1] * b
+    return out
+
+def _bpolyder(a):
+    """derivative of a stack of polynomials"""
+    n = a.shape[-1] - 1
+    if n == 0:
+        return np.zeros_like(a)
+    return a[:, :-1] * np.arange(n, 0, -1)
+
+def _bpolyval(a, x):
+    """evaluate each polynomial at the points in the matching row of x"""
+    val = np.zeros(x.shape, dtype=np.result_type(a, x))
+    for i in range(a.shape[-1]):
+        val = val * x + a[:, i:i + 1]
+    return val
+
+def _broots(p):
+    """roots of a stack of polynomials, as rows padded with nan
+
+    Like np.roots, leading zeros are removed and trailing zeros give
+    exact roots at 0.  The other roots are the eigenvalues of the
+    companion matrices, computed in one call for all polynomials with
+    the same number of leading and trailing zeros.
+    """
+    nsys, n = p.shape
+    roots = np.full((nsys, max(n - 1, 0)), np.nan, dtype=complex)
+    nonzero = p != 0
+    lead = np.where(nonzero.any(axis=1), nonzero.argmax(axis=1), n)
+    trail = np.where(nonzero.any(axis=1),
+                     nonzero[:, ::-1].argmax(axis=1), 0)
+    for k, t in set(zip(lead, trail)):
+        rows = np.nonzero((lead == k) & (trail == t))[0]
+        deg = n - 1 - k - t
+        if deg < 0:
+            continue
+        roots[rows, deg:deg + t] = 0.
+        if deg == 0:
+            continue
+        c = p[rows, k:n - t]
+        companion = np.zeros((len(rows), deg, deg))
+        companion[:, 0, :] = -c[:, 1:] / c[:, :1]
+        companion[:, np.arange(1, deg), np.arange(deg - 1)] = 1.
+        roots[rows, :deg] = np.linalg.eigvals(companion)
+    return roots
+
+# State space crossover frequencies; each set of frequencies is found
+# from the finite eigenvalues of a pencil (M, N) that lie on the imaginary
+# axis, see Boyd, Balakrishnan and Kabamba, "A bisection method for
+# computing the H-infinity norm of a transfer matrix and related
+# problems", Math. Control Signals Systems, 1989, for the gain pencil
+def _ss_pencil_freqs(M, n, wmin, strict):
+    """nonnegative frequencies w of the eigenvalues jw of (M, diag(I_n, 0))"""
+    N = np.zeros_like(M)
+    N[:n, :n] = np.eye(n)
+    with np.errstate(all='ignore'):
+        z = sp.linalg.eigvals(M, N)
+    z = z[np.isfinite(z)]
+    scale = max(1., np.linalg.norm(M[:n, :n], 1))
+    z = z[(np.abs(z.real) <= 1e-6 * np.maximum(np.abs(z), scale)) *
+          (z.imag >= -1e-12 * scale)]
+    w = np.abs(z.imag)
+    w[w <= 1e-12 * scale] = 0.
+    w = np.sort(w[(w > wmin) if strict else (w >= wmin)])
+    # eigenvalues where the curve touches come in pairs
+    return w[np.diff(np.append(-1., w)) > 1e-8 * np.maximum(w, 1.)]
+
+def _ss_refine(f, w, steps=3):
+    """Newton refinement of the zeros w of a real function f(w)"""
+    with np.errstate(all='ignore'):
+        for i in range(steps):
+            fw = f(w)
+            h = 1e-7 * np.maximum(w, 1e-3)
+            w1 = w - fw * h / (f(w + h) - fw)
+            better = np.isfinite(w1) * (w1 >= 0)
+            better[better] = np.abs(f(w1[better])) < np.abs(fw[better])
+            w = np.where(better, w1, w)
+    return w
+
+def _ss_margin_frequencies(sys, epsw, refine=True):
+    """Phase crossover, gain crossover and stability margin frequencies
+    of a SISO continuous time state space system.
+
+    The frequencies are the imaginary axis eigenvalues of pencils built
+    from the A, B, C and D matrices, for the zeros of G(s) - G(-s) (phase
+    crossover), 1 - G(-s) G(s) (gain crossover) and the derivative of
+    (1 + G(-s)) (1 + G(s)) (extrema of the distance to -1).  Candidates
+    are refined with a few Newton steps on the response if `refine` is
+    True, and then checked against the response.
+    """
+    A, B = np.asarray(sys.A, dtype=float), np.asarray(sys.B, dtype=float)
+    C, D = np.asarray(sys.C, dtype=float), np.asarray(sys.D, dtype=float)
+    n = A.shape[0]
+    d = D[0, 0]
+    Z = np.zeros((n, n))
+    if n == 0:
+        empty = np.array([])
+        return empty, empty, empty
+
+    def G(w):
+        w = np.atleast_1d(np.asarray(w, dtype=float))
+        try:
+            return sys.horner(1.j * w)[0, 0]
+        except np.linalg.LinAlgError:
+            # at least one frequency is at a pole on the imaginary axis
+            if len(w) == 1:
+                return np.array([complex(np.inf, 0.)])
+            return np.concatenate([G(wi) for wi in w])
+
+    # G(s) - G(-s), realized with states x and x' for G(s) and G(-s)
+    M = np.block([[A, Z, B], [Z, -A, B], [C, C, np.zeros((1, 1))]])
+    w_180 = _ss_pencil_freqs(M, 2*n, epsw, False)
+    if refine:
+        w_180 = _ss_refine(lambda w: G(w).imag / np.abs(G(w)), w_180)
+    resp = G(w_180)
+    w_180 = w_180[np.isfinite(resp) *
+                  (np.abs(resp.imag) <= 1e-6 * np.abs(resp)) *
+                  (resp.real <= 0.)]
+
+    # 1 - G(-s) G(s), with x for G(s) and co-state p for G(-s)
+    M = np.block([[A, Z, B], [-np.dot(C.T, C), -A.T, -C.T * d],
+                  [-d * C, -B.T, np.array([[1. - d**2]])]])
+    wc = _ss_pencil_freqs(M, 2*n, epsw, True)
+    if refine:
+        wc = _ss_refine(lambda w: np.abs(G(w)) - 1., wc)
+    wc = wc[np.abs(np.abs(G(wc)) - 1.) <= 1e-6]
+
+    # derivative of Phi(s) = (1 + G(-s)) (1 + G(s)), with realization
+    # (Ap, Bp, Cp); the derivative has (sI - Ap)^-2 in place of (sI - Ap)^-1
+    Ap = np.block([[A, Z], [-np.dot(C.T, C), -A.T]])
+    Bp = np.vstack([B, -C.T * (1. + d)])
+    Cp = np.hstack([(1. + d) * C, B.T])
+    Zp = np.zeros((2*n, 2*n))
+    M = np.block([[Ap, np.eye(2*n), np.zeros((2*n, 1))],
+                  [Zp, Ap, Bp],
+                  [Cp, np.zeros((1, 2*n)), np.zeros((1, 1))]])
+    wstab = _ss_pencil_freqs(M, 4*n, epsw, True)
+    # keep only the minima of |1 + G(jw)|
+    dist = np.abs(G(wstab) + 1.)
+    delta = 1e-4 * wstab
+    wstab = wstab[np.isfinite(dist) *
+                  (np.abs(G(wstab - delta) + 1.) > dist) *
+                  (np.abs(G(wstab + delta) + 1.) > dist)]
+
+    return w_180, wc, wstab
+
+# Crossings in sampled frequency response data
+def _secant(f, a, b, fa, fb, rtol=1e-12, maxiter=100):
+    """Zeros of f in the brackets [a, b], found for all brackets at once
+
+    Uses the Illinois variant of regula falsi; f(a) and f(b) must have
+    opposite signs and f must accept an array of points.
+    """
+    a, b = np.array(a, dtype=float), np.array(b, dtype=float)
+    fa, fb = np.array(fa, dtype=float), np.array(fb, dtype=float)
+    x = a.copy()
+    side = np.zeros(a.shape, dtype=int)
+    active = np.ones(a.shape, dtype=bool)
+    for i in range(maxiter):
+        if not active.any():
+            break
+        x[active] = (a * fb - b * fa)[active] / (fb - fa)[active]
+        fx = np.zeros_like(x)
+        fx[active] = f(x[active])
+
+        # replace the end point with the same sign; halve the function
+        # value at the retained end point if it was retained before
+        right = active * (fx * fb > 0)
+        left = active * (fx * fa > 0)
+        b[right], fb[right] = x[right], fx[right]
+        fa[right * (side == -1)] /= 2.
+        side[right] = -1
+        a[left], fa[left] = x[left], fx[left]
+        fb[left * (side == 1)] /= 2.
+        side[left] = 1
+        active *= (right + left) * \
+            (np.abs(b - a) > rtol * np.maximum(np.abs(x), 1e-300))
+    return x
+
+def _frd_crossings(f, omega, fomega, mask=None):
+    """Zeros of f between the points of omega where fomega changes sign"""
+    idx = np.where(np.diff(np.sign(fomega)))[0]
+    if mask is not None:
+        idx = idx[mask[idx]]
+    return _secant(f, omega[idx], omega[idx + 1],
+                   fomega[idx], fomega[idx + 1])
+
 # Took the framework for the old function by
 # Sawyer B. Fuller <minster@caltech.edu>, removed a lot of the innards
 # and replaced with analytical polynomial functions for LTI systems.
@@ -105,7 +315,10 @@ def stability_margins(sysdata, returnall=False, epsw=0.0):
     ----------
     sysdata: LTI system or (mag, phase, omega) sequence
         sys : LTI system
-            Linear SISO system
+            Linear SISO system.  Continuous time state space systems are
+            not converted to transfer functions; their crossover
+            frequencies are found from eigenvalues of pencils built from
+            the state space matrices.
         mag, phase, omega : sequence of array_like
             Arrays of magnitudes (absolute values, not dB), phases (degrees),
             and corresponding frequencies. Crossover frequencies returned are
@@ -134,11 +347,29 @@ def stability_margins(sysdata, returnall=False, epsw=0.0):
         Frequency for stability margin (complex gain closest to -1)
     """
 
+    # Margins only depend on the system data; reuse them from the
+    # frequency response cache if that is enabled
+    from . import config
+    key = None
+    if config.freqresp_cache_size and isinstance(sysdata, LTI):
+        key = _cache_key('stability_margins', (sysdata,), returnall, epsw)
+    if key is not None:
+        return tuple(np.copy(m) if isinstance(m, np.ndarray) else m
+                     for m in _freqresp_cache.lookup(
+                         key, lambda: _stability_margins(
+                             sysdata, returnall, epsw)))
+    return _stability_margins(sysdata, returnall, epsw)
+
+def _stability_margins(sysdata, returnall, epsw):
+    """Calculate stability margins, see stability_margins"""
     try:
         if isinstance(sysdata, frdata.FRD):
             sys = frdata.FRD(sysdata, smooth=True)
         elif isinstance(sysdata, xferfcn.TransferFunction):
             sys = sysdata
+        elif isinstance(sysdata, StateSpace) and \
+                not isdtime(sysdata, strict=True):
+            sys = sysdata
         elif getattr(sysdata, '__iter__', False) and len(sysdata) == 3:
             mag, phase, omega = sysdata
             sys = frdata.FRD(mag * np.exp(1j * phase * math.pi/180),
@@ -209,52 +440,75 @@ def stability_margins(sysdata, returnall=False, epsw=0.0):
                               (wstabplus > 0.)])
         wstab.sort()
 
+    elif isinstance(sys, StateSpace):
+
+        # check for siso
+        if not issiso(sys):
+            raise ValueError("Can only do margins for SISO system")
+
+        # no conversion to transfer function, crossovers are found from
+        # eigenvalues of pencils built from the state space matrices
+        w_180, wc, wstab = _ss_margin_frequencies(sys, epsw)
+
     else:
-        # a bit coarse, have the interpolated frd evaluated again
-        def mod(w):
-            """to give the function to calculate |G(jw)| = 1"""
-            return np.abs(sys._evalfr(w)[0][0]) - 1
-
-        def arg(w):
-            """function to calculate the phase angle at -180 deg"""
-            return np.angle(-sys._evalfr(w)[0][0])
-
-        def dstab(w):
-            """function to calculate the distance from -1 point"""
-            return np.abs(sys._evalfr(w)[0][0] + 1.)
-
-        # Find all crossings, note that this depends on omega having
-        # a correct range
-        widx = np.where(np.diff(np.sign(mod(sys.omega))))[0]
-        wc = np.array(
-            [ sp.optimize.brentq(mod, sys.omega[i], sys.omega[i+1])
-              for i in widx if i+1 < len(sys.omega)])
-
-        # find the phase crossings ang(H(jw) == -180
-        widx = np.where(np.diff(np.sign(arg(sys.omega))))[0]
-        widx = widx[np.real(sys._evalfr(sys.omega[widx])[0][0]) <= 0]
-        w_180 = np.array(
-            [ sp.optimize.brentq(arg, sys.omega[i], sys.omega[i+1])
-              for i in widx if i+1 < len(sys.omega) ])
-
-        # find all stab margins?
-        widx = np.where(np.diff(np.sign(np.diff(dstab(sys.omega)))))[0]
-        wstab = np.array([ sp.optimize.minimize_scalar(
-                  dstab, bracket=(sys.omega[i], sys.omega[i+1])).x
-              for i in widx if i+1 < len(sys.omega) and
-              np.diff(np.diff(dstab(sys.omega[i-1:i+2])))[0] > 0 ])
-        wstab = wstab[(wstab >= sys.omega[0]) *
-                      (wstab <= sys.omega[-1])]
+        # sampled data, with the interpolated frd between the samples
+        w_180, wc, wstab = _sampled_margin_frequencies(
+            lambda w: sys._evalfr(w)[0][0], sys.omega, sys.fresp[0, 0, :])
+
+    return _select_margins(lambda w: sys._evalfr(w)[0][0],
+                           w_180, wc, wstab, returnall)
+
+
+def _sampled_minima(f, omega, fomega):
+    """Local minima of f from the sampled values fomega, refined as zeros
+    of the derivative of f between the neighbouring samples"""
+    df = np.diff(fomega)
+    k = np.where((df[:-1] < 0) * (df[1:] > 0))[0] + 1
 
+    def deriv(w):
+        h = 1e-6 * np.abs(w)
+        return (f(w + h) - f(w - h)) / h
 
+    a, b = omega[k - 1], omega[k + 1]
+    fa, fb = deriv(a), deriv(b)
+    ok = (fa < 0) * (fb > 0)
+    wmin = omega[k]
+    wmin[ok] = _secant(deriv, a[ok], b[ok], fa[ok], fb[ok])
+    return wmin
+
+
+def _sampled_margin_frequencies(respfun, omega, resp):
+    """Phase crossover, gain crossover and stability margin frequencies
+    from a sampled response resp on omega; the response is computed once
+    on the grid, crossings are located from sign changes and then all
+    refined together with respfun, which evaluates the response at an
+    array of frequencies"""
+    # gain crossings |H(jw)| = 1
+    wc = _frd_crossings(lambda w: np.abs(respfun(w)) - 1,
+                        omega, np.abs(resp) - 1)
+
+    # phase crossings ang(H(jw)) == -180; sign changes of the angle
+    # from a wrap at +/- 180 (crossing the positive real axis) are
+    # not brackets of a crossing
+    w_180 = _frd_crossings(lambda w: np.angle(-respfun(w)), omega,
+                           np.angle(-resp), resp.real <= 0)
+
+    # stability margins, minima of the distance to the -1 point
+    wstab = _sampled_minima(lambda w: np.abs(respfun(w) + 1.),
+                            omega, np.abs(resp + 1.))
+    return w_180, wc, wstab
+
+
+def _select_margins(respfun, w_180, wc, wstab, returnall):
+    """Margins at the crossover frequencies, all or the smallest ones"""
     # margins, as iterables, converted frdata and xferfcn calculations to
     # vector for this
     with np.errstate(all='ignore'):
-        gain_w_180 = np.abs(sys._evalfr(w_180)[0][0])
+        gain_w_180 = np.abs(respfun(w_180))
         GM = 1.0/gain_w_180
-    SM = np.abs(sys._evalfr(wstab)[0][0]+1)
-    PM = np.remainder(np.angle(sys._evalfr(wc)[0][0], deg=True), 360.0) - 180.0
-    
+    SM = np.abs(respfun(wstab)+1)
+    PM = np.remainder(np.angle(respfun(wc), deg=True), 360.0) - 180.0
+
     if returnall:
         return GM, PM, SM, w_180, wc, wstab
     else:
@@ -275,6 +529,124 @@ def stability_margins(sysdata, returnall=False, epsw=0.0):
             (not wstab.shape[0] and float('nan')) or wstab[SM==np.amin(SM)][0])
 
 
+def stability_margins_batch(syslist, epsw=0.0):
+    """Stability margins for a batch of SISO systems.
+
+    Computes the same (minimum) margins as :func:`stability_margins` for
+    every system, with the polynomial algebra done on all systems at once
+    and the crossover frequencies found as the eigenvalues of stacked
+    companion matrices.
+
+    Parameters
+    ----------
+    syslist: list of LTI systems, or (num, den) pair of 2D arrays
+        Linear SISO systems.  Alternatively, the numerator and
+        denominator coefficients of the transfer functions can be given
+        as arrays with one system per row (highest power first).
+    epsw: float, optional
+        Frequencies below this value (default 0.0) are considered static
+        gain, and not returned as margin.
+
+    Returns
+    -------
+    gm, pm, sm, wg, wp, ws: 1D arrays
+        Gain margin, phase margin, stability margin and the associated
+        frequencies for each system (see :func:`stability_margins`)
+
+    Examples
+    --------
+    >>> gains = np.linspace(0.5, 10, 1000)
+    >>> gm, pm, sm, wg, wp, ws = stability_margins_batch(
+    ...     (np.outer(gains, [1.]), np.tile([1., 3., 3., 1.], (1000, 1))))
+    """
+    if isinstance(syslist, tuple) and len(syslist) == 2 and \
+            not isinstance(syslist[0], LTI):
+        num = np.atleast_2d(np.asarray(syslist[0], dtype=float))
+        den = np.atleast_2d(np.asarray(syslist[1], dtype=float))
+    else:
+        tfs = [xferfcn._convert_to_transfer_function(sys) for sys in syslist]
+        for sys in tfs:
+            if not issiso(sys):
+                raise ValueError("Can only do margins for SISO system")
+        nnum = max(len(sys.num[0][0]) for sys in tfs)
+        nden = max(len(sys.den[0][0]) for sys in tfs)
+        num = np.array([np.pad(sys.num[0][0], (nnum - len(sys.num[0][0]), 0),
+                               'constant') for sys in tfs], dtype=float)
+        den = np.array([np.pad(sys.den[0][0], (nden - len(sys.den[0][0]), 0),
+                               'constant') for sys in tfs], dtype=float)
+    if num.shape[0] != den.shape[0]:
+        raise ValueError("Numerator and denominator arrays must have the "
+                         "same number of rows")
+
+    def response(w):
+        with np.errstate(all='ignore'):
+            return _bpolyval(num, 1.j*w) / _bpolyval(den, 1.j*w)
+
+    def real_roots(p, wmin, strict):
+        w = _broots(p)
+        keep = (np.imag(w) == 0) & ((np.real(w) > wmin) if strict
+                                    else (np.real(w) >= wmin))
+        return np.where(keep, np.real(w), np.nan)
+
+    # real and imaginary part polynomials in omega:
+    rnum, inum = _polyimsplit(num)
+    rden, iden = _polyimsplit(den)
+
+    # phase crossovers, keeping only crossings of the negative real axis
+    test_w_180 = _bpolyadd(_bpolymul(inum, rden), _bpolymul(rnum, -iden))
+    w_180 = real_roots(test_w_180, epsw, False)
+    resp_w_180 = response(np.nan_to_num(w_180))
+    w_180[~(np.real(resp_w_180) <= 0.0)] = np.nan
+    w_180.sort(axis=1)
+
+    # gain crossovers
+    test_wc = _bpolyadd(_bpolyadd(_bpolymul(rnum, rnum),
+                                  _bpolymul(inum, inum)),
+                        -_bpolyadd(_bpolymul(rden, rden),
+                                   _bpolymul(iden, iden)))
+    wc = real_roots(test_wc, epsw, True)
+    wc.sort(axis=1)
+
+    # minima of the distance to -1
+    test_wstabd = _bpolyadd(_bpolymul(rden, rden), _bpolymul(iden, iden))
+    rsum, isum = _bpolyadd(rnum, rden), _bpolyadd(inum, iden)
+    test_wstabn = _bpolyadd(_bpolymul(rsum, rsum), _bpolymul(isum, isum))
+    test_wstab = _bpolyadd(
+        _bpolymul(_bpolyder(test_wstabn), test_wstabd),
+        -_bpolymul(_bpolyder(test_wstabd), test_wstabn))
+    wstab = real_roots(test_wstab, epsw, True)
+    wstabplus = _bpolyval(_bpolyder(test_wstab), np.nan_to_num(wstab))
+    wstab[~(wstabplus > 0.)] = np.nan
+    wstab.sort(axis=1)
+
+    # margins at all candidate frequencies
+    with np.errstate(all='ignore'):
+        GM = 1.0/np.abs(response(np.nan_to_num(w_180)))
+        PM = np.remainder(np.angle(response(np.nan_to_num(wc)), deg=True),
+                          360.0) - 180.0
+        SM = np.abs(response(np.nan_to_num(wstab)) + 1)
+        gm_score = np.where(np.isnan(w_180) | np.isinf(GM), np.inf,
+                            np.abs(np.log(GM)))
+    pm_score = np.where(np.isnan(wc), np.inf, np.abs(PM))
+    SM[np.isnan(wstab)] = np.inf
+
+    # select the smallest margins (first one if there are ties)
+    rows = np.arange(num.shape[0])
+
+    def select(score, margin, w):
+        if not score.shape[1]:
+            return np.full(len(rows), np.inf), np.full(len(rows), np.nan)
+        idx = np.argmin(score, axis=1)
+        found = np.isfinite(score[rows, idx])
+        return (np.where(found, margin[rows, idx], np.inf),
+                np.where(found, w[rows, idx], np.nan))
+
+    gm, wg = select(gm_score, GM, w_180)
+    pm, wp = select(pm_score, PM, wc)
+    sm, ws = select(SM, SM, wstab)
+    return gm, pm, sm, wg, wp, ws
+
+
 # Contributed by Steffen Waldherr <waldherr@ist.uni-stuttgart.de>
 #! TODO - need to add test functions
 def phase_crossover_frequencies(sys):
@@ -368,3 +740,364 @@ def margin(*args):
             % len(args))
 
     return margin[0], margin[1], margin[3], margin[4]
+
+
+class LoopMargins(namedtuple('LoopMargins',
+                             ['gm', 'pm', 'sm', 'wg', 'wp', 'ws'])):
+    """Loop-at-a-time margins, as returned by stability_margins, with one
+    array element per loop."""
+    __slots__ = ()
+
+
+class DiskMargins(namedtuple('DiskMargins', ['alpha', 'gm', 'pm', 'omega'])):
+    """Symmetric disk margin alpha, with the gain margin (as a factor) and
+    the phase margin (degrees) it guarantees, and the frequency where the
+    disk margin is found."""
+    __slots__ = ()
+
+
+class MIMOMargins(namedtuple('MIMOMargins', ['loop', 'disk', 'multiloop'])):
+    """Result of mimo_margins: LoopMargins and DiskMargins for each loop
+    with the other loops closed, and DiskMargins for simultaneous
+    perturbations of all loops."""
+    __slots__ = ()
+
+
+def _disk_margins(peak, omega):
+    """DiskMargins from the peak of |S - 1/2| and its frequency"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = 1. / peak
+        gm = np.where(alpha < 2., (2. + alpha) / (2. - alpha), np.inf)
+    pm = np.degrees(2. * np.arctan(alpha / 2.))
+    return DiskMargins(alpha, gm, pm, omega)
+
+
+def mimo_margins(sys, omega=None):
+    """Loop-at-a-time and disk margins of a MIMO loop transfer function
+
+    The loop transfer function L is in negative feedback, u = -y, and
+    must be square.  All margins are computed from one frequency sweep of
+    L, with batched linear algebra on the response at all frequencies.
+
+    Breaking loop i with the other loops closed gives the loop transfer
+    function l_i = 1/S_ii - 1, with S = (I + L)^-1.  The gain, phase and
+    stability margins of each l_i are found as for frequency response
+    data in stability_margins.  The symmetric disk margin of loop i is
+    alpha_i = 1 / max |S_ii - 1/2|; it guarantees a simultaneous gain
+    and phase variation in that loop within the gain range
+    [(2 - alpha)/(2 + alpha), (2 + alpha)/(2 - alpha)] and the phase
+    range +/- 2 atan(alpha/2).  The multiloop disk margin uses the
+    largest singular value of S - I/2 instead, and is a lower bound for
+    independent perturbations of all loops at once.
+
+    Parameters
+    ----------
+    sys : LTI system
+        Square loop transfer function (StateSpace, TransferFunction or
+        FRD).
+    omega : array_like, optional
+        Frequencies for the sweep.  By default, the frequency data of an
+        FRD or an adaptive grid that resolves the resonances of sys (see
+        :func:`default_frequency_range`).
+
+    Returns
+    -------
+    margins : MIMOMargins
+        `loop` (LoopMargins) and `disk` (DiskMargins) have arrays with
+        one element per loop; `multiloop` (DiskMargins) has scalars.
+
+    Examples
+    --------
+    >>> L = ss([[-1, 0], [0, -2]], [[1, 0], [0, 1]], [[2, 0.5], [1, 4]],
+    ...        [[0, 0], [0, 0]])
+    >>> loop, disk, multiloop = mimo_margins(L)
+    """
+    if isinstance(sys, frdata.FRD):
+        # interpolate the data between the samples
+        sys = frdata.FRD(sys, smooth=True)
+        if omega is None:
+            omega = sys.omega
+    elif omega is None:
+        from .freqplot import default_frequency_range
+        omega = default_frequency_range(sys, adaptive=True)
+    omega = np.sort(np.asarray(omega, dtype=float))
+    if sys.inputs != sys.outputs:
+        raise ValueError("MIMO margins need a square loop transfer function")
+    nloops = sys.inputs
+    I = np.eye(nloops)
+
+    def sensitivity(w):
+        """S = (I + L)^-1, frequency first for the batched inverse"""
+        L = np.moveaxis(sys._evalfr(w), -1, 0)
+        return np.linalg.inv(I + L)
+
+    def loopresp(w, i):
+        """loop i broken, the other loops closed"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 1. / sensitivity(w)[:, i, i] - 1.
+
+    # one sweep of L; the crossings found on the grid are refined with
+    # the response of the loop at the new frequencies only
+    S = sensitivity(omega)
+    Sii = np.diagonal(S, axis1=1, axis2=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        loops = 1. / Sii - 1.
+    margins = []
+    for i in range(nloops):
+        respfun = lambda w, i=i: loopresp(w, i)
+        margins.append(_select_margins(
+            respfun, *_sampled_margin_frequencies(respfun, omega,
+                                                  loops[:, i]),
+            returnall=False))
+    loop = LoopMargins(*np.array(margins, dtype=float).reshape(nloops, 6).T)
+
+    # disk margins, from the peak of |S_ii - 1/2| and of sigma(S - I/2),
+    # refined between the samples next to the largest sample
+    def peak(f, fomega):
+        k = np.argmax(fomega)
+        if 0 < k < len(omega) - 1:
+            w = _sampled_minima(lambda w: -f(w), omega[k-1:k+2],
+                                -fomega[k-1:k+2])
+            if len(w):
+                return f(w)[0], w[0]
+        return fomega[k], omega[k]
+
+    peaks = [peak(lambda w, i=i: np.abs(sensitivity(w)[:, i, i] - 0.5),
+                  np.abs(Sii[:, i] - 0.5)) for i in range(nloops)]
+    disk = _disk_margins(*np.array(peaks, dtype=float).reshape(nloops, 2).T)
+    multiloop = _disk_margins(*peak(
+        lambda w: np.linalg.svd(sensitivity(w) - 0.5*I,
+                                compute_uv=False)[:, 0],
+        np.linalg.svd(S - 0.5*I, compute_uv=False)[:, 0]))
+    multiloop = DiskMargins(*[float(m) for m in multiloop])
+
+    return MIMOMargins(loop, disk, multiloop)
+
+
+class NyquistStability(namedtuple('NyquistStability',
+                                  ['encirclements', 'open_loop_unstable',
+                                   'closed_loop_unstable', 'contour',
+                                   'response'])):
+    """Result of nyquist_stability: the number of clockwise encirclements
+    of -1 (N), of unstable open loop poles (P) and of unstable closed loop
+    poles (Z = N + P), together with the sampled contour and the open loop
+    response on it."""
+    __slots__ = ()
+
+
+def nyquist_stability(sys, indent_radius=1e-4, max_angle=np.pi/4.,
+                      max_points=20000):
+    """Closed loop stability from the Nyquist criterion
+
+    Counts the encirclements of -1 by the open loop response along the
+    Nyquist contour, and from these the number of unstable closed loop
+    poles for negative unity feedback.  The closed loop system itself is
+    not formed.
+
+    The contour is the imaginary axis (or the unit circle for discrete
+    time systems), with small semicircular indentations around open
+    loop poles on the contour, so that these count as stable.  Points
+    are added adaptively until the phase of det(I + L) changes by less
+    than max_angle between neighbouring points, which makes the
+    (vectorised) winding number computation reliable.
+
+    Parameters
+    ----------
+    sys : StateSpace or TransferFunction
+        Open loop system L, with equal numbers of inputs and outputs.
+        For MIMO systems, the generalized Nyquist criterion is applied to
+        det(I + L).
+    indent_radius : float
+        Radius of the indentations around poles on the contour
+    max_angle : float
+        Maximum phase change (in radians) between contour points
+    max_points : int
+        Maximum number of points on the upper half of the contour
+
+    Returns
+    -------
+    result : NyquistStability
+        Named tuple (encirclements, open_loop_unstable,
+        closed_loop_unstable, contour, response); the contour points
+        cover the upper half of the contour, ordered by increasing
+        frequency, and response holds L at these points as an
+        outputs x inputs x points array.
+
+    Examples
+    --------
+    >>> sys = tf([20], [1, 3, 3, 1])
+    >>> N, P, Z, contour, response = nyquist_stability(sys)
+    >>> Z
+    2
+    """
+    if not isinstance(sys, (xferfcn.TransferFunction, StateSpace)):
+        raise TypeError("nyquist_stability requires a StateSpace or "
+                        "TransferFunction system")
+    if sys.inputs != sys.outputs:
+        raise ValueError("nyquist_stability requires a system with the "
+                         "same number of inputs and outputs")
+
+    dtime = isdtime(sys, strict=True)
+    poles = np.atleast_1d(sys.pole())
+    try:
+        zeros = np.atleast_1d(sys.zero())
+    except NotImplementedError:
+        zeros = np.array([])
+
+    # Open loop poles on the contour are indented around; the others are
+    # either stable or unstable
+    if dtime:
+        dist = np.abs(poles) - 1.
+    else:
+        dist = poles.real
+    on_contour = np.abs(dist) <= 1e-8 * np.maximum(1., np.abs(poles))
+    n_unstable = int(np.sum((dist > 0) & ~on_contour))
+
+    # Positions of the indentations along the upper half of the contour
+    if dtime:
+        centers = np.angle(poles[on_contour & (poles.imag >= 0)])
+        end = math.pi
+    else:
+        centers = poles[on_contour & (poles.imag >= 0)].imag
+        features = np.abs(np.concatenate((poles, zeros)))
+        features = features[features > 0]
+        wmax = features.max() if len(features) else 1.
+        end = 10. ** (math.ceil(math.log10(max(wmax, 1.))) + 3)
+    centers = np.unique(np.abs(np.round(centers, 10)))
+    eps = indent_radius
+    if len(centers) > 1:
+        eps = min(eps, 0.25 * np.diff(centers).min())
+
+    seeds = _nyquist_seeds(poles, zeros, dtime, end)
+    segments, seg, u = _nyquist_contour(centers, eps, end, dtime, seeds)
+
+    def evaluate(seg, u):
+        kind, center, normal = (segments[0][seg], segments[1][seg],
+                                segments[2][seg])
+        if dtime:
+            point = np.exp(1j * u)
+        else:
+            point = 1j * u
+        s = np.where(kind == 0, point, center + eps * normal * np.exp(1j * u))
+        L = sys.horner(s)
+        F = np.linalg.det(np.moveaxis(L, -1, 0) + np.eye(sys.inputs))
+        return s, L, F
+
+    s, L, F = evaluate(seg, u)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        while True:
+            # refine the intervals over which the phase changes too much
+            dphase = np.angle(F[1:] / F[:-1])
+            refine = (seg[1:] == seg[:-1]) & ~(np.abs(dphase) <= max_angle)
+            nrefine = np.count_nonzero(refine)
+            if not nrefine:
+                break
+            if len(u) + nrefine > max_points:
+                warn("nyquist_stability: maximum number of contour points "
+                     "reached; the encirclement count may be inaccurate")
+                break
+
+            idx = np.nonzero(refine)[0]
+            ua, ub = u[idx], u[idx + 1]
+            geometric = (segments[0][seg[idx]] == 0) & (ua > 0) & (not dtime)
+            mid = np.where(geometric, np.sqrt(np.abs(ua * ub)),
+                           0.5 * (ua + ub))
+            s_new, L_new, F_new = evaluate(seg[idx], mid)
+
+            seg = np.insert(seg, idx + 1, seg[idx])
+            u = np.insert(u, idx + 1, mid)
+            s = np.insert(s, idx + 1, s_new)
+            L = np.insert(L, idx + 1, L_new, axis=-1)
+            F = np.insert(F, idx + 1, F_new)
+
+        if not np.all(np.isfinite(F)) or np.any(F == 0):
+            warn("nyquist_stability: closed loop pole on the contour")
+
+        # Winding number of det(I + L) around the origin along the whole
+        # contour; the lower half is the complex conjugate of the upper half
+        full = np.concatenate((np.conj(F[::-1]), F, np.conj(F[-1:])))
+        winding = np.sum(np.angle(full[1:] / full[:-1])) / (2. * math.pi)
+
+    encirclements = -int(np.round(winding))
+    return NyquistStability(encirclements, n_unstable,
+                            encirclements + n_unstable, s, L)
+
+
+def _nyquist_seeds(poles, zeros, dtime, end):
+    """Initial boundary points around the resonances of the system"""
+    features = np.concatenate((poles, zeros))
+    features = features[features.imag >= 0]
+    offsets = np.array([-3., -1., -0.3, 0., 0.3, 1., 3.])
+    if dtime:
+        features = features[features != 0]
+        center = np.angle(features)
+        width = np.abs(np.log(np.abs(features)))
+    else:
+        center = features.imag
+        width = np.abs(features.real)
+    seeds = (center[:, np.newaxis] +
+             width[:, np.newaxis] * offsets).ravel()
+    return seeds[(seeds > 0) & (seeds < end)]
+
+
+def _nyquist_contour(centers, eps, end, dtime, seeds):
+    """Segments and initial points of the upper half Nyquist contour
+
+    The contour is made of boundary segments (kind 0, parameterized by
+    the frequency or the angle on the unit circle) and indentations
+    (kind 1, parameterized by the angle around the indented pole).
+    Returns the (kind, center, outward normal) table of the segments and
+    the segment index and parameter of every point.
+    """
+    kinds, cents, normals = [], [], []
+    seg, u = [], []
+
+    def boundary(a, b):
+        if dtime:
+            pts = np.linspace(a, b, 101)
+        else:
+            lo = max(a, 1e-3 * min(b, 1.))
+            pts = np.logspace(math.log10(lo), math.log10(b),
+                              int(10 * math.log10(b / lo)) + 2)
+            if a == 0:
+                pts = np.concatenate(([0.], pts))
+            else:
+                pts[0] = a
+        pts = np.union1d(pts, seeds[(seeds > a) & (seeds < b)])
+        kinds.append(0)
+        cents.append(0.)
+        normals.append(1.)
+        seg.append(np.full(len(pts), len(kinds) - 1))
+        u.append(pts)
+
+    def indentation(x, phi0, phi1):
+        if dtime:
+            center = normal = np.exp(1j * x)
+        else:
+            center, normal = 1j * x, 1.
+        kinds.append(1)
+        cents.append(center)
+        normals.append(normal)
+        seg.append(np.full(9, len(kinds) - 1))
+        u.append(np.linspace(phi0, phi1, 9))
+
+    start = 0.
+    for x in centers:
+        if x == 0:
+            indentation(0., 0., math.pi / 2.)
+            start = eps
+            continue
+        if x >= end - eps:
+            boundary(start, end - eps)
+            indentation(end, -math.pi / 2., 0.)
+            start = None
+            break
+        boundary(start, x - eps)
+        indentation(x, -math.pi / 2., math.pi / 2.)
+        start = x + eps
+    if start is not None:
+        boundary(start, end)
+
+    segments = (np.array(kinds), np.array(cents, dtype=complex),
+                np.array(normals, dtype=complex))
+    return segments, np.concatenate(seg), np.concatenate(u)
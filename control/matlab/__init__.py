@@ -70,7 +70,7 @@ from ..exception import ControlArgument
 
 # Import MATLAB-like functions that can be used as-is
 from ..ctrlutil import *
-from ..freqplot import nyquist, gangof4
+from ..freqplot import nyquist, gangof4, sigma
 from ..nichols import nichols
 from ..bdalg import *
 from ..pzmap import *
@@ -214,7 +214,7 @@ Frequency-domain analysis
 ==  ==========================  ============================================
 \*  :func:`bode`                Bode plot of the frequency response
 \   lti/bodemag                 Bode magnitude diagram only
-\   sigma                       singular value frequency plot
+\*  :func:`~control.sigma`      singular value frequency plot
 \*  :func:`~control.nyquist`    Nyquist plot
 \*  :func:`~control.nichols`    Nichols plot
 \*  :func:`margin`              gain and phase margins
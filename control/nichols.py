@@ -53,9 +53,14 @@ import scipy as sp
 import numpy as np
 import matplotlib.pyplot as plt
 from .ctrlutil import unwrap
-from .freqplot import default_frequency_range
+from .lti import freqresp
+from .freqplot import default_frequency_range, _line_collection, \
+    _add_collection
+from collections import namedtuple
+from matplotlib.collections import LineCollection
 
-__all__ = ['nichols_plot', 'nichols', 'nichols_grid']
+__all__ = ['nichols_plot', 'nichols', 'nichols_grid', 'nichols_response',
+           'nichols_render', 'NicholsResponse']
 
 
 def nichols_plot(sys_list, omega=None, grid=True):
@@ -81,13 +86,57 @@ def nichols_plot(sys_list, omega=None, grid=True):
     if not getattr(sys_list, '__iter__', False):
         sys_list = (sys_list,)
 
+    for x, y, omega in nichols_response(sys_list, omega):
+        # Generate the plot
+        plt.plot(x, y)
+
+    plt.xlabel('Phase (deg)')
+    plt.ylabel('Magnitude (dB)')
+    plt.title('Nichols Plot')
+
+    # Mark the -180 point
+    plt.plot([-180], [0], 'r+')
+
+    # Add grid
+    if grid:
+        nichols_grid()
+
+
+class NicholsResponse(namedtuple('NicholsResponse',
+                                 ['phase', 'mag', 'omega'])):
+    """Nichols data for a SISO system: unwrapped phase in degrees,
+    magnitude in dB and the frequencies in rad/sec."""
+    __slots__ = ()
+
+
+def nichols_response(sys_list, omega=None):
+    """Nichols data for a list of systems, without any plotting
+
+    Parameters
+    ----------
+    sys_list : list of LTI, or LTI
+        List of linear input/output systems (single system is OK)
+    omega : array_like
+        Range of frequencies (list or bounds) in rad/sec
+
+    Returns
+    -------
+    response : NicholsResponse (list if sys_list is a list)
+        Named tuple (phase, mag, omega) for each system
+    """
+    # If argument was a singleton, turn it into a list
+    single = not getattr(sys_list, '__iter__', False)
+    if single:
+        sys_list = (sys_list,)
+
     # Select a default range if none is provided
     if omega is None:
         omega = default_frequency_range(sys_list)
 
+    responses = []
     for sys in sys_list:
         # Get the magnitude and phase of the system
-        mag_tmp, phase_tmp, omega = sys.freqresp(omega)
+        mag_tmp, phase_tmp, omega = freqresp(sys, omega)
         mag = np.squeeze(mag_tmp)
         phase = np.squeeze(phase_tmp)
 
@@ -95,21 +144,58 @@ def nichols_plot(sys_list, omega=None, grid=True):
         # and magnitude in dB)
         x = unwrap(sp.degrees(phase), 360)
         y = 20*sp.log10(mag)
+        responses.append(NicholsResponse(x, y, omega))
 
-        # Generate the plot
-        plt.plot(x, y)
+    return responses[0] if single else responses
 
-    plt.xlabel('Phase (deg)')
-    plt.ylabel('Magnitude (dB)')
-    plt.title('Nichols Plot')
+
+def nichols_render(responses, max_points=None, grid=True, ax=None,
+                   **kwargs):
+    """Draw Nichols data for any number of systems
+
+    Parameters
+    ----------
+    responses : NicholsResponse or list of NicholsResponse
+        Data computed by :func:`nichols_response`
+    max_points : int, optional
+        If given, each curve is decimated to about this many points,
+        keeping the local extrema
+    grid : boolean, optional
+        True if the plot should include a Nichols-chart grid. Default is True.
+    ax : matplotlib Axes, optional
+        Axes to draw into (default: current axes)
+    \**kwargs:
+        Additional options to matplotlib LineCollection (colors,
+        linewidths, etc)
+
+    Returns
+    -------
+    ax : matplotlib Axes
+        The axes that were drawn into
+    """
+    if isinstance(responses, NicholsResponse):
+        responses = [responses]
+    if ax is None:
+        ax = plt.gca()
+    else:
+        plt.sca(ax)
+
+    curves = [(x, y) for x, y, omega in responses]
+    _add_collection(ax, _line_collection(curves, max_points, **kwargs))
+
+    ax.set_xlabel('Phase (deg)')
+    ax.set_ylabel('Magnitude (dB)')
+    ax.set_title('Nichols Plot')
 
     # Mark the -180 point
-    plt.plot([-180], [0], 'r+')
+    ax.plot([-180], [0], 'r+')
 
     # Add grid
     if grid:
         nichols_grid()
 
+    return ax
+
 
 def nichols_grid(cl_mags=None, cl_phases=None, line_style='dotted'):
     """Nichols chart grid
@@ -171,15 +257,8 @@ def nichols_grid(cl_mags=None, cl_phases=None, line_style='dotted'):
     else:
         assert ((-360.0 < np.min(cl_phases)) and (np.max(cl_phases) < 0.0))
 
-    # Find the M-contours
-    m = m_circles(cl_mags, phase_min=np.min(cl_phases), phase_max=np.max(cl_phases))
-    m_mag = 20*sp.log10(np.abs(m))
-    m_phase = sp.mod(sp.degrees(sp.angle(m)), -360.0)  # Unwrap
-
-    # Find the N-contours
-    n = n_circles(cl_phases, mag_min=np.min(cl_mags), mag_max=np.max(cl_mags))
-    n_mag = 20*sp.log10(np.abs(n))
-    n_phase = sp.mod(sp.degrees(sp.angle(n)), -360.0)  # Unwrap
+    m_phase, m_mag, n_phase, n_mag = _nichols_grid_contours(cl_mags,
+                                                            cl_phases)
 
     # Plot the contours behind other plot elements.
     # The "phase offset" is used to produce copies of the chart that cover
@@ -191,13 +270,17 @@ def nichols_grid(cl_mags=None, cl_phases=None, line_style='dotted'):
     phase_offset_max = 360.0*np.ceil(ol_phase_max/360.0) + 360.0
     phase_offsets = np.arange(phase_offset_min, phase_offset_max, 360.0)
 
-    for phase_offset in phase_offsets:
-        # Draw M and N contours
-        plt.plot(m_phase + phase_offset, m_mag, color='lightgray',
-                 linestyle=line_style, zorder=0)
-        plt.plot(n_phase + phase_offset, n_mag, color='lightgray',
-                 linestyle=line_style, zorder=0)
+    # Draw the M and N contours for all phase offsets as one collection
+    contours = [np.column_stack((phase, mag)) for phase, mag in
+                zip(np.hstack((m_phase, n_phase)).T,
+                    np.hstack((m_mag, n_mag)).T)]
+    segments = [contour + [phase_offset, 0.] for phase_offset in phase_offsets
+                for contour in contours]
+    plt.gca().add_collection(
+        LineCollection(segments, colors='lightgray', linestyles=line_style,
+                       zorder=0), autolim=False)
 
+    for phase_offset in phase_offsets:
         # Add magnitude labels
         for x, y, m in zip(m_phase[:][-1] + phase_offset, m_mag[:][-1], cl_mags):
             align = 'right' if m < 0.0 else 'left'
@@ -214,6 +297,52 @@ def nichols_grid(cl_mags=None, cl_phases=None, line_style='dotted'):
 # generating Nichols plots
 #
 
+# Cache of Nichols chart contours, keyed by the closed loop magnitudes and
+# phases (which also set the ranges of the contours)
+_nichols_grid_cache = {}
+_nichols_grid_cache_size = 32
+
+
+def _nichols_grid_contours(cl_mags, cl_phases):
+    """M- and N-contours of a Nichols chart, in Nichols coordinates
+
+    Both sets of contours are computed in a single evaluation of
+    closed_loop_contours.  The results are cached and returned as
+    read-only arrays (m_phase, m_mag, n_phase, n_mag), with one column
+    per contour.
+    """
+    cl_mags = np.asarray(cl_mags, dtype=float)
+    cl_phases = np.asarray(cl_phases, dtype=float)
+    key = (tuple(cl_mags), tuple(cl_phases))
+    contours = _nichols_grid_cache.get(key)
+    if contours is not None:
+        return contours
+
+    # Closed loop magnitude and phase grids for the M-contours (constant
+    # magnitude) and the N-contours (constant phase), side by side
+    m_phases = sp.radians(sp.linspace(np.min(cl_phases), np.max(cl_phases),
+                                      2000))
+    n_mags = sp.linspace(10**(np.min(cl_mags)/20.0),
+                         10**(np.max(cl_mags)/20.0), 2000)
+    nm = len(cl_mags)
+    Gcl_mags = np.hstack((np.tile(10.0**(cl_mags/20.0), (2000, 1)),
+                          np.tile(n_mags[:, np.newaxis], (1, len(cl_phases)))))
+    Gcl_phases = np.hstack((np.tile(m_phases[:, np.newaxis], (1, nm)),
+                            np.tile(sp.radians(cl_phases), (2000, 1))))
+    Gol = closed_loop_contours(Gcl_mags, Gcl_phases)
+
+    mag = 20*np.log10(np.abs(Gol))
+    phase = np.mod(np.degrees(np.angle(Gol)), -360.0)  # Unwrap
+    contours = (phase[:, :nm], mag[:, :nm], phase[:, nm:], mag[:, nm:])
+    for a in contours:
+        a.setflags(write=False)
+
+    if len(_nichols_grid_cache) >= _nichols_grid_cache_size:
+        _nichols_grid_cache.clear()
+    _nichols_grid_cache[key] = contours
+    return contours
+
+
 
 def closed_loop_contours(Gcl_mags, Gcl_phases):
     """Contours of the function Gcl = Gol/(1+Gol), where
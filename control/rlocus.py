@@ -50,20 +50,29 @@ import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
 from scipy import array, poly1d, row_stack, zeros_like, real, imag
+import scipy.linalg
 import scipy.signal             # signal processing toolbox
+from scipy.optimize import linear_sum_assignment
 import pylab                    # plotting routines
 from .xferfcn import _convert_to_transfer_function
+from .statesp import StateSpace
 from .exception import ControlMIMONotImplemented
 from .sisotool import _SisotoolUpdate
 from functools import partial
+from collections import namedtuple
 from .lti import isdtime
+from .margins import _broots
 from .grid import sgrid, zgrid, nogrid
 
-__all__ = ['root_locus', 'rlocus']
+__all__ = ['root_locus', 'rlocus', 'RootLocusIndex']
+
+# SISO state space systems with up to this many states are converted to
+# polynomials for the root locus; the roots of larger ones lose accuracy
+_RL_POLY_STATES = 8
 
 # Main function: compute a root locus diagram
 def root_locus(sys, kvect=None, xlim=None, ylim=None, plotstr='b' if int(matplotlib.__version__[0]) == 1 else 'C0', Plot=True,
-               PrintGain=True, grid=False, **kwargs):
+               PrintGain=True, grid=False, gain_direction=None, **kwargs):
 
     """Root locus plot
 
@@ -71,10 +80,16 @@ def root_locus(sys, kvect=None, xlim=None, ylim=None, plotstr='b' if int(matplot
     where TF is self.num(s)/self.den(s) and each k is an element
     of kvect.
 
+    State space systems are handled without conversion to polynomials,
+    unless they are SISO systems of at most 8 states without a
+    gain_direction: the closed loop poles for the feedback u = -k K0 y are
+    the eigenvalues of A - k B K0 (I + k D K0)^-1 C.  For MIMO systems,
+    the gain is swept along the direction K0.
+
     Parameters
     ----------
     sys : LTI object
-        Linear input/output systems (SISO only, for now)
+        Linear input/output systems (MIMO allowed for StateSpace systems)
     kvect : list or ndarray, optional
         List of gains to use in computing diagram
     xlim : tuple or list, optional
@@ -88,6 +103,10 @@ def root_locus(sys, kvect=None, xlim=None, ylim=None, plotstr='b' if int(matplot
         calculate gain, damping and print
     grid: boolean (default = False)
         If True plot omega-damping grid.
+    gain_direction : array_like, optional
+        Gain matrix K0 (inputs x outputs) along which the feedback gain is
+        swept, for StateSpace systems.  Defaults to the identity, which
+        requires a square system.
 
     Returns
     -------
@@ -97,19 +116,36 @@ def root_locus(sys, kvect=None, xlim=None, ylim=None, plotstr='b' if int(matplot
         Gains used.  Same as klist keyword argument if provided.
     """
 
-    # Convert numerator and denominator to polynomials if they aren't
-    (nump, denp) = _systopoly1d(sys)
+    # Check for sisotool mode
+    sisotool = False if 'sisotool' not in kwargs else True
 
-    if kvect is None:
-        start_mat = _RLFindRoots(nump, denp, [1])
-        kvect, mymat, xlim, ylim = _default_gains(nump, denp, xlim, ylim)
+    # State space systems are solved as eigenvalue problems, except for
+    # small SISO systems, whose polynomials are accurate enough
+    statespace = isinstance(sys, StateSpace) and not sisotool and \
+        (not sys.issiso() or gain_direction is not None or
+         sys.states > _RL_POLY_STATES)
+    if statespace:
+        K0 = _gain_direction(sys, gain_direction)
+        if kvect is None:
+            kvect, mymat, xlim, ylim = _ss_default_gains(sys, K0, xlim, ylim)
+        else:
+            mymat = _RLFindRootsSS(sys, K0, kvect)
+            mymat = _RLSortRoots(mymat)
+    elif gain_direction is not None and not isinstance(sys, StateSpace):
+        raise ValueError("gain_direction is only supported for StateSpace "
+                         "systems")
     else:
-        start_mat = _RLFindRoots(nump, denp, [kvect[0]])
-        mymat = _RLFindRoots(nump, denp, kvect)
-        mymat = _RLSortRoots(mymat)
+        # Convert numerator and denominator to polynomials if they aren't
+        (nump, denp) = _systopoly1d(sys)
 
-    # Check for sisotool mode
-    sisotool = False if 'sisotool' not in kwargs else True
+        if kvect is None:
+            start_mat = _RLFindRoots(nump, denp, [1])
+            kvect, mymat, xlim, ylim = _default_gains(
+                nump, denp, xlim, ylim, dtime=isdtime(sys, strict=True))
+        else:
+            start_mat = _RLFindRoots(nump, denp, [kvect[0]])
+            mymat = _RLFindRoots(nump, denp, kvect)
+            mymat = _RLSortRoots(mymat)
 
     # Create the Plot
     if Plot:
@@ -128,9 +164,12 @@ def root_locus(sys, kvect=None, xlim=None, ylim=None, plotstr='b' if int(matplot
             f = pylab.figure(new_figure_name)
             ax = pylab.axes()
 
+        # the gains of state space loci are read off the computed locus
         if PrintGain and sisotool == False:
+            index = RootLocusIndex(mymat, kvect, sys.dt) \
+                if statespace else None
             f.canvas.mpl_connect(
-                'button_release_event', partial(_RLClickDispatcher,sys=sys, fig=f,ax_rlocus=f.axes[0],plotstr=plotstr))
+                'button_release_event', partial(_RLClickDispatcher,sys=sys, fig=f,ax_rlocus=f.axes[0],plotstr=plotstr,index=index))
 
         elif sisotool == True:
             f.axes[1].plot([root.real for root in start_mat], [root.imag for root in start_mat], 'm.', marker='s', markersize=8,zorder=20,label='gain_point')
@@ -139,11 +178,18 @@ def root_locus(sys, kvect=None, xlim=None, ylim=None, plotstr='b' if int(matplot
                 'button_release_event',partial(_RLClickDispatcher,sys=sys, fig=f,ax_rlocus=f.axes[1],plotstr=plotstr, sisotool=sisotool, bode_plot_params=kwargs['bode_plot_params'],tvect=kwargs['tvect']))
 
         # plot open loop poles
-        poles = array(denp.r)
+        if statespace:
+            poles = np.linalg.eigvals(np.asarray(sys.A)) if sys.states \
+                else np.array([])
+        else:
+            poles = array(denp.r)
         ax.plot(real(poles), imag(poles), 'x')
 
         # plot open loop zeros
-        zeros = array(nump.r)
+        if statespace:
+            zeros = _ss_zeros(sys, K0)
+        else:
+            zeros = array(nump.r)
         if zeros.size > 0:
             ax.plot(real(zeros), imag(zeros), 'o')
 
@@ -169,19 +215,26 @@ def root_locus(sys, kvect=None, xlim=None, ylim=None, plotstr='b' if int(matplot
     return mymat, kvect
 
 
-def _default_gains(num, den, xlim, ylim,zoom_xlim=None,zoom_ylim=None):
+def _default_gains(num, den, xlim, ylim,zoom_xlim=None,zoom_ylim=None,
+                   dtime=False):
     """Unsupervised gains calculation for root locus plot.
 
+    The gains at the break points and at the stability boundary crossings
+    are used as anchors for the continuation, which places the other
+    points where the branches need them.
+
     References:
      Ogata, K. (2002). Modern control engineering (4th ed.). Upper Saddle River, NJ : New Delhi: Prentice Hall.."""
 
-    k_break, real_break = _break_points(num, den)
-    kmax = _k_max(num, den, real_break, k_break)
-    kvect = np.hstack((np.linspace(0, kmax, 50), np.real(k_break)))
-    kvect.sort()
+    features = _RLPrecompute(num, den, dtime)
+    k_break, real_break = features.k_break, features.real_break
+    kmax = _k_max(num, den, features)
+    kvect = np.hstack((0., np.real(k_break), features.k_cross, kmax))
+    kvect = np.unique(kvect[kvect >= 0])
 
-    mymat = _RLFindRoots(num, den, kvect)
-    mymat = _RLSortRoots(mymat)
+    # the axis limits come from one batch of roots over the whole range
+    mymat = _RLFindRoots(num, den, np.union1d(
+        kvect, np.linspace(0, kvect[-1], 50)))
     open_loop_poles = den.roots
     open_loop_zeros = num.roots
 
@@ -222,70 +275,328 @@ def _default_gains(num, den, xlim, ylim,zoom_xlim=None,zoom_ylim=None):
     else:
         y_tolerance = 0.05 * (ylim[1] - ylim[0])
 
-    tolerance = np.min([x_tolerance, y_tolerance])
-    indexes_too_far = _indexes_filt(mymat,tolerance,zoom_xlim,zoom_ylim)
-
-    while (len(indexes_too_far) > 0) and (kvect.size < 5000):
-        for counter,index in enumerate(indexes_too_far):
-            index = index + counter*3
-            new_gains = np.linspace(kvect[index], kvect[index + 1], 5)
-            new_points = _RLFindRoots(num, den, new_gains[1:4])
-            kvect = np.insert(kvect, index + 1, new_gains[1:4])
-            mymat = np.insert(mymat, index + 1, new_points, axis=0)
-
-        mymat = _RLSortRoots(mymat)
-        indexes_too_far = _indexes_filt(mymat,tolerance,zoom_xlim,zoom_ylim)
+    # a locus on the real axis has no extent in y
+    tolerance = np.min([x_tolerance, y_tolerance]) if y_tolerance > 0 \
+        else x_tolerance
+    kvect, mymat = _RLContinuation(num, den, kvect, tolerance,
+                                   zoom_xlim, zoom_ylim)
 
     new_gains = kvect[-1] * np.hstack((np.logspace(0, 3, 4)))
     new_points = _RLFindRoots(num, den, new_gains[1:4])
     kvect = np.append(kvect, new_gains[1:4])
-    mymat = np.concatenate((mymat, new_points), axis=0)
-    mymat = _RLSortRoots(mymat)
+    new_points = _RLSortRoots(np.concatenate((mymat[-1:], new_points)))
+    mymat = np.concatenate((mymat, new_points[1:]), axis=0)
+    return kvect, mymat, xlim, ylim
+
+def _ss_default_gains(sys, K0, xlim, ylim):
+    """Unsupervised gains calculation for state space root locus plots.
+
+    As in _default_gains, a few anchor gains are followed with the
+    continuation, which places the other points where the branches need
+    them: zero, the gain at which the loop gain is about one, the gains
+    at which roots go to infinity (I + k D K0 singular) and a large gain
+    for the end of the locus."""
+
+    # gain scale from the loop gain at the open loop pole frequencies
+    A, B, C, D = (np.asarray(M, dtype=float) for M in
+                  (sys.A, sys.B, sys.C, sys.D))
+    L = np.dot(D, K0)
+    freqs = np.append(0., np.abs(np.linalg.eigvals(A))) if sys.states \
+        else np.array([0.])
+    gains = []
+    for w in freqs:
+        s = 1j * w if not isdtime(sys, strict=True) else np.exp(1j * w)
+        try:
+            G = np.dot(C, np.linalg.solve(s * np.eye(A.shape[0]) - A, B)) \
+                if sys.states else 0.
+        except np.linalg.LinAlgError:
+            continue
+        gains.append(np.linalg.norm(np.dot(G, K0) + L, 2))
+    gains = np.array(gains)
+    gains = gains[np.isfinite(gains) & (gains > 0)]
+    k0 = 1. / np.max(gains) if gains.size else 1.
+
+    # anchors; I + k D K0 is singular for k = -1/lambda(D K0)
+    lam = np.linalg.eigvals(L) if L.size else np.array([])
+    lam = lam[(np.abs(lam.imag) <= 1e-10 * np.abs(lam)) & (lam.real < 0)]
+    kmax = 100. * max([k0] + list(-1. / lam.real))
+    kvect = np.unique(np.hstack((0., k0, -1. / lam.real, kmax)))
+
+    # the axis limits come from one batch of roots over the whole range
+    mymat = _RLFindRootsSS(sys, K0, np.union1d(
+        kvect, kmax * np.logspace(-4, 0, 50)))
+    finite = mymat[np.isfinite(mymat)]
+    if finite.size == 0:
+        finite = np.zeros(1)
+    if xlim is None:
+        xlim = _ax_lim(finite)
+    if ylim is None:
+        ylim = _ax_lim(finite * 1j)
+    x_tolerance = 0.05 * (xlim[1] - xlim[0])
+    y_tolerance = 0.05 * (ylim[1] - ylim[0])
+    tolerance = np.min([x_tolerance, y_tolerance]) if y_tolerance > 0 \
+        else x_tolerance
+    kvect, mymat = _RLContinuationSS(sys, K0, kvect, tolerance)
+
+    new_gains = kvect[-1] * np.logspace(0, 3, 4)[1:]
+    new_points = _RLFindRootsSS(sys, K0, new_gains)
+    kvect = np.append(kvect, new_gains)
+    new_points = _RLSortRoots(np.concatenate((mymat[-1:], new_points)))
+    mymat = np.concatenate((mymat, new_points[1:]), axis=0)
     return kvect, mymat, xlim, ylim
 
-def _indexes_filt(mymat,tolerance,zoom_xlim=None,zoom_ylim=None):
-    """Calculate the distance between points and return the indexes.
-    Filter the indexes so only the resolution of points within the xlim and ylim is improved when zoom is used"""
-    distance_points = np.abs(np.diff(mymat, axis=0))
-    indexes_too_far = list(np.unique(np.where(distance_points > tolerance)[0]))
-
-    if zoom_xlim != None and zoom_ylim != None:
-        x_tolerance_zoom = 0.05 * (zoom_xlim[1] - zoom_xlim[0])
-        y_tolerance_zoom = 0.05 * (zoom_ylim[1] - zoom_ylim[0])
-        tolerance_zoom = np.min([x_tolerance_zoom, y_tolerance_zoom])
-        indexes_too_far_zoom = list(np.unique(np.where(distance_points > tolerance_zoom)[0]))
-        indexes_too_far_filtered = []
-
-        for index in indexes_too_far_zoom:
-            for point in mymat[index]:
-                if (zoom_xlim[0] <= point.real <= zoom_xlim[1]) and  (zoom_ylim[0] <= point.imag <= zoom_ylim[1]):
-                    indexes_too_far_filtered.append(index)
-                    break
-
-        # Check if the zoom box is not overshot and insert points where neccessary
-        if len(indexes_too_far_filtered) == 0 and len(mymat) <300:
-            limits = [zoom_xlim[0],zoom_xlim[1],zoom_ylim[0],zoom_ylim[1]]
-            for index,limit in enumerate(limits):
-                if index <= 1:
-                    asign = np.sign(real(mymat)-limit)
+
+def _RLContinuation(num, den, kvect, tolerance, zoom_xlim=None,
+                    zoom_ylim=None, max_points=5000):
+    """Follow the root locus branches through the gains in kvect.
+
+    The roots of den + k*num are tracked with _RLFollow: the predictor is
+    an Euler step along dp/dk = -num(p) / (den'(p) + k*num'(p)), and the
+    corrector consists of Newton iterations at the new gain.
+    """
+    dnum, dden = num.deriv(), den.deriv()
+
+    def roots_at(k):
+        return _RLFindRoots(num, den, [k])[0]
+
+    def slope(p, k):
+        return -num(p) / (dden(p) + k * dnum(p))
+
+    def refine(pred, k):
+        pnew = pred
+        for i in range(8):
+            step = (den(pnew) + k * num(pnew)) / \
+                (dden(pnew) + k * dnum(pnew))
+            pnew = pnew - step
+            if (np.abs(step) <= 1e-10 * (1 + np.abs(pnew))).all():
+                break
+        return pnew, (np.abs(step) <= 1e-8 * (1 + np.abs(pnew))).all()
+
+    return _RLFollow(kvect, tolerance, roots_at, slope, refine,
+                     zoom_xlim, zoom_ylim, max_points)
+
+
+def _RLContinuationSS(sys, K0, kvect, tolerance, max_points=5000):
+    """Follow the branches of a state space root locus through the gains
+    in kvect.
+
+    The closed loop poles are tracked with _RLFollow: the predictor is
+    an Euler step along the eigenvalue derivatives dp/dk = w' dAcl/dk v /
+    (w' v), with dAcl/dk = -B K0 (I + k D K0)^-2 C, and the corrector
+    takes the eigenvalues at the new gain that match the prediction.
+    """
+    A, B, C, D = (np.asarray(M, dtype=float) for M in
+                  (sys.A, sys.B, sys.C, sys.D))
+    BK, DK = np.dot(B, K0), np.dot(D, K0)
+
+    def roots_at(k):
+        return _RLFindRootsSS(sys, K0, [k])[0]
+
+    def slope(p, k):
+        F = np.linalg.inv(np.eye(DK.shape[0]) + k * DK)
+        Acl = A - k * np.dot(BK, np.dot(F, C))
+        dAcl = -np.dot(BK, np.dot(np.dot(F, F), C))
+        lam, V = np.linalg.eig(Acl)
+        dlam = np.diag(np.linalg.solve(V, np.dot(dAcl, V)))
+        # in the order of the roots p
+        order = linear_sum_assignment(np.abs(p[:, np.newaxis] - lam))[1]
+        return dlam[order]
+
+    def refine(pred, k):
+        return _RLSortRoots(np.vstack((pred, roots_at(k))))[1], True
+
+    return _RLFollow(kvect, tolerance, roots_at, slope, refine,
+                     max_points=max_points)
+
+
+def _RLFollow(kvect, tolerance, roots_at, slope, refine, zoom_xlim=None,
+              zoom_ylim=None, max_points=5000):
+    """Predictor-corrector continuation of root locus branches.
+
+    roots_at(k) gives the roots at gain k, slope(p, k) their derivatives
+    with respect to the gain, and refine(pred, k) the roots at gain k
+    near the predicted roots pred, together with whether it converged.
+    The gain step is chosen so that no root moves further than tolerance
+    (or the finer zoom tolerance inside the zoom box), so points are
+    dense where the locus is fast or curved and sparse elsewhere.  All
+    gains in kvect are kept.  Where a step fails (near multiple roots or
+    roots at infinity), the roots are found with roots_at and matched to
+    the branches instead.
+
+    Rows are collected in lists, so building the locus is linear in
+    the number of points.
+    """
+    kvect = np.sort(np.asarray(kvect, dtype=float))
+    zoom = zoom_xlim is not None and zoom_ylim is not None
+    if zoom:
+        zoom_tolerance = np.min([0.05 * (zoom_xlim[1] - zoom_xlim[0]),
+                                 0.05 * (zoom_ylim[1] - zoom_ylim[0])])
+        zoom_tolerance = min(zoom_tolerance, tolerance)
+
+    def local_tolerance(p):
+        """resolution at each of the roots p"""
+        if not zoom:
+            return tolerance
+        inside = (zoom_xlim[0] <= p.real) & (p.real <= zoom_xlim[1]) & \
+                 (zoom_ylim[0] <= p.imag) & (p.imag <= zoom_ylim[1])
+        return np.where(inside, zoom_tolerance, tolerance)
+
+    def eigen_step(p, k, kb, dk_min):
+        """roots from the eigenvalue solver at the first gain after k that
+        keeps the steps within the tolerance, matched to p; the gain step
+        is halved from dk_min down to dk_min/1000"""
+        dk = min(dk_min, kb - k)
+        while True:
+            knew = k + dk if dk < kb - k else kb
+            pnew = _RLSortRoots(np.vstack((p, roots_at(knew))))[1]
+            with np.errstate(invalid='ignore'):
+                step = np.abs(pnew - p)
+            step[~np.isfinite(step)] = 0.
+            if (step <= local_tolerance(p)).all() or dk <= 1e-3 * dk_min:
+                return knew, pnew
+            dk /= 2.
+
+    def correct(p, dpdk, dk, k):
+        """corrected roots from the predicted ones; None if the corrector
+        did not converge, moved further than the tolerance, ended up far
+        from the prediction (the locus is curved), or if two branches
+        ended up on the same root"""
+        with np.errstate(all='ignore'):
+            pred = p + dk * dpdk
+            pnew, converged = refine(pred, k)
+            eps = 1e-6 * (1 + np.abs(pnew).max())
+            merged = (np.abs(pnew[:, np.newaxis] - pnew) < eps) & \
+                (np.abs(p[:, np.newaxis] - p) >= 10 * eps)
+        tol = local_tolerance(p)
+        if np.isfinite(pnew).all() and not merged.any() and converged and \
+                (np.abs(pnew - pred) <= 0.25 * tol).all() and \
+                (np.abs(pnew - p) <= tol).all():
+            return pnew
+        return None
+
+    k = kvect[0]
+    p = roots_at(k)
+    klist, rows = [k], [p]
+    if not len(p):
+        return kvect, np.zeros((len(kvect), 0), dtype=complex)
+    for kb in kvect[1:]:
+        # minimum step; below it the eigenvalue solver takes over
+        dk_min = 1e-3 * (kb - k)
+        while k < kb:
+            with np.errstate(all='ignore'):
+                try:
+                    dpdk = slope(p, k)
+                except (np.linalg.LinAlgError, ValueError):
+                    dpdk = np.full(p.shape, np.nan)
+                speed = np.max(np.abs(dpdk) / local_tolerance(p))
+            if not np.isfinite(dpdk).all() or len(rows) >= max_points:
+                # roots at or near infinity or multiple roots, or enough
+                # points already: no refinement
+                if len(rows) >= max_points:
+                    knew = kb
+                    pnew = _RLSortRoots(np.vstack((p, roots_at(kb))))[1]
                 else:
-                    asign = np.sign(imag(mymat) - limit)
-                signchange = ((np.roll(asign, 1, axis=0) - asign) != 0).astype(int)
-                signchange[0] = np.zeros((len(mymat[0])))
-                if len(np.where(signchange ==1)[0]) > 0:
-                    indexes_too_far_filtered.append(np.where(signchange == 1)[0][0]-1)
+                    knew, pnew = eigen_step(p, k, kb, dk_min)
+            else:
+                # predictor step limited by the speed of the fastest root
+                dk = kb - k
+                if speed > 0:
+                    dk = min(dk, 1. / speed)
+                while True:
+                    if dk < dk_min:
+                        knew, pnew = eigen_step(p, k, kb, dk_min)
+                        break
+                    knew = k + dk if dk < kb - k else kb
+                    pnew = correct(p, dpdk, knew - k, knew)
+                    if pnew is not None:
+                        break
+                    dk /= 2.
+
+            k, p = knew, pnew
+            klist.append(k)
+            rows.append(p)
+
+    return np.array(klist), np.array(rows)
+
+class _RLFeatures(namedtuple('_RLFeatures',
+                              ['k_break', 'real_break', 'centroid', 'angles',
+                               'k_cross', 'cross'])):
+    """Structure of a root locus: gains and locations of the break points,
+    centroid and angles of the asymptotes, and gains and locations at
+    which the branches cross the stability boundary."""
+    __slots__ = ()
+
+
+def _RLPrecompute(num, den, dtime=False):
+    """Break points, asymptotes and stability boundary crossings of the
+    root locus of den + k*num, for positive gains"""
+    # break points on the real axis only
+    k_break, real_break = _break_points(num, den)
+    k_break, real_break = np.asarray(k_break), np.asarray(real_break)
+    if len(k_break) == len(real_break):
+        real = (np.abs(np.imag(k_break)) <= 1e-8 * (1 + np.abs(k_break))) & \
+            (np.abs(np.imag(real_break)) <=
+             1e-8 * (1 + np.abs(real_break)))
+        k_break, real_break = (np.real(k_break[real]),
+                               np.real(real_break[real])) if real.any() \
+            else (np.array([0.]), den.roots)
+
+    asymp_number = den.order - num.order
+    if asymp_number > 0:
+        centroid = np.real(np.sum(den.roots) - np.sum(num.roots)) / \
+            asymp_number
+        q = np.arange(asymp_number)
+        if den.coeffs[0] / num.coeffs[0] > 0:
+            angles = (2 * q + 1) * np.pi / asymp_number
+        else:
+            angles = 2 * q * np.pi / asymp_number
+    else:
+        centroid, angles = np.nan, np.array([])
 
-        if len(indexes_too_far_filtered) > 0 :
-            if indexes_too_far_filtered[0] != 0:
-                indexes_too_far_filtered.insert(0,indexes_too_far_filtered[0]-1)
-            if not indexes_too_far_filtered[-1] +1 >= len(mymat)-2:
-                indexes_too_far_filtered.append(indexes_too_far_filtered[-1]+1)
+    k_cross, cross = _RLCrossings(num, den, dtime)
+    return _RLFeatures(k_break, real_break, centroid, angles, k_cross, cross)
 
-        indexes_too_far.extend(indexes_too_far_filtered)
 
-    indexes_too_far = list(np.unique(indexes_too_far))
-    indexes_too_far.sort()
-    return indexes_too_far
+def _RLCrossings(num, den, dtime=False):
+    """Gains and locations at which the root locus crosses the imaginary
+    axis (the unit circle for discrete time systems).
+
+    On the boundary, k = -den/num must be real, so the crossings are the
+    roots on the boundary of the real polynomial Im(den * conj(num)),
+    found as eigenvalues of its companion matrix."""
+    n = max(den.order, num.order)
+    dc = np.concatenate((np.zeros(n + 1 - len(den.coeffs)), den.coeffs))
+    nc = np.concatenate((np.zeros(n + 1 - len(num.coeffs)), num.coeffs))
+    if dtime:
+        # on |z| = 1, conj(p(z)) = z^-n p_rev(z) for real coefficients
+        poly = np.polysub(np.polymul(dc, nc[::-1]), np.polymul(nc, dc[::-1]))
+    else:
+        # den(jw) and num(jw) as polynomials in w
+        jpow = 1j ** np.arange(n, -1, -1)
+        dw, nw = dc * jpow, nc * jpow
+        poly = np.imag(np.polymul(dw, np.conj(nw)))
+    poly = np.trim_zeros(np.real_if_close(poly), 'f')
+    if len(poly) < 2 or np.max(np.abs(poly)) <= \
+            1e-12 * np.max(np.abs(np.append(dc, nc))) ** 2:
+        # no roots, or the locus lies on the boundary
+        return np.array([]), np.array([], dtype=complex)
+
+    roots = np.roots(poly)
+    if dtime:
+        roots = roots[np.abs(np.abs(roots) - 1.) < 1e-6]
+        points = roots / np.abs(roots)
+    else:
+        roots = roots[np.abs(roots.imag) < 1e-6 * (1. + np.abs(roots))]
+        points = 1j * np.abs(roots.real)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gains = -np.polyval(dc, points) / np.polyval(nc, points)
+    real = np.isfinite(gains) & \
+        (np.abs(gains.imag) <= 1e-6 * (1. + np.abs(gains))) & \
+        (gains.real > 0)
+    gains, points = np.real(gains[real]), points[real]
+    gains, index = np.unique(gains, return_index=True)
+    return gains, points[index]
+
 
 def _break_points(num, den):
     """Extract break points over real axis and the gains give these location"""
@@ -317,27 +628,25 @@ def _ax_lim(mymat):
     return axlim
 
 
-def _k_max(num, den, real_break_points, k_break_points):
+def _k_max(num, den, features):
     """" Calculate the maximum gain for the root locus shown in the figure"""
-    asymp_number = den.order - num.order
     singular_points = np.concatenate((num.roots, den.roots), axis=0)
-    important_points = np.concatenate((singular_points, real_break_points), axis=0)
-    false_gain = den.coeffs[0] / num.coeffs[0]
+    important_points = np.concatenate((singular_points, features.real_break),
+                                      axis=0)
 
-    if asymp_number > 0:
-        asymp_center = (np.sum(den.roots) - np.sum(num.roots))/asymp_number
+    if len(features.angles) > 0:
+        asymp_center = features.centroid
         distance_max = 4 * np.max(np.abs(important_points - asymp_center))
-        asymp_angles = (2 * np.arange(0, asymp_number)-1) * np.pi / asymp_number
-        if false_gain > 0:
-            farthest_points = asymp_center + distance_max * np.exp(asymp_angles * 1j)  # farthest points over asymptotes
-        else:
-            asymp_angles = asymp_angles + np.pi
-            farthest_points = asymp_center + distance_max * np.exp(asymp_angles * 1j)  # farthest points over asymptotes
+        # farthest points over asymptotes
+        farthest_points = asymp_center + \
+            distance_max * np.exp(features.angles * 1j)
         kmax_asymp = np.real(np.abs(den(farthest_points) / num(farthest_points)))
     else:
         kmax_asymp = np.abs([np.abs(den.coeffs[0]) / np.abs(num.coeffs[0]) * 3])
 
-    kmax = np.max(np.concatenate((np.real(kmax_asymp), np.real(k_break_points)), axis=0))
+    kmax = np.max(np.concatenate((np.real(kmax_asymp),
+                                  np.real(features.k_break)), axis=0))
+    false_gain = den.coeffs[0] / num.coeffs[0]
     if np.abs(false_gain) > kmax:
         kmax = np.abs(false_gain)
     return kmax
@@ -373,53 +682,138 @@ def _systopoly1d(sys):
 
 
 def _RLFindRoots(nump, denp, kvect):
-    """Find the roots for the root locus."""
-    # Convert numerator and denominator to polynomials if they aren't
-    roots = []
-    for k in kvect:
-        curpoly = denp + k * nump
-        curroots = curpoly.r
-        if len(curroots) < denp.order:
-            # if I have fewer poles than open loop, it is because i have one at infinity
-            curroots = np.insert(curroots, len(curroots), np.inf)
-
-        curroots.sort()
-        roots.append(curroots)
-
-    mymat = row_stack(roots)
+    """Find the roots for the root locus.
+
+    The characteristic polynomials denp + k*nump for all gains are solved
+    at once, as the eigenvalues of a stack of companion matrices.  Roots
+    that go to infinity (when the leading coefficient vanishes) are
+    returned as inf, and the roots for each gain are sorted.
+    """
+    kvect = np.ravel(np.asarray(kvect))
+    num, den = np.atleast_1d(nump.coeffs), np.atleast_1d(denp.coeffs)
+    n = max(len(num), len(den))
+    num = np.concatenate((np.zeros(n - len(num)), num))
+    den = np.concatenate((np.zeros(n - len(den)), den))
+    polys = den[np.newaxis, :] + kvect[:, np.newaxis] * num[np.newaxis, :]
+
+    # if I have fewer poles than open loop, it is because i have one at
+    # infinity; _broots pads these with nan
+    mymat = _broots(polys)
+    mymat[np.isnan(mymat)] = np.inf
+    mymat.sort(axis=1)
+    return mymat
+
+def _gain_direction(sys, gain_direction):
+    """Check the gain direction for a state space root locus"""
+    if gain_direction is None:
+        if sys.inputs != sys.outputs:
+            raise ValueError("gain_direction must be given for systems "
+                             "with a different number of inputs and outputs")
+        return np.eye(sys.inputs)
+    K0 = np.atleast_2d(np.asarray(gain_direction, dtype=float))
+    if K0.shape != (sys.inputs, sys.outputs):
+        raise ValueError("gain_direction must have shape (%d, %d)" %
+                         (sys.inputs, sys.outputs))
+    return K0
+
+
+def _ss_zeros(sys, K0):
+    """Open loop zeros of the loop G K0, where the locus ends"""
+    A, B, C, D = (np.asarray(M, dtype=float) for M in
+                  (sys.A, sys.B, sys.C, sys.D))
+    B, D = np.dot(B, K0), np.dot(D, K0)
+    n = A.shape[0]
+    # finite generalized eigenvalues of the Rosenbrock pencil
+    M = np.block([[A, B], [C, D]])
+    N = np.zeros_like(M)
+    N[:n, :n] = np.eye(n)
+    zeros = scipy.linalg.eigvals(M, N)
+    return zeros[np.isfinite(zeros)]
+
+
+def _RLFindRootsSS(sys, K0, kvect):
+    """Find the roots for the root locus of a state space system.
+
+    The closed loop poles for the feedback u = -k K0 y are the eigenvalues
+    of A - k B K0 (I + k D K0)^-1 C, which are computed for all gains at
+    once from a stack of closed loop matrices.  Gains for which I + k D K0
+    is singular give roots at infinity.  The roots for each gain are
+    sorted.
+    """
+    kvect = np.ravel(np.asarray(kvect, dtype=float))
+    A, B, C, D = (np.asarray(M, dtype=float) for M in
+                  (sys.A, sys.B, sys.C, sys.D))
+    n, p = A.shape[0], D.shape[0]
+    BK, DK = np.dot(B, K0), np.dot(D, K0)
+
+    # (I + k D K0)^-1 C for all gains; singular gains are done one by one
+    I = np.eye(p)[np.newaxis] + kvect[:, np.newaxis, np.newaxis] * DK
+    rhs = np.broadcast_to(C, (len(kvect), p, n))
+    singular = np.zeros(len(kvect), dtype=bool)
+    try:
+        X = np.linalg.solve(I, rhs)
+    except np.linalg.LinAlgError:
+        X = np.empty((len(kvect), p, n))
+        for i in range(len(kvect)):
+            try:
+                X[i] = np.linalg.solve(I[i], C)
+            except np.linalg.LinAlgError:
+                singular[i] = True
+                X[i] = 0.
+
+    Acl = A[np.newaxis] - kvect[:, np.newaxis, np.newaxis] * \
+        np.matmul(BK[np.newaxis], X)
+    mymat = np.linalg.eigvals(Acl).astype(complex) if n else \
+        np.zeros((len(kvect), 0), dtype=complex)
+    mymat[singular] = np.inf
+    mymat.sort(axis=1)
     return mymat
 
+
 def _RLSortRoots(mymat):
     """Sort the roots from sys._RLFindRoots, so that the root
     locus doesn't show weird pseudo-branches as roots jump from
-    one branch to another."""
-
-    sorted = zeros_like(mymat)
-    for n, row in enumerate(mymat):
-        if n == 0:
-            sorted[n, :] = row
-        else:
-            # sort the current row by finding the element with the
-            # smallest absolute distance to each root in the
-            # previous row
-            available = list(range(len(prevrow)))
-            for elem in row:
-                evect = elem-prevrow[available]
-                ind1 = abs(evect).argmin()
-                ind = available.pop(ind1)
-                sorted[n, ind] = elem
-        prevrow = sorted[n, :]
+    one branch to another.
+
+    Each row is matched to the previous (sorted) row with the assignment
+    that minimises the total distance between the matched roots, which
+    keeps the branches apart where they come close, near breakaway
+    points.  The distances for all steps are computed at once."""
+
+    mymat = np.asarray(mymat)
+    sorted = np.array(mymat, copy=True)
+    if len(mymat) < 2 or mymat.shape[1] < 2:
+        return sorted
+
+    # distances between the roots of consecutive rows, with roots at
+    # infinity matching each other; the assignment needs finite costs
+    with np.errstate(invalid='ignore'):
+        dist = np.abs(mymat[:-1, :, np.newaxis] - mymat[1:, np.newaxis, :])
+    inf = np.isinf(mymat)
+    both = inf[:-1, :, np.newaxis] & inf[1:, np.newaxis, :]
+    dist[both] = 0.
+    finite = np.isfinite(dist)
+    big = 2. * np.max(dist[finite]) + 1. if finite.any() else 1.
+    dist[~finite] = big
+
+    # follow the assignments from the first row onwards; the order of
+    # the previous row is a permutation of the unsorted previous row
+    order = np.arange(mymat.shape[1])
+    for n in range(1, len(mymat)):
+        rows, cols = linear_sum_assignment(dist[n - 1][order])
+        order = cols
+        sorted[n, :] = mymat[n, order]
     return sorted
 
-def _RLClickDispatcher(event,sys,fig,ax_rlocus,plotstr,sisotool=False,bode_plot_params=None,tvect=None):
+def _RLClickDispatcher(event,sys,fig,ax_rlocus,plotstr,sisotool=False,bode_plot_params=None,tvect=None,index=None):
     """Rootlocus plot click dispatcher"""
 
     # If zoom is used on the rootlocus plot smooth and update it
-    if plt.get_current_fig_manager().toolbar.mode in ['zoom rect','pan/zoom'] and event.inaxes == ax_rlocus.axes:
+    if index is None and plt.get_current_fig_manager().toolbar.mode in ['zoom rect','pan/zoom'] and event.inaxes == ax_rlocus.axes:
         (nump, denp) = _systopoly1d(sys)
         xlim,ylim = ax_rlocus.get_xlim(),ax_rlocus.get_ylim()
 
-        kvect,mymat, xlim,ylim = _default_gains(nump, denp,xlim=None,ylim=None, zoom_xlim=xlim,zoom_ylim=ylim)
+        kvect,mymat, xlim,ylim = _default_gains(nump, denp,xlim=None,ylim=None, zoom_xlim=xlim,zoom_ylim=ylim,dtime=isdtime(sys, strict=True))
         _removeLine('rootlocus', ax_rlocus)
 
         for i,col in enumerate(mymat.T):
@@ -427,17 +821,44 @@ def _RLClickDispatcher(event,sys,fig,ax_rlocus,plotstr,sisotool=False,bode_plot_
 
     # if a point is clicked on the rootlocus plot visually emphasize it
     else:
-        K = _RLFeedbackClicksPoint(event, sys, fig,ax_rlocus,sisotool)
+        K = _RLFeedbackClicksPoint(event, sys, fig,ax_rlocus,sisotool,index)
         if sisotool and K is not None:
+            # sisotool redraws the artists that changed itself
             _SisotoolUpdate(sys, fig, K, bode_plot_params, tvect)
+            return
 
     # Update the canvas
     fig.canvas.draw()
 
 
-def _RLFeedbackClicksPoint(event,sys,fig,ax_rlocus,sisotool=False):
+def _RLFeedbackClicksPoint(event,sys,fig,ax_rlocus,sisotool=False,index=None):
     """Display root-locus gain feedback point for clicks on the root-locus plot"""
 
+    xlim = ax_rlocus.get_xlim()
+    ylim = ax_rlocus.get_ylim()
+    x_tolerance = 0.05 * (xlim[1] - xlim[0])
+    y_tolerance = 0.05 * (ylim[1] - ylim[0])
+    gain_tolerance = np.min([x_tolerance, y_tolerance])*1e-1
+
+    # Without a loop transfer function, the gain is interpolated at the
+    # nearest point of the computed locus
+    if index is not None:
+        try:
+            click = complex(event.xdata, event.ydata)
+        except TypeError:
+            return None
+        K, s, branch = index.nearest(click)
+        if abs(s - click) < np.min([x_tolerance, y_tolerance]) and \
+                event.inaxes == ax_rlocus.axes:
+            print("Clicked at %10.4g%+10.4gj gain %10.4g damp %10.4g" %
+                  (s.real, s.imag, K, -1 * s.real / abs(s)))
+            fig.suptitle("Clicked at: %10.4g%+10.4gj  gain: %10.4g  damp: %10.4g" %
+                         (s.real, s.imag, K, -1 * s.real / abs(s)),fontsize = 12 if int(matplotlib.__version__[0]) == 1 else 10)
+            _removeLine(label='gain_point',ax=ax_rlocus)
+            ax_rlocus.plot(s.real, s.imag, 'k.', marker='s', markersize=8, zorder=20,label='gain_point')
+            return K
+        return None
+
     (nump, denp) = _systopoly1d(sys)
 
     # Catch type error when event click is in the figure but not in an axis
@@ -448,12 +869,6 @@ def _RLFeedbackClicksPoint(event,sys,fig,ax_rlocus,sisotool=False):
     except TypeError:
         K = float('inf')
 
-    xlim = ax_rlocus.get_xlim()
-    ylim = ax_rlocus.get_ylim()
-    x_tolerance = 0.05 * (xlim[1] - xlim[0])
-    y_tolerance = 0.05 * (ylim[1] - ylim[0])
-    gain_tolerance = np.min([x_tolerance, y_tolerance])*1e-1
-
     if abs(K.real) > 1e-8 and abs(K.imag / K.real) < gain_tolerance and event.inaxes == ax_rlocus.axes:
 
         # Display the parameters in the output window and figure
@@ -476,6 +891,172 @@ def _RLFeedbackClicksPoint(event,sys,fig,ax_rlocus,sisotool=False):
         return K.real[0][0]
 
 
+class RootLocusIndex(object):
+    """Spatial index over the points of a computed root locus
+
+    The points of the locus are kept in a KD-tree, so that the locus point
+    nearest to a location in the complex plane is found in logarithmic
+    time.  For each branch, the damping ratio and natural frequency along
+    the branch are split into monotonic runs, which are searched by
+    bisection.  Gains between the computed samples are interpolated
+    linearly.
+
+    Parameters
+    ----------
+    roots : ndarray
+        Root locations, one row for each gain and one column for each
+        branch, as returned by root_locus
+    gains : array_like
+        Gains used to compute the rows of roots
+    dt : None, True or float, optional
+        Sampling time for the locus of a discrete time system (None or 0
+        for continuous time systems).  The damping
+        ratios and natural frequencies are then those of s = log(z)/dt.
+
+    Examples
+    --------
+    >>> roots, gains = root_locus(sys, Plot=False)
+    >>> index = RootLocusIndex(roots, gains)
+    >>> gain, point, branch = index.nearest(-1+2j)
+    >>> gain = index.gain_at_damping(0.7, branch=0)
+    """
+
+    def __init__(self, roots, gains, dt=None):
+        from scipy.spatial import cKDTree
+        self.roots = np.atleast_2d(np.asarray(roots, dtype=complex))
+        self.gains = np.asarray(gains, dtype=float)
+        self.dt = 1. if dt is True else (dt or None)
+        finite = np.isfinite(self.roots)
+        self._rows, self._branches = np.nonzero(finite)
+        points = self.roots[finite]
+        self._tree = cKDTree(np.column_stack((points.real, points.imag)))
+        self._runs = {}
+
+    def nearest(self, s):
+        """Nearest point of the locus to s
+
+        Returns
+        -------
+        gain : float
+            Gain at the nearest point, interpolated between the samples
+        point : complex
+            Nearest point on the locus
+        branch : int
+            Branch (column of roots) of the nearest point
+
+        If the locus has no finite points, the gain and point are nan and
+        the branch is -1.
+        """
+        best = (np.inf, np.nan, complex(np.nan, np.nan), -1)
+        if not len(self._rows):
+            return best[1], best[2], best[3]
+        nk = len(self.gains)
+        count = min(4, len(self._rows))
+        dist, found = self._tree.query([s.real, s.imag], k=count)
+        for i, j in zip(self._rows[np.atleast_1d(found)],
+                        self._branches[np.atleast_1d(found)]):
+            # segments of the branch that end at the sample
+            for a, b in ((i - 1, i), (i, i + 1)):
+                if a < 0 or b >= nk:
+                    continue
+                pa, pb = self.roots[a, j], self.roots[b, j]
+                if not (np.isfinite(pa) and np.isfinite(pb)):
+                    continue
+                d = pb - pa
+                t = 0. if d == 0 else \
+                    np.clip(((s - pa) * np.conj(d)).real / abs(d)**2, 0., 1.)
+                point = pa + t * d
+                if abs(s - point) < best[0]:
+                    gain = self.gains[a] + t * (self.gains[b] - self.gains[a])
+                    best = (abs(s - point), gain, point, j)
+            if nk == 1 and abs(s - self.roots[i, j]) < best[0]:
+                best = (abs(s - self.roots[i, j]), self.gains[i],
+                        self.roots[i, j], j)
+        return best[1], best[2], int(best[3])
+
+    def gain_at_damping(self, zeta, branch=None):
+        """Lowest gain at which the branches reach a damping ratio
+
+        Returns an array with the gain for each branch (nan for branches
+        that do not reach the damping ratio), or the gain for a single
+        branch if one is given.
+        """
+        return self._lookup('damping', zeta, branch)
+
+    def gain_at_frequency(self, wn, branch=None):
+        """Lowest gain at which the branches reach a natural frequency
+
+        Returns an array with the gain for each branch (nan for branches
+        that do not reach the frequency), or the gain for a single branch
+        if one is given.
+        """
+        return self._lookup('frequency', wn, branch)
+
+    def _values(self, quantity):
+        """Damping ratio or natural frequency of the locus points"""
+        s = self.roots
+        if self.dt is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                s = np.log(s) / self.dt
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if quantity == 'damping':
+                return -s.real / np.abs(s)
+            return np.abs(s)
+
+    def _monotonic_runs(self, quantity):
+        """Monotonic runs of a quantity along each branch, as lists of
+        (start, stop) rows, computed once"""
+        if quantity not in self._runs:
+            values = self._values(quantity)
+            runs = []
+            for col in values.T:
+                finite = np.isfinite(col)
+                valid = finite[:-1] & finite[1:]
+                with np.errstate(invalid='ignore'):
+                    steps = np.sign(np.diff(col))
+                # runs end at non-finite values and at turning points
+                branch_runs, start, direction = [], None, 0
+                for i in range(len(col) - 1):
+                    if not valid[i]:
+                        if start is not None:
+                            branch_runs.append((start, i + 1))
+                        start = None
+                    elif start is None:
+                        start, direction = i, steps[i]
+                    elif steps[i] and direction and steps[i] != direction:
+                        branch_runs.append((start, i + 1))
+                        start, direction = i, steps[i]
+                    elif steps[i]:
+                        direction = steps[i]
+                if start is not None:
+                    branch_runs.append((start, len(col)))
+                runs.append(branch_runs)
+            self._runs[quantity] = (values, runs)
+        return self._runs[quantity]
+
+    def _lookup(self, quantity, target, branch):
+        """Lowest interpolated gain at which the quantity reaches target"""
+        values, runs = self._monotonic_runs(quantity)
+        branches = range(values.shape[1]) if branch is None else [branch]
+        gains = []
+        for j in branches:
+            gain = np.nan
+            for start, stop in runs[j]:
+                run = values[start:stop, j]
+                k = self.gains[start:stop]
+                if run[-1] < run[0]:
+                    run, k = run[::-1], k[::-1]
+                if not run[0] <= target <= run[-1]:
+                    continue
+                i = min(max(np.searchsorted(run, target), 1), len(run) - 1)
+                t = 0. if run[i] == run[i - 1] else \
+                    (target - run[i - 1]) / (run[i] - run[i - 1])
+                gain = k[i - 1] + t * (k[i] - k[i - 1])
+                break
+            gains.append(gain)
+        return gains[0] if branch is not None else np.array(gains)
+
+
 def _removeLine(label,ax):
     """Remove a line from the ax when a label is specified"""
     for line in reversed(ax.lines):
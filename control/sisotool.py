@@ -1,11 +1,15 @@
 __all__ = ['sisotool']
 
-from .freqplot import bode_plot
+from .freqplot import bode_plot, bode_response, _bode_margins
 from .timeresp import step_response
 from .lti import issiso
+from .margins import stability_margins
+from .statesp import StateSpace, _convertToStateSpace
+import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
 import warnings
+import weakref
 
 def sisotool(sys, kvect = None, xlim_rlocus = None, ylim_rlocus = None,
              plotstr_rlocus = 'b' if int(matplotlib.__version__[0]) == 1 else 'C0',
@@ -88,7 +92,163 @@ def sisotool(sys, kvect = None, xlim_rlocus = None, ylim_rlocus = None,
     # Setup the root-locus plot window
     root_locus(sys,kvect=kvect,xlim=xlim_rlocus,ylim = ylim_rlocus,plotstr=plotstr_rlocus,grid = rlocus_grid,fig=fig,bode_plot_params=bode_plot_params,tvect=tvect,sisotool=True)
 
+class _SisotoolState(object):
+    """Cached model and artists of a sisotool figure.
+
+    The open loop frequency response is computed once and scaled by the
+    gain, and the closed loop step responses are computed from a state
+    space realisation of the plant, without forming transfer functions.
+    The artists that change with the gain are animated, so that a gain
+    update only redraws them over a saved background where the canvas
+    supports blitting."""
+
+    def __init__(self, sys, fig, bode_plot_params):
+        from . import config
+        self.sys = sys
+        self.params = bode_plot_params
+        self.dB, self.Hz, self.deg = (
+            getattr(config, 'bode_' + key) if bode_plot_params.get(key) is None
+            else bode_plot_params[key] for key in ('dB', 'Hz', 'deg'))
+        self.ss = _convertToStateSpace(sys)
+        self.mag, self.phase, self.omega, _ = bode_response(
+            sys, bode_plot_params.get('omega'), Hz=self.Hz,
+            omega_limits=bode_plot_params.get('omega_limits'),
+            omega_num=bode_plot_params.get('omega_num'))
+        self.margin_artists = []
+        self.background = None
+        self.clean = False
+        self.blit = getattr(fig.canvas, 'supports_blit', False)
+        if self.blit:
+            self.cid = fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def closed_loop(self, K):
+        """Closed loop system for the feedback u = K (r - y)"""
+        A, B, C, D = (np.asarray(M, dtype=float) for M in
+                      (self.ss.A, self.ss.B, self.ss.C, self.ss.D))
+        M = K / (1. + K * D)
+        return StateSpace(A - np.dot(B, np.dot(M, C)), np.dot(B, M),
+                          C - np.dot(D, np.dot(M, C)), np.dot(D, M),
+                          self.ss.dt)
+
+    def artists(self, fig):
+        """Artists that change with the gain"""
+        ax_mag, ax_rlocus, ax_phase, ax_step = fig.axes[:4]
+        artists = [ax_mag.lines[0], ax_phase.lines[0], ax_step.lines[0]]
+        artists += self.margin_artists
+        artists += [line for line in ax_rlocus.lines
+                    if line.get_label() == 'gain_point']
+        title = getattr(fig, '_suptitle', None)
+        if title is not None:
+            artists.append(title)
+        return artists
+
+    def _on_draw(self, event):
+        """Save the background and draw the animated artists over it"""
+        fig = event.canvas.figure
+        artists = self.artists(fig)
+        # artists drawn into the background cannot be blitted over
+        self.clean = all(artist.get_animated() for artist in artists)
+        self.background = event.canvas.copy_from_bbox(fig.bbox)
+        for artist in artists:
+            if artist.get_animated():
+                fig.draw_artist(artist)
+
+    def draw(self, fig, full):
+        """Draw the figure, or blit the changed artists"""
+        canvas = fig.canvas
+        if not self.blit:
+            canvas.draw()
+            return
+        artists = self.artists(fig)
+        for artist in artists:
+            artist.set_animated(True)
+        if full or self.background is None or not self.clean:
+            canvas.draw()
+        else:
+            canvas.restore_region(self.background)
+            for artist in artists:
+                fig.draw_artist(artist)
+        canvas.blit(fig.bbox)
+
+
+# Sisotool state of each figure
+_sisotool_states = weakref.WeakKeyDictionary()
+
+
 def _SisotoolUpdate(sys,fig,K,bode_plot_params,tvect=None):
+    """Update the sisotool plots for a new gain.
+
+    The plots are drawn in full for a new system or figure; later gains
+    only update the data of the lines that depend on the gain."""
+
+    K = np.real(K)
+    state = _sisotool_states.get(fig)
+    if state is None or state.sys is not sys or \
+            state.params is not bode_plot_params:
+        if state is not None and state.blit:
+            fig.canvas.mpl_disconnect(state.cid)
+        state = _SisotoolState(sys, fig, bode_plot_params)
+        _sisotool_states[fig] = state
+        _SisotoolDraw(state, fig, K, tvect)
+        return
+
+    ax_mag, ax_rlocus, ax_phase, ax_step = fig.axes[:4]
+    limits = [ax.get_xlim() + ax.get_ylim()
+              for ax in (ax_mag, ax_phase, ax_step)]
+    dB, Hz, deg = state.dB, state.Hz, state.deg
+
+    # Scale the open loop response and move the margins
+    mag = abs(K) * state.mag
+    phase = state.phase + (np.pi if K < 0 else 0.)
+    ax_mag.lines[0].set_ydata(20 * np.log10(mag) if dB else mag)
+    ax_phase.lines[0].set_ydata(phase * 180. / np.pi if deg else phase)
+    for artist in state.margin_artists:
+        artist.remove()
+    state.margin_artists = []
+    for ax in (ax_mag, ax_phase):
+        _SisotoolRescale(ax, ax.lines[0])
+    if bode_plot_params.get('margins'):
+        state.margin_artists = _bode_margins(
+            ax_mag, ax_phase, stability_margins(state.ss * K), phase,
+            state.omega, dB, Hz, deg, sisotool=True)
+
+    # Closed loop step response
+    tout, yout = _SisotoolStep(state, K, tvect)
+    ax_step.lines[0].set_data(tout, yout)
+    _SisotoolRescale(ax_step, ax_step.lines[0])
+
+    full = limits != [ax.get_xlim() + ax.get_ylim()
+                      for ax in (ax_mag, ax_phase, ax_step)]
+    state.draw(fig, full)
+
+
+def _SisotoolRescale(ax, line):
+    """Rescale the axes if a line no longer fits in them.
+
+    The limits are kept while the line fits, so that the figure does not
+    need a full redraw."""
+    x, y = (np.asarray(data, dtype=float) for data in line.get_data())
+    x, y = x[np.isfinite(x)], y[np.isfinite(y)]
+    xlim, ylim = sorted(ax.get_xlim()), sorted(ax.get_ylim())
+    if x.size and y.size and xlim[0] <= x.min() and x.max() <= xlim[1] \
+            and ylim[0] <= y.min() and y.max() <= ylim[1]:
+        return
+    ax.set_autoscale_on(True)
+    ax.relim()
+    ax.autoscale_view()
+
+
+def _SisotoolStep(state, K, tvect=None):
+    """Closed loop step response for the gain K"""
+    sys_closed = state.closed_loop(K)
+    if tvect is None:
+        return step_response(sys_closed)
+    return step_response(sys_closed, tvect)
+
+
+def _SisotoolDraw(state, fig, K, tvect=None):
+    """Draw the bode and step response plots of sisotool in full"""
+    sys, bode_plot_params = state.sys, state.params
 
     if int(matplotlib.__version__[0]) == 1:
         title_font_size = 12
@@ -105,9 +265,18 @@ def _SisotoolUpdate(sys,fig,K,bode_plot_params,tvect=None):
         warnings.simplefilter("ignore")
         ax_step.clear(), ax_mag.clear(), ax_phase.clear()
 
-    # Update the bodeplot
-    bode_plot_params['syslist'] = sys*K.real
-    bode_plot(**bode_plot_params)
+    # Update the bodeplot, on the frequencies of the cached response; the
+    # margins are drawn separately so that they can be moved
+    params = dict(bode_plot_params, syslist=sys*K, omega=state.omega,
+                  dB=state.dB, Hz=state.Hz, deg=state.deg, margins=False)
+    bode_plot(**params)
+    if bode_plot_params.get('margins'):
+        ax_mag.grid(False, which='both')
+        ax_phase.grid(False, which='both')
+        state.margin_artists = _bode_margins(
+            ax_mag, ax_phase, stability_margins(state.ss * K),
+            state.phase + (np.pi if K < 0 else 0.), state.omega,
+            state.dB, state.Hz, state.deg, sisotool=True)
 
     # Set the titles and labels
     ax_mag.set_title('Bode magnitude',fontsize = title_font_size)
@@ -132,15 +301,11 @@ def _SisotoolUpdate(sys,fig,K,bode_plot_params,tvect=None):
     ax_rlocus.get_yaxis().set_label_coords(-0.15, 0.5)
 
     # Generate the step response and plot it
-    sys_closed = (K*sys).feedback(1)
-    if tvect is None:
-        tvect, yout = step_response(sys_closed)
-    else:
-        tvect, yout = step_response(sys_closed,tvect)
-    ax_step.plot(tvect, yout)
+    tout, yout = _SisotoolStep(state, K, tvect)
+    ax_step.plot(tout, yout)
     ax_step.axhline(1.,linestyle=':',color='k',zorder=-20)
 
     # Manually adjust the spacing and draw the canvas
     fig.subplots_adjust(top=0.9,wspace = 0.3,hspace=0.35)
-    fig.canvas.draw()
+    state.draw(fig, True)
 
@@ -61,7 +61,7 @@ from numpy.linalg.linalg import LinAlgError
 import scipy as sp
 from scipy.signal import lti, cont2discrete
 from warnings import warn
-from .lti import LTI, timebase, timebaseEqual, isdtime
+from .lti import LTI, timebase, timebaseEqual, isdtime, _hash_data
 from .xferfcn import _convert_to_transfer_function
 from copy import deepcopy
 
@@ -392,7 +392,7 @@ but B has %i row(s)\n(output(s))." % (self.inputs, other.outputs))
         if isdtime(self, strict=True):
             dt = timebase(self)
             s = exp(1.j * omega * dt)
-            if omega * dt > math.pi:
+            if np.any(omega * dt > math.pi):
                 warn("_evalfr: frequency evaluation above Nyquist frequency")
         else:
             s = omega * 1.j
@@ -402,14 +402,29 @@ but B has %i row(s)\n(output(s))." % (self.inputs, other.outputs))
     def horner(self, s):
         """Evaluate the systems's transfer function for a complex variable
 
-        Returns a matrix of values evaluated at complex variable s.
+        Returns a matrix of values evaluated at complex variable s.  If s
+        is a list or array, the values for all points are stacked along a
+        third axis, as for TransferFunction.horner.
         """
+        if getattr(s, '__iter__', False):
+            s = np.asarray(s)
+            A, B = np.asarray(self.A), np.asarray(self.B)
+            C, D = np.asarray(self.C), np.asarray(self.D)
+            if self.states:
+                # solve (s I - A) X = B for all points at once
+                X = solve(s[:, np.newaxis, np.newaxis] * eye(self.states) - A,
+                          B[np.newaxis])
+                resp = np.matmul(C, X) + D
+            else:
+                resp = np.repeat(D[np.newaxis].astype(complex), len(s), 0)
+            return np.moveaxis(resp, 0, -1)
+
         resp = self.C * solve(s * eye(self.states) - self.A,
                               self.B) + self.D
         return array(resp)
 
     # Method for generating the frequency response of the system
-    def freqresp(self, omega):
+    def freqresp(self, omega, workers=None):
         """
         Evaluate the system's transfer func. at a list of freqs, omega.
 
@@ -430,6 +445,14 @@ but B has %i row(s)\n(output(s))." % (self.inputs, other.outputs))
             should be evaluated. The list can be either a python list
             or a numpy array and will be sorted before evaluation.
 
+        workers: Number of threads to use.  The frequency points are split
+            into this many chunks that are evaluated in parallel; the
+            linear algebra for each point runs in LAPACK (or Slycot),
+            which releases the GIL.  A value of -1 uses one thread per
+            CPU.  Each thread gets at least 16 frequencies, so short
+            lists use fewer threads.  The default is read from
+            config.freqresp_workers.
+
         Returns
         -------
         mag: The magnitude (absolute value, not dB or log10) of the system
@@ -461,6 +484,29 @@ but B has %i row(s)\n(output(s))." % (self.inputs, other.outputs))
         else:
             cmplx_freqs = omega * 1.j
 
+        # Split the frequencies into chunks, one per worker thread; each
+        # chunk writes its own slice of Gfrf
+        if workers is None:
+            from . import config
+            workers = config.freqresp_workers
+        chunks = _freqresp_chunks(numFreqs, workers)
+        if len(chunks) > 1:
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(len(chunks))
+            try:
+                pool.map(lambda idx: self._freqresp_chunk(
+                    cmplx_freqs, Gfrf, idx), chunks)
+            finally:
+                pool.close()
+                pool.join()
+        elif chunks:
+            self._freqresp_chunk(cmplx_freqs, Gfrf, chunks[0])
+
+        #      mag           phase           omega
+        return np.abs(Gfrf), np.angle(Gfrf), omega
+
+    def _freqresp_chunk(self, cmplx_freqs, Gfrf, idx):
+        """Evaluate the response at cmplx_freqs[idx] into Gfrf[:, :, idx]"""
         # Do the frequency response evaluation. Use TB05AD from Slycot
         # if it's available, otherwise use the built-in horners function.
         try:
@@ -471,7 +517,7 @@ but B has %i row(s)\n(output(s))." % (self.inputs, other.outputs))
             p = self.outputs
             # The first call both evaluates C(sI-A)^-1 B and also returns
             # Hessenberg transformed matrices at, bt, ct.
-            result = tb05ad(n, m, p, cmplx_freqs[0], self.A,
+            result = tb05ad(n, m, p, cmplx_freqs[idx[0]], self.A,
                             self.B, self.C, job='NG')
             # When job='NG', result = (at, bt, ct, g_i, hinvb, info)
             at = result[0]
@@ -479,37 +525,40 @@ but B has %i row(s)\n(output(s))." % (self.inputs, other.outputs))
             ct = result[2]
 
             # TB05AD frequency evaluation does not include direct feedthrough.
-            Gfrf[:, :, 0] = result[3] + self.D
+            Gfrf[:, :, idx[0]] = result[3] + self.D
 
             # Now, iterate through the remaining frequencies using the
             # transformed state matrices, at, bt, ct.
 
             # Start at the second frequency, already have the first.
-            for kk, cmplx_freqs_kk in enumerate(cmplx_freqs[1:numFreqs]):
-                result = tb05ad(n, m, p, cmplx_freqs_kk, at,
+            for kk in idx[1:]:
+                result = tb05ad(n, m, p, cmplx_freqs[kk], at,
                                 bt, ct, job='NH')
                 # When job='NH', result = (g_i, hinvb, info)
-
-                # kk+1 because enumerate starts at kk = 0.
-                # but zero-th spot is already filled.
-                Gfrf[:, :, kk+1] = result[0] + self.D
+                Gfrf[:, :, kk] = result[0] + self.D
 
         except ImportError:  # Slycot unavailable. Fall back to horner.
-            for kk, cmplx_freqs_kk in enumerate(cmplx_freqs):
-                Gfrf[:, :, kk] = self.horner(cmplx_freqs_kk)
+            for kk in idx:
+                Gfrf[:, :, kk] = self.horner(cmplx_freqs[kk])
 
-        #      mag           phase           omega
-        return np.abs(Gfrf), np.angle(Gfrf), omega
+    def _fingerprint(self):
+        """Digest of the system matrices and timebase"""
+        return _hash_data('StateSpace', self.dt,
+                          (self.A, self.B, self.C, self.D))
 
     # Compute poles and zeros
     def pole(self):
         """Compute the poles of a state space system."""
 
-        return eigvals(self.A) if self.states else np.array([])
+        return self._cached('pole', lambda: eigvals(self.A) if self.states
+                            else np.array([]))
 
     def zero(self):
         """Compute the zeros of a state space system."""
 
+        return self._cached('zero', self._compute_zero)
+
+    def _compute_zero(self):
         if not self.states:
             return np.array([])
 
@@ -856,6 +905,17 @@ but B has %i row(s)\n(output(s))." % (self.inputs, other.outputs))
 
 
 # TODO: add discrete time check
+def _freqresp_chunks(numFreqs, workers, min_points=16):
+    """Split the indices of numFreqs frequencies into chunks for workers
+    threads (one per CPU if negative), with at least min_points per chunk"""
+    if workers < 0:
+        from multiprocessing import cpu_count
+        workers = cpu_count()
+    workers = max(min(workers, numFreqs // min_points), 1)
+    return [idx for idx in np.array_split(np.arange(numFreqs), workers)
+            if len(idx)]
+
+
 def _convertToStateSpace(sys, **kw):
     """Convert a system to state space form (if needed).
 
@@ -889,8 +949,10 @@ cannot take keywords.")
 
             # Change the numerator and denominator arrays so that the transfer
             # function matrix has a common denominator.
-            # matrices are also sized/padded to fit td04ad
-            num, den, denorder = sys.minreal()._common_den()
+            # matrices are also sized/padded to fit td04ad; they are kept
+            # with sys, so that repeated conversions reuse them
+            num, den, denorder = sys._cached(
+                'minreal_common_den', lambda: sys.minreal()._common_den())
 
             # transfer function to state space conversion now should work!
             ssout = td04ad('C', sys.inputs, sys.outputs,
@@ -41,6 +41,24 @@ class TestUtils(unittest.TestCase):
         angle_unwrapped = [0, 0.2, 0.4, 0.6]
         np.testing.assert_array_almost_equal(unwrap(angle, 1.0), angle_unwrapped)
 
+    def test_unwrap_axis(self):
+        # stack of angle sequences (e.g. outputs x inputs x frequencies)
+        angle = np.cumsum(np.random.uniform(-1., 1., (3, 2, 40)), axis=-1)
+        angle_unwrap = unwrap(angle % (2 * np.pi))
+        np.testing.assert_array_almost_equal(angle_unwrap - angle_unwrap[..., :1],
+                                             angle - angle[..., :1])
+
+        # along the first axis, in degrees
+        angle = np.cumsum(np.random.uniform(-100., 100., (40, 5)), axis=0)
+        angle_unwrap = unwrap(angle % 360., 360., axis=0)
+        np.testing.assert_array_almost_equal(angle_unwrap - angle_unwrap[:1],
+                                             angle - angle[:1])
+
+        # the input array is left untouched
+        angle_mod = angle % 360.
+        unwrap(angle_mod, 360., axis=0)
+        np.testing.assert_array_equal(angle_mod, angle % 360.)
+
     def test_db2mag(self):
         for mag, db in zip(self.mag, self.db):
             np.testing.assert_almost_equal(mag, db2mag(db))
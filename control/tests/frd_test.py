@@ -278,6 +278,33 @@ class TestFRD(unittest.TestCase):
              np.exp(1j*f1.freqresp([1.0])[1])).reshape(3, 2),
             np.matrix('0.4-0.2j 0; 0 0.1-0.2j; 0 0.3-0.1j'))
 
+    def testMIMOBatched(self):
+        # batched product, inverse and feedback against per-point results
+        sys = StateSpace([[-0.5, 0.2], [0.0, -1.0]],
+                         [[1.0, 0.0], [0.3, 1.0]],
+                         [[1.0, 0.0], [0.4, 1.0]],
+                         [[0.1, 0.0], [0.0, 0.2]])
+        omega = np.logspace(-1, 2, 20)
+        f1 = FRD(sys, omega)
+        g = f1.fresp
+        prod = (f1 * f1).fresp
+        inv = (f1**-1).fresp
+        fb = f1.feedback([[0.1, 0.3], [0.0, 1.0]], sign=1).fresp
+        for k in range(len(omega)):
+            gk = g[:, :, k]
+            np.testing.assert_array_almost_equal(prod[:, :, k], gk.dot(gk))
+            np.testing.assert_array_almost_equal(inv[:, :, k],
+                                                 np.linalg.inv(gk))
+            np.testing.assert_array_almost_equal(
+                fb[:, :, k],
+                gk.dot(np.linalg.inv(
+                    np.eye(2) - np.array([[0.1, 0.3], [0.0, 1.0]]).dot(gk))))
+
+        # lookup of stored points on a vector of frequencies
+        np.testing.assert_array_almost_equal(
+            f1._evalfr(omega[[3, 7]]), g[:, :, [3, 7]])
+        self.assertRaises(ValueError, f1._evalfr, [omega[0], 0.123])
+
 
 def suite():
     return unittest.TestLoader().loadTestsFromTestCase(TestFRD)
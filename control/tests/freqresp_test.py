@@ -137,6 +137,125 @@ class TestFreqresp(unittest.TestCase):
       phase_to_infinity = (np.array([10., 10.]), np.array([1.00000000e-08, -1.80000000e+02]))
       assert_array_almost_equal(phase_to_infinity, allaxes[1].lines[4].get_data())
 
+   def test_adaptive_range(self):
+      # lightly damped resonance: a fixed grid misses the peak, the
+      # adaptively refined grid finds it with a modest number of points
+      zeta, wn = 0.001, 10.
+      sys = ctrl.tf([wn**2], [1, 2*zeta*wn, wn**2])
+      peak = 1./(2*zeta*np.sqrt(1 - zeta**2))
+
+      omega = ctrl.freqplot.default_frequency_range(sys, adaptive=True)
+      self.assertTrue(np.all(np.diff(omega) > 0))
+      self.assertTrue(len(omega) < 500)
+      mag, phase, omega = sys.freqresp(omega)
+      self.assertTrue(mag.max() > 0.99*peak)
+
+      omega = ctrl.freqplot.default_frequency_range(sys)
+      mag, phase, omega = sys.freqresp(omega)
+      self.assertTrue(mag.max() < 0.1*peak)
+
+      # the point budget is respected
+      omega = ctrl.freqplot.default_frequency_range(
+         sys, number_of_samples=30, adaptive=True)
+      self.assertTrue(len(omega) <= 30)
+
+      # FRD constructor without frequencies uses the adaptive grid
+      frd = ctrl.FRD(sys)
+      self.assertTrue(np.abs(frd.fresp).max() > 0.99*peak)
+
+   def test_response_data(self):
+      # data-only responses match the plotting functions
+      sys1 = ctrl.tf([1], [1, 2, 1])
+      sys2 = ctrl.tf([2], [1, 0.1, 4], 0.1)
+      omega = np.logspace(-2, 2, 200)
+
+      plt.figure()
+      responses = ctrl.bode_response([sys1, sys2], omega)
+      self.assertEqual(len(plt.gcf().axes), 0)
+      for resp, sys in zip(responses, (sys1, sys2)):
+         mag, phase, w = ctrl.bode_plot(sys, omega, Plot=False)
+         np.testing.assert_array_almost_equal(resp.mag, mag)
+         np.testing.assert_array_almost_equal(resp.phase, phase)
+         np.testing.assert_array_almost_equal(resp.omega, w)
+      self.assertEqual(responses[0].nyquistfrq, None)
+      self.assertAlmostEqual(responses[1].nyquistfrq, np.pi/0.1)
+
+      x, y, w = ctrl.nyquist_plot(sys1, omega, Plot=False)
+      resp = ctrl.nyquist_response(sys1, omega)
+      np.testing.assert_array_almost_equal(resp.real, x)
+      np.testing.assert_array_almost_equal(resp.imag, y)
+
+      resp = ctrl.nichols_response(sys1, omega)
+      np.testing.assert_array_almost_equal(
+         resp.mag, 20*np.log10(responses[0].mag))
+
+      # with unit feedback, PS = T and CS = S = 1/(1 + P)
+      resp = ctrl.gangof4_response(sys1, ctrl.tf([1], [1]), omega)
+      P = sys1.freqresp(omega)[0][0, 0] * \
+          np.exp(1j*sys1.freqresp(omega)[1][0, 0])
+      np.testing.assert_array_almost_equal(resp.S, np.abs(1/(1 + P)))
+      np.testing.assert_array_almost_equal(resp.CS, resp.S)
+      np.testing.assert_array_almost_equal(resp.PS, resp.T)
+
+   def test_render(self):
+      responses = ctrl.bode_response([rss(3, 1, 1) for i in range(20)])
+      plt.figure()
+      ax_mag, ax_phase = ctrl.bode_render(responses, max_points=40)
+      self.assertEqual(ax_mag.get_label(), 'control-bode-magnitude')
+      self.assertEqual(len(ax_mag.collections), 1)
+      self.assertEqual(len(ax_mag.collections[0].get_segments()), 20)
+      for seg in ax_mag.collections[0].get_segments():
+         self.assertTrue(len(seg) <= 40)
+
+      plt.figure()
+      ax = ctrl.nyquist_render(ctrl.nyquist_response([rss(3, 1, 1)] * 3))
+      self.assertEqual(len(ax.collections), 2)
+
+      plt.figure()
+      ax = ctrl.nichols_render(ctrl.nichols_response([rss(3, 1, 1)] * 3))
+      self.assertEqual(len(ax.collections[0].get_segments()), 3)
+
+   def test_decimate(self):
+      # decimation keeps the resonance peak
+      omega = np.logspace(-2, 2, 5000)
+      mag = 1./np.abs(1 - (omega/1.234)**2 + 0.002j*omega)
+      x, y = ctrl.freqplot._decimate(omega, mag, 100)
+      self.assertTrue(len(x) <= 100)
+      self.assertEqual(y.max(), mag.max())
+      self.assertEqual(x[0], omega[0])
+      self.assertEqual(x[-1], omega[-1])
+
+   def test_singular_values(self):
+      sys = rss(6, 3, 2)
+      omega = np.logspace(-2, 2, 30)
+      sigma, w = ctrl.singular_values_plot(sys, omega, Plot=False)
+      self.assertEqual(sigma.shape, (2, 30))
+
+      # compare with one SVD per frequency
+      mag, phase, w = sys.freqresp(omega)
+      fresp = mag*np.exp(1j*phase)
+      for k in range(len(omega)):
+         np.testing.assert_array_almost_equal(
+            sigma[:, k], np.linalg.svd(fresp[:, :, k], compute_uv=False))
+
+      # same result for FRD (and transfer functions, if MIMO conversion
+      # is available)
+      if slycot_check():
+         resp = ctrl.singular_values_response(ctrl.ss2tf(sys), omega)
+         np.testing.assert_array_almost_equal(resp.sigma, sigma)
+      resp = ctrl.singular_values_response(ctrl.FRD(sys, omega), omega)
+      np.testing.assert_array_almost_equal(resp.sigma, sigma)
+
+      # SISO singular value is the magnitude
+      siso = ctrl.tf([1], [1, 2, 1])
+      resp = ctrl.singular_values_response(siso, omega)
+      np.testing.assert_array_almost_equal(
+         resp.sigma[0], np.squeeze(siso.freqresp(omega)[0]))
+
+      # plotting
+      plt.figure()
+      ctrl.sigma([sys, siso], omega, dB=True)
+
    def test_discrete(self):
       # Test discrete time frequency response
 
@@ -41,3 +41,58 @@ class TestUtils(unittest.TestCase):
         sys = tf(84, [1, 2])
         np.testing.assert_equal(sys.dcgain(), 42)
         np.testing.assert_equal(dcgain(sys), 42)
+
+    def test_freqresp_cache(self):
+        from control import config
+        from control.statesp import ss
+        from control.freqplot import default_frequency_range
+        from control.margins import stability_margins
+        omega = np.logspace(-1, 1, 20)
+        sys = ss([[-1., 2.], [0., -3.]], [[1.], [1.]], [[1., 0.]], [[0.]])
+
+        # disabled by default: nothing is stored
+        freqresp_cache_clear()
+        freqresp(sys, omega)
+        self.assertEqual(freqresp_cache_info().currsize, 0)
+
+        # and no system is fingerprinted
+        def fingerprint():
+            raise AssertionError("fingerprint with the cache disabled")
+        sys._fingerprint = fingerprint
+        freqresp(sys, omega)
+        default_frequency_range(sys)
+        stability_margins(sys)
+        del sys._fingerprint
+
+        save_size = config.freqresp_cache_size
+        try:
+            config.freqresp_cache_size = 2
+            mag1, phase1, w1 = freqresp(sys, omega)
+            mag1[:] = 0.        # results are copies
+            mag2, phase2, w2 = freqresp(sys, omega[::-1])
+            info = freqresp_cache_info()
+            self.assertEqual((info.hits, info.misses, info.currsize),
+                             (1, 1, 1))
+            np.testing.assert_array_almost_equal(
+                mag2, sys.freqresp(omega)[0])
+
+            # an equal but distinct system hits, a modified one misses
+            freqresp(ss(sys.A, sys.B, sys.C, sys.D), omega)
+            self.assertEqual(freqresp_cache_info().hits, 2)
+            sys.A[0, 1] = 1.
+            mag3, phase3, w3 = freqresp(sys, omega)
+            np.testing.assert_array_almost_equal(
+                mag3, sys.freqresp(omega)[0])
+            self.assertEqual(freqresp_cache_info().misses, 2)
+
+            # ranges and margins share the cache; LRU keeps the size bound
+            default_frequency_range(sys)
+            default_frequency_range(sys)
+            stability_margins(sys)
+            stability_margins(sys)
+            info = freqresp_cache_info()
+            self.assertEqual((info.hits, info.maxsize, info.currsize),
+                             (4, 2, 2))
+        finally:
+            config.freqresp_cache_size = save_size
+            freqresp_cache_clear()
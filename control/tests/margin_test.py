@@ -8,7 +8,7 @@ import unittest
 import numpy as np
 from control.xferfcn import TransferFunction
 from control.frdata import FRD
-from control.statesp import StateSpace
+from control.statesp import StateSpace, rss, tf2ss
 from control.margins import *
 
 def assert_array_almost_equal(x, y, ndigit=4):
@@ -310,6 +310,139 @@ class TestMargin(unittest.TestCase):
             assert_array_almost_equal(
                 res, test['result'], test['digits'])
 
+    def test_stability_margins_batch(self):
+        systems = [sys for sys, gm, wg, pm, wp in self.tsys] + [self.sys4]
+        systems += [self.types[test['sys']] * test['K']
+                    for test in self.tmargin[1:]]
+        systems += [self.yazdan[test['sys']] * test['K']
+                    for test in self.ymargin]
+        batch = stability_margins_batch(systems)
+        for i, sys in enumerate(systems):
+            assert_array_almost_equal([m[i] for m in batch],
+                                      stability_margins(sys))
+
+        # coefficient arrays, one system per row
+        gains = np.array([0.8, 2.0, 10.0])
+        gm, pm, sm, wg, wp, ws = stability_margins_batch(
+            (gains[:, np.newaxis], np.tile([1., 3., 3., 1.], (3, 1))))
+        assert_array_almost_equal(gm, 8./gains)
+        assert_array_almost_equal(wg, np.sqrt(3.)*np.ones(3))
+        self.assertEqual(pm[0], float('inf'))
+        self.assertTrue(np.isnan(wp[0]))
+
+    def test_stability_margins_frd_dense(self):
+        # densely sampled measured data, with noise giving many local
+        # minima of the distance to -1
+        sys = TransferFunction([10], [1, 3, 3, 1]) * \
+            TransferFunction([1, 0.2, 100], [1, 2, 100])
+        omega = np.logspace(-2, 3, 20000)
+        resp = sys.horner(1.j*omega)[0, 0]
+        out = stability_margins(FRD(resp, omega))
+        assert_array_almost_equal(out, stability_margins(sys))
+
+        np.random.seed(0)
+        noisy = resp * (1 + 0.001*np.random.randn(len(omega)))
+        gm, pm, sm, wg, wp, ws = stability_margins(FRD(noisy, omega),
+                                                   returnall=True)
+        self.assertTrue(len(ws) > 100)
+        self.assertTrue((ws >= omega[0]).all() and (ws <= omega[-1]).all())
+        assert_array_almost_equal(np.amin(sm), out[2], 2)
+
+    def test_secant(self):
+        from control.margins import _secant
+        a, b = np.array([3., 6., 9.]), np.array([4., 7., 10.])
+        x = _secant(np.sin, a, b, np.sin(a), np.sin(b))
+        np.testing.assert_array_almost_equal(x, np.pi*np.arange(1, 4), 12)
+
+    def test_stability_margins_ss(self):
+        # state space realizations give the same margins
+        systems = [self.types[test['sys']] * test['K']
+                   for test in self.tmargin[1:]]
+        systems += [self.yazdan[test['sys']] * test['K']
+                    for test in self.ymargin]
+        for sys in systems:
+            assert_array_almost_equal(stability_margins(tf2ss(sys)),
+                                      stability_margins(sys))
+
+        # high order system, check the crossings on the response
+        np.random.seed(5)
+        sys = rss(60, 1, 1) * 5
+        gm, pm, sm, wg, wp, ws = stability_margins(sys, returnall=True)
+        self.assertTrue(len(wg) and len(wp) and len(ws))
+        resp = sys.horner(1.j * wp)[0, 0]
+        np.testing.assert_array_almost_equal(np.abs(resp), 1., 8)
+        resp = sys.horner(1.j * wg)[0, 0]
+        np.testing.assert_array_almost_equal(resp.imag / np.abs(resp), 0., 8)
+        np.testing.assert_array_almost_equal(1. / np.abs(resp), gm)
+        omega = np.linspace(0.999, 1.001, 21)[:, np.newaxis] * ws
+        dist = np.abs(sys.horner(1.j * omega.ravel())[0, 0] + 1.)
+        self.assertTrue((dist.reshape(omega.shape) >= sm - 1e-10).all())
+
+    def test_mimo_margins(self):
+        # a single loop gives the SISO margins
+        sys = TransferFunction([4], [1, 3, 3, 1])
+        loop, disk, multiloop = mimo_margins(tf2ss(sys))
+        assert_array_almost_equal(np.array(loop).ravel(),
+                                  stability_margins(sys))
+        omega = np.linspace(0.01, 10, 100001)
+        dist = np.abs(1./(1. + sys.horner(1.j*omega)[0, 0]) - 0.5)
+        np.testing.assert_array_almost_equal(disk.alpha, [1./dist.max()])
+        self.assertAlmostEqual(multiloop.alpha, 1./dist.max())
+        self.assertAlmostEqual(disk.pm[0],
+                               np.degrees(2*np.arctan(disk.alpha[0]/2)))
+
+        # coupled loops, compare loop 1 with loop 2 closed by hand
+        np.random.seed(2)
+        L = rss(4, 2, 2) * 3
+        loop, disk, multiloop = mimo_margins(L)
+        omega = np.logspace(-3, 2, 20000)
+        resp = L.horner(1.j*omega)
+        l1 = resp[0, 0] - resp[0, 1]*resp[1, 0]/(1 + resp[1, 1])
+        assert_array_almost_equal([m[0] for m in loop],
+                                  stability_margins(FRD(l1, omega)), 3)
+        self.assertTrue(multiloop.alpha <= np.amin(disk.alpha))
+
+        # loop transfer function must be square
+        self.assertRaises(ValueError, mimo_margins, rss(2, 1, 2))
+
+    def test_nyquist_stability(self):
+        # (open loop system, unstable closed loop poles)
+        cases = (
+            (TransferFunction([4], [1, 3, 3, 1]), 0),
+            (TransferFunction([20], [1, 3, 3, 1]), 2),
+            # open loop unstable
+            (TransferFunction([2], [1, -1]), 0),
+            # integrator and imaginary axis poles are indented around
+            (TransferFunction([3], [1, 3, 2, 0]), 0),
+            (TransferFunction([10], [1, 3, 2, 0]), 2),
+            (TransferFunction([1, 1], [1, 0, 1]), 0),
+            (TransferFunction([-1, 1], [1, 0, 0]), 2),
+            # discrete time
+            (TransferFunction([0.5], [1, -0.5], 0.1), 0),
+            (TransferFunction([2.], [1, -0.5], 0.1), 1),
+            (TransferFunction([0.1], [1, -1], 0.1), 0),
+            (TransferFunction([1], [1, 0, 1], 0.1), 2))
+        for sys, unstable in cases:
+            N, P, Z, contour, response = nyquist_stability(sys)
+            self.assertEqual(Z, unstable)
+            self.assertEqual(Z, N + P)
+            self.assertEqual(response.shape, (1, 1, len(contour)))
+
+    def test_nyquist_stability_random(self):
+        from control.statesp import rss, drss
+        from control.bdalg import feedback
+        np.random.seed(7)
+        for i in range(40):
+            m = 1 + i % 2
+            sys = (rss if i % 4 < 2 else drss)(4, m, m) * 3.
+            cl_poles = feedback(sys, StateSpace([], [], [], np.eye(m))).pole()
+            if sys.isdtime(strict=True):
+                unstable = np.sum(np.abs(cl_poles) > 1.)
+            else:
+                unstable = np.sum(cl_poles.real > 0.)
+            self.assertEqual(nyquist_stability(sys).closed_loop_unstable,
+                             unstable)
+
 def test_suite():
     return unittest.TestLoader().loadTestsFromTestCase(TestMargin)
 
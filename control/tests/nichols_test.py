@@ -29,6 +29,19 @@ class TestStateSpace(unittest.TestCase):
         nichols(self.sys, grid=False)
         ngrid()
 
+    def testNgridCache(self):
+        """Nichols grid contours are computed once per set of levels."""
+        from control.nichols import _nichols_grid_contours, m_circles
+        mags = np.array([-6.0, 0.0, 6.0])
+        phases = np.array([-45.0, -90.0, -180.0])
+        contours = _nichols_grid_contours(mags, phases)
+        self.assertTrue(_nichols_grid_contours(mags, phases) is contours)
+        self.assertFalse(contours[0].flags.writeable)
+
+        m = m_circles(mags, phase_min=-180.0, phase_max=-45.0)
+        np.testing.assert_array_almost_equal(contours[1],
+                                             20*np.log10(np.abs(m)))
+
 def suite():
    return unittest.TestLoader().loadTestsFromTestCase(TestStateSpace)
 
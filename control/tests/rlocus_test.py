@@ -5,11 +5,14 @@
 
 import unittest
 import numpy as np
-from control.rlocus import root_locus, _RLClickDispatcher
-from control.xferfcn import TransferFunction
+from control.rlocus import root_locus, _RLClickDispatcher, \
+    _RLFindRoots, _RLSortRoots, _RLContinuation, _RLFindRootsSS, RootLocusIndex, \
+    _RLPrecompute, _ss_default_gains
+from control.xferfcn import TransferFunction, ss2tf
 from control.statesp import StateSpace
 from control.bdalg import feedback
 import matplotlib.pyplot as plt
+from matplotlib.backend_bases import MouseEvent
 from control.tests.margin_test import assert_array_almost_equal
 
 
@@ -62,12 +65,186 @@ class TestRootLocus(unittest.TestCase):
         zoom_y = ax_rlocus.lines[-2].get_data()[1][0:5]
         zoom_y = [abs(y) for y in zoom_y]
 
-        zoom_x_valid = [-5. ,- 4.61281263, - 4.16689986, - 4.04122642, - 3.90736502]
+        zoom_x_valid = [-5., -4.28829661, -3.68773391, -3.27665151, -2.99210706]
         zoom_y_valid = [0. ,0., 0., 0., 0.]
 
         assert_array_almost_equal(zoom_x,zoom_x_valid)
         assert_array_almost_equal(zoom_y,zoom_y_valid)
 
+    def test_find_roots(self):
+        """Batched roots for all gains, with roots at infinity as inf"""
+        num, den = np.poly1d([2., 1., 3.]), np.poly1d([1., 2., 3., 4.])
+        kvect = np.linspace(-2, 2, 11)
+        roots = _RLFindRoots(num, den, kvect)
+        self.assertEqual(roots.shape, (11, 3))
+        for k, row in zip(kvect, roots):
+            expected = (den + k*num).r
+            if len(expected) < 3:
+                expected = np.append(expected, np.inf)
+            np.testing.assert_array_almost_equal(row, np.sort(expected))
+
+        # leading coefficient cancels for equal order
+        roots = _RLFindRoots(np.poly1d([1., 1.]), np.poly1d([1., 2.]), [-1.])
+        np.testing.assert_array_equal(roots, [[np.inf]])
+
+    def test_sort_roots(self):
+        """Branches are matched with the smallest total distance"""
+        mymat = np.array([[0., 1.], [1.7, 0.6], [0.7, 1.8]])
+        np.testing.assert_array_equal(_RLSortRoots(mymat),
+                                      [[0., 1.], [0.6, 1.7], [0.7, 1.8]])
+
+        # roots at infinity stay on their own branch
+        mymat = np.array([[np.inf, -1.], [-2., np.inf], [np.inf, -3.]])
+        np.testing.assert_array_equal(_RLSortRoots(mymat),
+                                      [[np.inf, -1.], [np.inf, -2.],
+                                       [np.inf, -3.]])
+
+    def test_continuation(self):
+        """Branches followed with steps within the tolerance"""
+        num, den = np.poly1d([1., 3.]), np.poly1d([1., 5., 6., 0., 0.])
+        anchors = np.linspace(0, 50, 6)
+        kvect, mymat = _RLContinuation(num, den, anchors, 0.2)
+        self.assertEqual(mymat.shape, (len(kvect), 4))
+        self.assertTrue(np.all(np.diff(kvect) > 0))
+        self.assertTrue(np.all(np.isin(anchors, kvect)))
+        self.assertTrue(len(kvect) > 20)
+        for k, row in zip(kvect, mymat):
+            np.testing.assert_array_almost_equal(
+                np.sort_complex(row), np.sort_complex((den + k*num).r), 4)
+        # apart from the double pole at 0, roots move at most 0.2 per step
+        steps = np.abs(np.diff(mymat, axis=0))
+        self.assertTrue(np.all(steps[1:] <= 0.2 + 1e-10))
+
+    def test_state_space(self):
+        """MIMO state space root locus along a gain direction"""
+        A = [[-1., 2., 0.], [0., -2., 1.], [1., 0., -3.]]
+        B = [[1., 0.], [0., 1.], [1., 1.]]
+        C = [[1., 0., 1.], [0., 1., 0.]]
+        D = [[0., 0.], [0.5, 0.]]
+        sys = StateSpace(A, B, C, D)
+        K0 = np.array([[1., 0.5], [0., 2.]])
+        klist = [0., 0.5, 1., 10.]
+        roots, k_out = root_locus(sys, klist, Plot=False, gain_direction=K0)
+        np.testing.assert_array_equal(klist, k_out)
+        for k, poles in zip(klist, roots):
+            K = StateSpace([], [], [], k * K0)
+            poles_expected = np.sort_complex(feedback(sys, K).pole())
+            np.testing.assert_array_almost_equal(np.sort_complex(poles),
+                                                 poles_expected)
+
+        roots, kvect = root_locus(sys, Plot=False, gain_direction=K0)
+        self.assertEqual(roots.shape, (len(kvect), 3))
+        self.assertTrue(np.all(np.diff(kvect) > 0))
+        np.testing.assert_array_almost_equal(
+            np.sort_complex(roots), _RLFindRootsSS(sys, K0, kvect))
+
+        # the branches are followed within the tolerance of the plot
+        kvect, roots, xlim, ylim = _ss_default_gains(sys, K0, None, None)
+        tolerance = 0.05 * min(xlim[1] - xlim[0], ylim[1] - ylim[0])
+        step = np.abs(np.diff(roots[:-3], axis=0))
+        self.assertTrue(np.all(step <= 1.01 * tolerance))
+
+        # D K0 singular for one gain: I + k D K0 with k = -4 has no inverse
+        roots = _RLFindRootsSS(sys, K0, [-4., 0.])
+        self.assertTrue(np.all(np.isinf(roots[0])))
+        self.assertRaises(ValueError, root_locus, sys, klist, Plot=False,
+                          gain_direction=np.eye(3))
+
+        # SISO state space systems have the same locus as their transfer
+        # functions, unless a gain direction is given
+        siso = StateSpace([[0., 1.], [-2., -3.]], [[0.], [1.]], [[1., 0.]],
+                          [[0.]])
+        roots, kvect = root_locus(siso, Plot=False)
+        roots_tf, kvect_tf = root_locus(ss2tf(siso), Plot=False)
+        np.testing.assert_array_almost_equal(kvect, kvect_tf)
+        np.testing.assert_array_almost_equal(roots, roots_tf)
+        roots, kvect = root_locus(siso, [0., 1., 2.], Plot=False,
+                                  gain_direction=[[1.]])
+        for k, poles in zip(kvect, roots):
+            poles_expected = np.sort_complex(np.roots([1., 3., 2. + k]))
+            np.testing.assert_array_almost_equal(np.sort_complex(poles),
+                                                 poles_expected)
+
+    def test_state_space_siso(self):
+        """SISO state space loci from eigenvalues and their gain lookups"""
+        # clustered, lightly damped modes: the closed loop polynomial of
+        # 16 states has inaccurate roots
+        rng = np.random.RandomState(0)
+        A = np.zeros((16, 16))
+        for i, w in enumerate(np.sort(rng.uniform(1., 3., 8))):
+            A[2*i:2*i+2, 2*i:2*i+2] = [[0., 1.], [-w**2, -0.02*w]]
+        sys = StateSpace(A, rng.randn(16, 1), rng.randn(1, 16), [[0.]])
+        klist = [0., 0.1, 1.]
+        roots, kvect = root_locus(sys, klist, Plot=False)
+        np.testing.assert_allclose(np.sort_complex(roots),
+                                   _RLFindRootsSS(sys, np.eye(1), klist),
+                                   rtol=1e-12, atol=1e-12)
+
+        # clicks are looked up on the locus, with the gain direction
+        siso = StateSpace([[0., 1.], [-2., -3.]], [[0.], [1.]], [[1., 0.]],
+                          [[0.]])
+        plt.close('all')
+        root_locus(siso, [0., 1., 2.], gain_direction=[[2.]])
+        fig = plt.gcf()
+        ax = fig.axes[0]
+        # closed loop s^2 + 3 s + 2 + 2 k, at k = 2
+        s = complex(-1.5, np.sqrt(15.) / 2.)
+        x, y = ax.transData.transform((s.real, s.imag))
+        event = MouseEvent('button_release_event', fig.canvas, x, y, 1)
+        fig.canvas.callbacks.process('button_release_event', event)
+        self.assertIn("gain:          2 ", fig._suptitle.get_text())
+
+    def test_index(self):
+        """Gain lookups on a computed locus"""
+        # closed loop s^2 + 2 s + k: damping 1/sqrt(k), frequency sqrt(k)
+        sys = TransferFunction([1], [1, 2, 0])
+        roots, kvect = root_locus(sys, np.linspace(0, 20, 201), Plot=False)
+        index = RootLocusIndex(roots, kvect)
+        np.testing.assert_array_almost_equal(index.gain_at_damping(0.5),
+                                             [4., 4.])
+        np.testing.assert_array_almost_equal(index.gain_at_frequency(3.),
+                                             [9., 9.])
+        self.assertTrue(np.isnan(index.gain_at_frequency(5., branch=0)))
+
+        # between the samples, the gain is interpolated
+        gain, point, branch = index.nearest(-1.1 + 1.75j)
+        self.assertAlmostEqual(point, -1 + 1.75j)
+        self.assertAlmostEqual(gain, 1 + 1.75**2, places=2)
+        self.assertEqual(np.imag(roots[-1, branch]) > 0, True)
+
+        # discrete time loci are indexed in terms of s = log(z)/dt
+        index = RootLocusIndex(np.exp(roots * 0.1), kvect, 0.1)
+        np.testing.assert_array_almost_equal(index.gain_at_damping(0.5),
+                                             [4., 4.])
+
+        # a locus without finite points has no nearest point
+        index = RootLocusIndex([[np.inf, np.nan], [np.inf, np.inf]], [0, 1])
+        gain, point, branch = index.nearest(-1 + 1j)
+        self.assertTrue(np.isnan(gain) and np.isnan(point))
+        self.assertEqual(branch, -1)
+        self.assertTrue(np.isnan(index.gain_at_damping(0.5, branch=0)))
+
+    def test_precompute(self):
+        """Break points, asymptotes and imaginary axis crossings"""
+        num, den = np.poly1d([1.]), np.poly1d([1., 7., 10., 0.])
+        features = _RLPrecompute(num, den)
+        s = (-14. + np.sqrt(76.)) / 6.
+        np.testing.assert_array_almost_equal(features.real_break, [s])
+        np.testing.assert_array_almost_equal(features.k_break, [-den(s)])
+        self.assertAlmostEqual(features.centroid, -7. / 3.)
+        np.testing.assert_array_almost_equal(features.angles,
+                                             [np.pi/3, np.pi, 5*np.pi/3])
+        # Routh: s^3 + 7 s^2 + 10 s + k is marginally stable for k = 70
+        np.testing.assert_array_almost_equal(features.k_cross, [70.])
+        np.testing.assert_array_almost_equal(features.cross,
+                                             [1j * np.sqrt(10.)])
+
+        # z^2 - 0.5 z + k reaches the unit circle for k = 1
+        features = _RLPrecompute(np.poly1d([1.]), np.poly1d([1., -0.5, 0.]),
+                                 dtime=True)
+        np.testing.assert_array_almost_equal(features.k_cross, [1.])
+        np.testing.assert_array_almost_equal(np.abs(features.cross), [1.])
+
 def test_suite():
     return unittest.TestLoader().loadTestsFromTestCase(TestRootLocus)
 
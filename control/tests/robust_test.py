@@ -364,5 +364,93 @@ class TestMixsyn(unittest.TestCase):
         np.testing.assert_allclose(rcond, info[1])
 
 
+class TestNorms(unittest.TestCase):
+    def testHinfnorm(self):
+        """Test hinfnorm"""
+        # lightly damped resonance, missed by a coarse frequency grid
+        g = control.tf([1], [1, 1e-4, 1])
+        gpeak, fpeak = control.robust.hinfnorm(g)
+        np.testing.assert_allclose(gpeak, 1e4, rtol=1e-6)
+        np.testing.assert_allclose(fpeak, 1., rtol=1e-6)
+
+        # direct feedthrough dominates
+        gpeak, fpeak = control.robust.hinfnorm(control.tf([2, 1], [1, 1]))
+        np.testing.assert_allclose(gpeak, 2.)
+        self.assertEqual(fpeak, np.inf)
+
+        # discrete time, peak at the Nyquist frequency
+        gpeak, fpeak = control.robust.hinfnorm(control.tf([1], [1, 0.5], 0.1))
+        np.testing.assert_allclose(gpeak, 2.)
+        np.testing.assert_allclose(fpeak, np.pi/0.1)
+
+        # MIMO systems, compared to a dense frequency sweep, and batches
+        np.random.seed(0)
+        systems = [control.rss(6, 2, 3) for i in range(5)]
+        gpeak, fpeak = control.robust.hinfnorm(systems)
+        omega = np.concatenate([[0], np.logspace(-3, 3, 20000)])
+        for i, sys in enumerate(systems):
+            sv = np.linalg.svd(sys.horner(1j*omega).transpose(2, 0, 1),
+                               compute_uv=False)[:, 0]
+            self.assertTrue(sv.max() <= gpeak[i] * (1 + 1e-5))
+            self.assertTrue(sv.max() >= gpeak[i] * (1 - 1e-3))
+
+        # discrete time MIMO system with lightly damped modes, compared to
+        # a dense frequency sweep around the resonances
+        rng = np.random.RandomState(94)
+        A = np.zeros((6, 6))
+        for i, (r, th) in enumerate(zip(1 - 10**rng.uniform(-5, -1.5, 3),
+                                        rng.uniform(0.05, 3., 3))):
+            A[2*i:2*i+2, 2*i:2*i+2] = r * np.array(
+                [[np.cos(th), -np.sin(th)], [np.sin(th), np.cos(th)]])
+        T = rng.randn(6, 6)
+        A = np.dot(T, np.dot(A, np.linalg.inv(T)))
+        sys = control.ss(A, rng.randn(6, 2), rng.randn(2, 6),
+                         rng.randn(2, 2), 1)
+        gpeak, fpeak = control.robust.hinfnorm(sys)
+        omega = np.concatenate(
+            [np.linspace(0, np.pi, 2001)] +
+            [th + np.linspace(-3e-3, 3e-3, 6001)
+             for th in np.abs(np.angle(np.linalg.eigvals(A)))])
+        sv = np.linalg.svd(sys.horner(np.exp(1j*omega)).transpose(2, 0, 1),
+                           compute_uv=False)[:, 0]
+        np.testing.assert_allclose(gpeak, sv.max(), rtol=1e-5)
+
+        # unstable systems have an infinite norm
+        gpeak, fpeak = control.robust.hinfnorm(control.tf([1], [1, -1]))
+        self.assertEqual(gpeak, np.inf)
+
+        # static gains
+        gpeak, fpeak = control.robust.hinfnorm(control.ss([], [], [], [[2.]]))
+        self.assertEqual((gpeak, fpeak), (2., 0.))
+        gpeak, fpeak = control.robust.hinfnorm(
+            control.ss([], [], [], [[3., 0.], [0., -4.]], 0.1))
+        np.testing.assert_allclose(gpeak, 4.)
+
+    def testH2normStatic(self):
+        """Test h2norm for systems without states"""
+        np.testing.assert_allclose(
+            control.robust.h2norm(control.ss([], [], [], [[1., 2.]], 1)),
+            np.sqrt(5.))
+        norms = control.robust.h2norm(
+            [control.ss([], [], [], [[0.]]),
+             control.ss([], [], [], [[2.]]),
+             control.tf([1], [1, -1])])
+        np.testing.assert_allclose(norms, [0., np.inf, np.inf])
+
+    @unittest.skipIf(not slycot_check(), "slycot not installed")
+    def testH2norm(self):
+        """Test h2norm"""
+        np.testing.assert_allclose(
+            control.robust.h2norm(control.tf([1], [1, 1])), np.sqrt(0.5))
+        # impulse response (-0.5)^(k-1), k >= 1
+        np.testing.assert_allclose(
+            control.robust.h2norm(control.tf([1], [1, 0.5], 1)),
+            np.sqrt(1/(1 - 0.25)))
+        norms = control.robust.h2norm(
+            [control.tf([1], [1, 1]), control.tf([1], [1, -1]),
+             control.tf([1, 0], [1, 1])])
+        np.testing.assert_allclose(norms, [np.sqrt(0.5), np.inf, np.inf])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,11 @@
 import unittest
 import numpy as np
-from control.sisotool import sisotool
+from control.sisotool import sisotool, _SisotoolUpdate
 from control.tests.margin_test import assert_array_almost_equal
 from control.rlocus import _RLClickDispatcher
 from control.xferfcn import TransferFunction
+from control.freqplot import bode_response
+from control.timeresp import step_response
 import matplotlib.pyplot as plt
 
 class TestSisotool(unittest.TestCase):
@@ -62,6 +64,37 @@ class TestSisotool(unittest.TestCase):
         step_response_moved = np.array([[ 0.,          0.02458187,  0.16529784 , 0.46602716 , 0.91012035 , 1.43364313, 1.93996334 , 2.3190105  , 2.47041552 , 2.32724853] ])
         assert_array_almost_equal(ax_step.lines[0].get_data()[1][:10],step_response_moved)
 
+    def test_sisotool_update(self):
+        """Gain updates scale the cached responses"""
+        fig, axes = plt.subplots(2, 2)
+        bode_plot_params = {
+            'omega': None,
+            'dB': False,
+            'Hz': False,
+            'deg': True,
+            'omega_limits': None,
+            'omega_num': None,
+            'sisotool': True,
+            'fig': fig,
+            'margins': True
+        }
+        ax_mag,ax_rlocus,ax_phase,ax_step = fig.axes[0],fig.axes[1],fig.axes[2],fig.axes[3]
+        tvect = np.linspace(0, 5, 101)
+        _SisotoolUpdate(self.system, fig, 1., bode_plot_params, tvect)
+        omega = ax_mag.lines[0].get_xdata()
+        _SisotoolUpdate(self.system, fig, 2., bode_plot_params, tvect)
+
+        mag, phase, omega, _ = bode_response(2. * self.system, omega)
+        assert_array_almost_equal(ax_mag.lines[0].get_ydata(), mag)
+        assert_array_almost_equal(ax_phase.lines[0].get_ydata(),
+                                  phase * 180. / np.pi)
+        t, y = step_response((2. * self.system).feedback(1), tvect)
+        assert_array_almost_equal(ax_step.lines[0].get_ydata(), y)
+        self.assertEqual(len(ax_step.lines), 2)
+        self.assertEqual(ax_mag.texts[0].get_text(),
+                         'G.M.: 1.25 \nFreq: 10.00 rad/s')
+        plt.close(fig)
+
 def test_suite():
     return unittest.TestLoader().loadTestsFromTestCase(TestSisotool)
 
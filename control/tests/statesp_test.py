@@ -4,11 +4,13 @@
 # RMM, 30 Mar 2011 (based on TestStateSp from v0.4a)
 
 import unittest
+import threading
 import numpy as np
 from numpy.linalg import solve
 from scipy.linalg import eigvals, block_diag
 from control import matlab
-from control.statesp import StateSpace, _convertToStateSpace, tf2ss
+from control.statesp import StateSpace, _convertToStateSpace, tf2ss, \
+    _freqresp_chunks
 from control.xferfcn import TransferFunction, ss2tf
 from control.lti import evalfr
 from control.exception import slycot_check
@@ -73,6 +75,18 @@ class TestStateSpace(unittest.TestCase):
 
         np.testing.assert_array_almost_equal(p, true_p)
 
+    def test_pole_cached(self):
+        """Poles are cached, but recomputed after changing the matrices."""
+        sys = StateSpace(self.sys322)
+        p1 = sys.pole()
+        p1[:] = 0.
+        np.testing.assert_array_almost_equal(np.sort(sys.pole()),
+                                             np.sort(self.sys322.pole()))
+
+        sys.A[0, 0] = -5.
+        np.testing.assert_array_almost_equal(np.sort(sys.pole()),
+                                             np.sort(eigvals(sys.A)))
+
     def test_zero_empty(self):
         """Test to make sure zero() works with no zeros in system."""
         sys = _convertToStateSpace(TransferFunction([1], [1, 2, 1]))
@@ -184,6 +198,11 @@ class TestStateSpace(unittest.TestCase):
         np.testing.assert_almost_equal(evalfr(sys, 1j), resp)
         np.testing.assert_almost_equal(sys._evalfr(1.), resp)
 
+        # Evaluation at several points at once
+        np.testing.assert_almost_equal(sys.horner([1j, 2.])[:, :, 0], resp)
+        np.testing.assert_almost_equal(sys.horner([1j, 2.])[:, :, 1],
+                                       sys.horner(2.))
+
         # Deprecated version of the call (should generate warning)
         import warnings
         with warnings.catch_warnings(record=True) as w:
@@ -222,6 +241,30 @@ class TestStateSpace(unittest.TestCase):
         np.testing.assert_almost_equal(phase, true_phase)
         np.testing.assert_equal(omega, true_omega)
 
+    def test_freq_resp_workers(self):
+        """Threaded evaluation gives the same result as a single thread."""
+
+        omega = np.logspace(-2, 2, 101)
+        mag1, phase1, omega1 = self.sys322.freqresp(omega, workers=1)
+        for workers in (2, 7, -1, 200):
+            mag, phase, omega2 = self.sys322.freqresp(omega, workers=workers)
+            np.testing.assert_array_almost_equal(mag, mag1)
+            np.testing.assert_array_almost_equal(phase, phase1)
+            np.testing.assert_equal(omega2, omega1)
+
+        # the number of threads is limited by the number of frequencies
+        self.assertEqual(len(_freqresp_chunks(5, -1)), 1)
+        self.assertEqual(len(_freqresp_chunks(101, 200)), 6)
+        self.assertEqual(len(_freqresp_chunks(101, 2)), 2)
+        self.assertEqual(len(_freqresp_chunks(0, 4)), 0)
+        chunks = _freqresp_chunks(101, 4)
+        np.testing.assert_array_equal(np.concatenate(chunks), np.arange(101))
+
+        # and the threads are joined before returning
+        threads = threading.active_count()
+        self.sys322.freqresp(np.logspace(-2, 2, 200), workers=4)
+        self.assertEqual(threading.active_count(), threads)
+
     @unittest.skipIf(not slycot_check(), "slycot not installed")
     def test_minreal(self):
         """Test a minreal model reduction."""
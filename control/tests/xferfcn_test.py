@@ -88,6 +88,41 @@ class TestXferFcn(unittest.TestCase):
         np.testing.assert_array_equal(sys1.num, [[[0.]]])
         np.testing.assert_array_equal(sys1.den, [[[1.]]])
 
+    def test_padded_coefficients(self):
+        """Coefficients are stored in padded arrays viewed by num, den"""
+        sys = TransferFunction([[[1., 2.], [3.]], [[0., 1.], [1., 0., 2.]]],
+                               [[[1., 3.], [1., 1.]], [[1., 2., 1.], [1.]]])
+        num, den, numorder, denorder = sys._coeffs()
+        np.testing.assert_array_equal(num, [[[0., 1., 2.], [0., 0., 3.]],
+                                            [[0., 0., 1.], [1., 0., 2.]]])
+        np.testing.assert_array_equal(numorder, [[1, 0], [0, 2]])
+        np.testing.assert_array_equal(denorder, [[1, 1], [2, 0]])
+        self.assertTrue(np.shares_memory(sys.num[1][1], num))
+        self.assertTrue(np.shares_memory(sys.den[0][0], den))
+
+        # changes in place are seen by the padded arrays; replaced
+        # elements make them be rebuilt
+        sys.num[0][0] *= 2
+        np.testing.assert_array_equal(sys._coeffs()[0][0, 0], [0., 2., 4.])
+        den11 = sys.den[1][1] = np.array([2., 1.])
+        np.testing.assert_array_equal(sys._coeffs()[1][1, 1], [0., 2., 1.])
+        np.testing.assert_array_almost_equal(
+            sys.horner(1j), [[(4 + 2j) / (3 + 1j), 3 / (1 + 1j)],
+                             [1 / (2j), 1 / (1 + 2j)]])
+        self.assertTrue(sys.den[1][1] is den11)
+
+    def test_coefficient_references(self):
+        """Elements of num and den stay valid across evaluations"""
+        sys = TransferFunction([1., 2.], [1., 3., 2.])
+        num = sys.num[0][0]
+        sys.horner(1j)
+        num[0] = 10.
+        self.assertTrue(sys.num[0][0] is num)
+        np.testing.assert_array_almost_equal(sys.horner(1j), [[3.2 + 0.4j]])
+        sys2 = sys + sys
+        self.assertTrue(sys.num[0][0] is num)
+        np.testing.assert_array_almost_equal(sys2.horner(1j), [[6.4 + 0.8j]])
+
     # Tests for TransferFunction.__neg__
 
     def test_reverse_sign_scalar(self):
@@ -270,13 +305,13 @@ class TestXferFcn(unittest.TestCase):
         den2 = [[[1., 0., 0., 0.]],
                 [[-2., 1., 3.]],
                 [[4., -1., -1., 0.]]]
-        num3 = [[[-24., 52., -14., 245., -490., -115., 467., -95., -56., 12.,
-                  0., 0., 0.]],
+        # the common factors s^3 and s are kept only once
+        num3 = [[[-24., 52., -14., 245., -490., -115., 467., -95., -56.,
+                  12.]],
                 [[24., -132., 138., 345., -768., -106., 510., 41., -79., -69.,
-                 -23., 17., 6., 0.]]]
-        den3 = [[[48., -92., -84., 183., 44., -97., -2., 12., 0., 0., 0., 0.,
-                  0., 0.]],
-                [[-48., 60., 84., -81., -45., 21., 9., 0., 0., 0., 0., 0., 0.]]]
+                 -23., 17., 6.]]]
+        den3 = [[[48., -92., -84., 183., 44., -97., -2., 12., 0., 0., 0.]],
+                [[-48., 60., 84., -81., -45., 21., 9., 0., 0., 0., 0., 0.]]]
 
         sys1 = TransferFunction(num1, den1)
         sys2 = TransferFunction(num2, den2)
@@ -287,6 +322,80 @@ class TestXferFcn(unittest.TestCase):
                 np.testing.assert_array_equal(sys3.num[i][j], num3[i][j])
                 np.testing.assert_array_equal(sys3.den[i][j], den3[i][j])
 
+    def test_shared_denominators(self):
+        """Sums and products keep shared denominators only once."""
+        h = TransferFunction([1., 2.], [1., 3., 1.])
+        g = TransferFunction([1.], [1., 1., 0.])
+        H = TransferFunction([[h.num[0][0]] * 3] * 3,
+                             [[h.den[0][0]] * 3] * 3)
+        s = 1j * np.array([0.1, 1., 10.])
+        hval = h.horner(s)[0, 0]
+
+        sys = H + H
+        np.testing.assert_array_almost_equal(sys.den[0][0], [1., 3., 1.])
+        np.testing.assert_array_almost_equal(sys.num[0][0], [2., 4.])
+
+        sys = H * H * H
+        for i in range(3):
+            for j in range(3):
+                self.assertEqual(len(sys.den[i][j]), 7)
+        np.testing.assert_array_almost_equal(sys.horner(s)[1, 2],
+                                             9. * hval**3)
+
+        # a partially shared factor s + 1 enters the result once
+        sys = g + TransferFunction([1.], [1., 1.])
+        np.testing.assert_array_almost_equal(sys.num[0][0], [1., 1.])
+        np.testing.assert_array_almost_equal(sys.den[0][0], [1., 1., 0.])
+
+        # zero summands leave the other term unchanged
+        sys = TransferFunction([[[1.], [0.]]], [[[1., 1.], [1., 5.]]]) * \
+            TransferFunction([[[1.]], [[2.]]], [[[1., 2.]], [[1., 3.]]])
+        np.testing.assert_array_equal(sys.num[0][0], [1.])
+        np.testing.assert_array_equal(sys.den[0][0], [1., 3., 2.])
+
+    def test_generic_products(self):
+        """Products and sums without common factors are cross multiplied."""
+        rng = np.random.RandomState(0)
+
+        def randtf():
+            return TransferFunction(
+                [[rng.randn(2) for j in range(8)] for i in range(8)],
+                [[np.poly(-5 * rng.rand(2)) for j in range(8)]
+                 for i in range(8)])
+
+        M, N = randtf(), randtf()
+        P = M * N
+        S = M + N
+        for i in range(8):
+            for j in range(8):
+                self.assertEqual(len(P.den[i][j]), 33)
+                self.assertEqual(len(S.den[i][j]), 5)
+
+        s = 1j * np.array([0.5, 3.])
+        Ms, Ns = M.horner(s), N.horner(s)
+        np.testing.assert_allclose(P.horner(s),
+                                   np.einsum('ikf,kjf->ijf', Ms, Ns),
+                                   rtol=1e-10)
+        np.testing.assert_allclose(S.horner(s), Ms + Ns, rtol=1e-10)
+
+    def test_close_poles(self):
+        """Poles that are close but not equal are not cancelled."""
+        for zeta in [1.01e-6, 1.5e-8]:
+            sys1 = TransferFunction(1., [1., 2e-6, 1.])
+            sys2 = TransferFunction(1., [1., 2 * zeta, 1.])
+            sys = sys1 + sys2
+            np.testing.assert_array_almost_equal(
+                sys.den[0][0], np.polymul([1., 2e-6, 1.], [1., 2 * zeta, 1.]))
+            s = 1j * np.array([0.5, 1., 2.])
+            np.testing.assert_allclose(sys.horner(s)[0, 0],
+                                       sys1.horner(s)[0, 0] +
+                                       sys2.horner(s)[0, 0], rtol=1e-3)
+
+        # common factors are still cancelled
+        sys = TransferFunction(1., [1., 3., 2.]) + \
+            TransferFunction(1., [1., 4., 3.])
+        np.testing.assert_array_almost_equal(sys.den[0][0], [1., 6., 11., 6.])
+
     # Tests for TransferFunction.__div__
 
     def test_divide_scalar(self):
@@ -414,6 +523,45 @@ class TestXferFcn(unittest.TestCase):
 
         np.testing.assert_array_almost_equal(p, [-2., -2., -7., -3., -2.])
 
+    def test_pole_cached(self):
+        """Cached poles and zeros are refreshed when coefficients change."""
+        sys = TransferFunction([1., 3.], [1., 3., 2.])
+        np.testing.assert_array_almost_equal(np.sort(sys.pole()), [-2., -1.])
+        np.testing.assert_array_almost_equal(sys.zero(), [-3.])
+
+        sys.den[0][0][1] = 5.
+        sys.num[0][0][1] = 4.
+        np.testing.assert_array_almost_equal(np.sort(sys.pole()),
+                                             np.sort(np.roots([1., 5., 2.])))
+        np.testing.assert_array_almost_equal(sys.zero(), [-4.])
+
+    def test_common_den(self):
+        """Common denominators keep each pole with its largest multiplicity
+        over the outputs."""
+        from control.xferfcn import _match_roots
+
+        i1, i2 = _match_roots(np.array([-1., -1., -2., 1j, -1j]),
+                              np.array([-1j, -1., -3., -1.]), 1e-10)
+        np.testing.assert_array_equal(np.sort(i1), [0, 1, 4])
+        np.testing.assert_array_equal(np.sort(i2), [0, 1, 3])
+
+        sys = TransferFunction(
+            [[[1.], [2., 1.]], [[1., 0.], [-1.]], [[3.], [1.]]],
+            [[[1., 2., 1.], [1., 2.]],
+             [[1., 3., 2.], [1., 3., 2.]],
+             [[1., 1.], [1., 5., 6.]]])
+        num, den, denorder = sys._common_den()
+        np.testing.assert_array_equal(denorder, [3, 3])
+        np.testing.assert_array_almost_equal(den[0], np.poly([-1, -1, -2]))
+        np.testing.assert_array_almost_equal(den[1], np.poly([-1, -2, -3]))
+        s = 1j * np.array([0.5, 2.])
+        for i in range(sys.outputs):
+            for j in range(sys.inputs):
+                np.testing.assert_array_almost_equal(
+                    np.polyval(num[i, j, :denorder[j] + 1], s) /
+                    np.polyval(den[j, :denorder[j] + 1], s),
+                    sys.horner(s)[i, j])
+
     @unittest.skipIf(not slycot_check(), "slycot not installed")
     def test_double_cancelling_poles_siso(self):
         
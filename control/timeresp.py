@@ -52,7 +52,6 @@ $Id$
 # Libraries that we make use of
 import scipy as sp              # SciPy library (used all over)
 import numpy as np              # NumPy library
-from scipy.signal.ltisys import _default_response_times
 import warnings
 from .lti import LTI     # base class of StateSpace, TransferFunction
 from .statesp import _convertToStateSpace, _mimo2simo, _mimo2siso
@@ -390,6 +389,18 @@ def _get_ss_simo(sys, input=None, output=None):
     else:
         return _mimo2siso(sys_ss, input, output, warn_conversion=warn)
 
+def _default_response_times(sys, n):
+    """Compute a reasonable set of n time samples for a response of sys
+
+    The time span is seven times the slowest time constant, computed
+    from the (cached) poles of the system.
+    """
+    poles = sys.pole()
+    r = min(abs(np.real(poles))) if len(poles) else 0.0
+    if r == 0.0:
+        r = 1.0
+    return np.linspace(0.0, 7.0 / r, n)
+
 def step_response(sys, T=None, X0=0., input=None, output=None,
                   transpose=False, return_x=False):
     # pylint: disable=W0622
@@ -452,10 +463,10 @@ def step_response(sys, T=None, X0=0., input=None, output=None,
     sys = _get_ss_simo(sys, input, output)
     if T is None:
         if isctime(sys):
-            T = _default_response_times(sys.A, 100)
+            T = _default_response_times(sys, 100)
         else:
             # For discrete time, use integers
-            tvec = _default_response_times(sys.A, 100)
+            tvec = _default_response_times(sys, 100)
             T = np.arange(tvec.max() / sys.dt) * sys.dt
 
     U = np.ones_like(T)
@@ -625,10 +636,10 @@ def initial_response(sys, T=None, X0=0., input=0, output=None,
     # The initial vector X0 is created in forced_response(...) if necessary
     if T is None:
         if isctime(sys):
-            T = _default_response_times(sys.A, 1000)
+            T = _default_response_times(sys, 1000)
         else:
             # For discrete time, use integers
-            tvec = _default_response_times(sys.A, 1000)
+            tvec = _default_response_times(sys, 1000)
             T = range(int(np.ceil(max(tvec))))
     U = np.zeros_like(T)
 
@@ -714,10 +725,10 @@ def impulse_response(sys, T=None, X0=0., input=0, output=None,
     # Compute T and U, no checks necessary, they will be checked in lsim
     if T is None:
         if isctime(sys):
-            T = _default_response_times(sys.A, 100)
+            T = _default_response_times(sys, 100)
         else:
             # For discrete time, use integers
-            tvec = _default_response_times(sys.A, 100)
+            tvec = _default_response_times(sys, 100)
             T = range(int(np.ceil(max(tvec))))
 
     U = np.zeros_like(T)
@@ -57,12 +57,11 @@ from numpy import angle, array, empty, finfo, ndarray, ones, \
     polyadd, polymul, polyval, roots, sqrt, zeros, squeeze, exp, pi, \
     where, delete, real, poly, nonzero
 import scipy as sp
-from numpy.polynomial.polynomial import polyfromroots
-from scipy.signal import lti, tf2zpk, zpk2tf, cont2discrete
+from scipy.signal import lti, tf2zpk, zpk2tf, cont2discrete, deconvolve
 from copy import deepcopy
 from warnings import warn
 from itertools import chain
-from .lti import LTI, timebaseEqual, timebase, isdtime
+from .lti import LTI, timebaseEqual, timebase, isdtime, _hash_data
 
 __all__ = ['TransferFunction', 'tf', 'ss2tf', 'tfdata']
 
@@ -204,27 +203,40 @@ class TransferFunction(LTI):
         truncate leading zeros.  For instance, running self._truncatecoeff()
         will reduce self.num = [[[0, 0, 1, 2]]] to [[[1, 2]]].
 
+        The coefficients are stored in contiguous (outputs x inputs x
+        degree) arrays, padded with leading zeros, and the elements of num
+        and den are views into these arrays.  See _coeffs.
         """
-
-        # Beware: this is a shallow copy.  This should be okay.
-        data = [self.num, self.den]
-        for p in range(len(data)):
-            for i in range(self.outputs):
-                for j in range(self.inputs):
-                    # Find the first nontrivial coefficient.
-                    nonzero = None
-                    for k in range(data[p][i][j].size):
-                        if data[p][i][j][k]:
-                            nonzero = k
-                            break
-
-                    if nonzero is None:
-                        # The array is all zeros.
-                        data[p][i][j] = zeros(1)
-                    else:
-                        # Truncate the trivial coefficients.
-                        data[p][i][j] = data[p][i][j][nonzero:]
-        [self.num, self.den] = data
+        num, numorder = _truncate_padded(_pad_polys(self.num))
+        den, denorder = _truncate_padded(_pad_polys(self.den))
+        self.num = _padded_views(num, numorder)
+        self.den = _padded_views(den, denorder)
+        self._padded = (num, den, numorder, denorder,
+                        tuple(chain(chain.from_iterable(self.num),
+                                    chain.from_iterable(self.den))))
+
+    def _coeffs(self):
+        """Numerator and denominator coefficients as padded arrays.
+
+        Returns (num, den, numorder, denorder), where num and den are
+        (outputs x inputs x degree) arrays of coefficients, padded with
+        leading zeros, and numorder and denorder hold the order of each
+        element.  Changes made in place to the elements of self.num and
+        self.den show up in these arrays; if elements were replaced, the
+        arrays are built afresh from self.num and self.den, which are left
+        as they are.
+        """
+        padded = getattr(self, '_padded', None)
+        entries = list(chain(chain.from_iterable(self.num),
+                             chain.from_iterable(self.den)))
+        half = len(entries) // 2
+        if padded is not None and len(entries) == len(padded[4]) and all(
+                a is b and a.base is padded[0 if i < half else 1]
+                for i, (a, b) in enumerate(zip(entries, padded[4]))):
+            return padded[:4]
+        num, numorder = _truncate_padded(_pad_polys(self.num))
+        den, denorder = _truncate_padded(_pad_polys(self.den))
+        return num, den, numorder, denorder
 
     def __str__(self, var=None):
         """String representation of the transfer function."""
@@ -310,12 +322,8 @@ class TransferFunction(LTI):
     def __neg__(self):
         """Negate a transfer function."""
 
-        num = deepcopy(self.num)
-        for i in range(self.outputs):
-            for j in range(self.inputs):
-                num[i][j] *= -1
-
-        return TransferFunction(num, self.den, self.dt)
+        num, den = self._coeffs()[:2]
+        return TransferFunction(-num, den, self.dt)
 
     def __add__(self, other):
         """Add two LTI objects (parallel connection)."""
@@ -344,15 +352,10 @@ class TransferFunction(LTI):
         else:
             raise ValueError("Systems have different sampling times")
 
-        # Preallocate the numerator and denominator of the sum.
-        num = [[[] for j in range(self.inputs)] for i in range(self.outputs)]
-        den = [[[] for j in range(self.inputs)] for i in range(self.outputs)]
-
-        for i in range(self.outputs):
-            for j in range(self.inputs):
-                num[i][j], den[i][j] = _add_siso(self.num[i][j], self.den[i][j],
-                                                 other.num[i][j],
-                                                 other.den[i][j])
+        # Add all the elements at once
+        num1, den1 = self._coeffs()[:2]
+        num2, den2 = other._coeffs()[:2]
+        num, den = _fracadd_padded(num1, den1, num2, den2)[:2]
 
         return TransferFunction(num, den, dt)
 
@@ -393,24 +396,7 @@ class TransferFunction(LTI):
         else:
             raise ValueError("Systems have different sampling times")
 
-        # Preallocate the numerator and denominator of the sum.
-        num = [[[0] for j in range(inputs)] for i in range(outputs)]
-        den = [[[1] for j in range(inputs)] for i in range(outputs)]
-
-        # Temporary storage for the summands needed to find the (i, j)th element of the product.
-        num_summand = [[] for k in range(self.inputs)]
-        den_summand = [[] for k in range(self.inputs)]
-
-        # Multiply & add.
-        for row in range(outputs):
-            for col in range(inputs):
-                for k in range(self.inputs):
-                    num_summand[k] = polymul(self.num[row][k], other.num[k][col])
-                    den_summand[k] = polymul(self.den[row][k], other.den[k][col])
-                    num[row][col], den[row][col] = _add_siso(
-                        num[row][col], den[row][col],
-                        num_summand[k], den_summand[k])
-
+        num, den = _matmul_padded(self._coeffs()[:2], other._coeffs()[:2])
         return TransferFunction(num, den, dt)
 
     def __rmul__(self, other):
@@ -440,25 +426,7 @@ class TransferFunction(LTI):
         else:
             raise ValueError("Systems have different sampling times")
 
-        # Preallocate the numerator and denominator of the sum.
-        num = [[[0] for j in range(inputs)] for i in range(outputs)]
-        den = [[[1] for j in range(inputs)] for i in range(outputs)]
-
-        # Temporary storage for the summands needed to find the
-        # (i, j)th element
-        # of the product.
-        num_summand = [[] for k in range(other.inputs)]
-        den_summand = [[] for k in range(other.inputs)]
-
-        for i in range(outputs):  # Iterate through rows of product.
-            for j in range(inputs):  # Iterate through columns of product.
-                for k in range(other.inputs):  # Multiply & add.
-                    num_summand[k] = polymul(other.num[i][k], self.num[k][j])
-                    den_summand[k] = polymul(other.den[i][k], self.den[k][j])
-                    num[i][j], den[i][j] = _add_siso(
-                        num[i][j], den[i][j],
-                        num_summand[k], den_summand[k])
-
+        num, den = _matmul_padded(other._coeffs()[:2], self._coeffs()[:2])
         return TransferFunction(num, den, dt)
 
     # TODO: Division of MIMO transfer function objects is not written yet.
@@ -598,18 +566,12 @@ class TransferFunction(LTI):
         Returns a matrix of values evaluated at complex variable s.
         """
 
-        # Preallocate the output.
+        # Evaluate all the elements at once
         if getattr(s, '__iter__', False):
-            out = empty((self.outputs, self.inputs, len(s)), dtype=complex)
-        else:
-            out = empty((self.outputs, self.inputs), dtype=complex)
-
-        for i in range(self.outputs):
-            for j in range(self.inputs):
-                out[i][j] = (polyval(self.num[i][j], s) /
-                             polyval(self.den[i][j], s))
-
-        return out
+            s = np.asarray(s)
+        num, den = self._coeffs()[:2]
+        return (_polyval_padded(num, s) /
+                _polyval_padded(den, s)).astype(complex)
 
     # Method for generating the frequency response of the system
     def freqresp(self, omega):
@@ -638,18 +600,25 @@ class TransferFunction(LTI):
         else:
             slist = np.array([1j * w for w in omega])
 
-        # Compute frequency response for each input/output pair
-        for i in range(self.outputs):
-            for j in range(self.inputs):
-                fresp = (polyval(self.num[i][j], slist) /
-                         polyval(self.den[i][j], slist))
-                mag[i, j, :] = abs(fresp)
-                phase[i, j, :] = angle(fresp)
+        # Compute frequency response for all input/output pairs at once
+        fresp = self.horner(slist)
+        mag[:, :, :] = abs(fresp)
+        phase[:, :, :] = angle(fresp)
 
         return mag, phase, omega
 
+    def _fingerprint(self):
+        """Digest of the numerator and denominator coefficients"""
+        return _hash_data(
+            'TransferFunction%r' % ((self.outputs, self.inputs),), self.dt,
+            chain.from_iterable(chain(nrow, drow) for nrow, drow
+                                in zip(self.num, self.den)))
+
     def pole(self):
         """Compute the poles of a transfer function."""
+        return self._cached('pole', self._compute_pole)
+
+    def _compute_pole(self):
         num, den, denorder = self._common_den()
         rts = []
         for d, o in zip(den, denorder):
@@ -663,7 +632,7 @@ class TransferFunction(LTI):
                                       "for SISO systems.")
         else:
             # for now, just give zeros of a SISO tf
-            return roots(self.num[0][0])
+            return self._cached('zero', lambda: roots(self.num[0][0]))
 
     def feedback(self, other=1, sign=-1):
         """Feedback interconnection between two LTI objects."""
@@ -807,6 +776,11 @@ class TransferFunction(LTI):
         >>> num, den, denorder = sys._common_den()
 
         """
+        return self._cached(('common_den', imag_tol),
+                            lambda: self._compute_common_den(imag_tol))
+
+    def _compute_common_den(self, imag_tol):
+        """Uncached computation of _common_den"""
 
         # Machine precision for floats.
         eps = finfo(float).eps
@@ -815,15 +789,10 @@ class TransferFunction(LTI):
         if (imag_tol is None):
             imag_tol = 1e-8     # TODO: figure out the right number to use
 
-        # A list to keep track of cumulative poles found as we scan
-        # self.den[..][..]
-        poles = [[] for j in range(self.inputs)]
-
         # RvP, new implementation 180526, issue #194
 
         # pre-calculate the poles for all num, den
-        # has zeros, poles, gain, list for pole indices not in den,
-        # number of poles known at the time analyzed
+        # has zeros, poles, gain
 
         # do not calculate minreal. Rory's hint .minreal()
         poleset = []
@@ -832,30 +801,37 @@ class TransferFunction(LTI):
             for j in range(self.inputs):
                 if abs(self.num[i][j]).max() <= eps:
                     poleset[-1].append([array([], dtype=float),
-                                        roots(self.den[i][j]), 0.0, [], 0])
+                                        roots(self.den[i][j]), 0.0])
                 else:
                     z, p, k = tf2zpk(self.num[i][j], self.den[i][j])
-                    poleset[-1].append([z, p, k, [], 0])
+                    poleset[-1].append([z, p, k])
 
-        # collect all individual poles
+        # For each input, match the poles of all outputs at once: the
+        # common denominator has each cluster of coincident poles with its
+        # largest multiplicity over the outputs, and each numerator gets
+        # the poles its own denominator is short of as additional zeros.
         epsnm = eps * self.inputs * self.outputs
+        poles = []
+        extra = [[None] * self.inputs for i in range(self.outputs)]
         for j in range(self.inputs):
+            allpoles = np.concatenate(
+                [poleset[i][j][1] for i in range(self.outputs)])
+            rows = np.repeat(np.arange(self.outputs),
+                             [len(poleset[i][j][1])
+                              for i in range(self.outputs)])
+            labels = _root_clusters(allpoles, epsnm)
+            counts = zeros((len(allpoles), self.outputs), dtype=int)
+            np.add.at(counts, (labels, rows), 1)
+
+            # take the poles of each cluster from the output having the
+            # most of them
+            rep = counts.argmax(axis=1)
+            isrep, = nonzero(rows == rep[labels])
+            ranks = _cluster_ranks(labels[isrep])
+            poles.append(allpoles[isrep])
             for i in range(self.outputs):
-                currentpoles = poleset[i][j][1]
-                nothave = ones(currentpoles.shape, dtype=bool)
-                for ip, p in enumerate(poles[j]):
-                    idx, = nonzero(
-                        (abs(currentpoles - p) < epsnm) * nothave)
-                    if len(idx):
-                        nothave[idx[0]] = False
-                    else:
-                        # remember id of pole not in tf
-                        poleset[i][j][3].append(ip)
-                for h, c in zip(nothave, currentpoles):
-                    if h:
-                        poles[j].append(c)
-                # remember how many poles now known
-                poleset[i][j][4] = len(poles[j])
+                extra[i][j] = allpoles[
+                    isrep[ranks >= counts[labels[isrep], i]]]
 
         # figure out maximum number of poles, for sizing the den
         npmax = max([len(p) for p in poles])
@@ -872,29 +848,22 @@ class TransferFunction(LTI):
                     num[i, j, 0] = poleset[i][j][2]
             else:
                 # create the denominator matching this input
-                # polyfromroots gives coeffs in opposite order from what we use
-                # coefficients should be padded on right, ending at np
-                np = len(poles[j])
-                den[j, np::-1] = polyfromroots(poles[j]).real
-                denorder[j] = np
+                # coefficients should be padded on right, ending at npoles
+                npoles = len(poles[j])
+                den[j, :npoles + 1] = poly(poles[j]).real
+                denorder[j] = npoles
 
                 # now create the numerator, also padded on the right
                 for i in range(self.outputs):
-                    # start with the current set of zeros for this output
-                    nwzeros = list(poleset[i][j][0])
-                    # add all poles not found in the original denominator,
-                    # and the ones later added from other denominators
-                    for ip in chain(poleset[i][j][3],
-                                    range(poleset[i][j][4], np)):
-                        nwzeros.append(poles[j][ip])
-
-                    numpoly = poleset[i][j][2] * polyfromroots(nwzeros).real
-                    # print(numpoly, den[j])
-                    # polyfromroots gives coeffs in opposite order => invert
+                    # the zeros of this output, and all poles of the common
+                    # denominator that are not in its own denominator
+                    nwzeros = chain(poleset[i][j][0], extra[i][j])
+
+                    numpoly = poleset[i][j][2] * \
+                        np.atleast_1d(poly(list(nwzeros))).real
                     # numerator polynomial should be padded on left and right
-                    #   ending at np to line up with what td04ad expects...
-                    num[i, j, np + 1 - len(numpoly):np + 1] = numpoly[::-1]
-                    # print(num[i, j])
+                    #   ending at npoles to line up with what td04ad expects...
+                    num[i, j, npoles + 1 - len(numpoly):npoles + 1] = numpoly
 
         if (abs(den.imag) > epsnm).any():
             print("Warning: The denominator has a nontrivial imaginary part: %f"
@@ -1067,16 +1036,366 @@ def _tf_polynomial_to_string(coeffs, var='s'):
     return thestr
 
 
-def _add_siso(num1, den1, num2, den2):
-    """Return num/den = num1/den1 + num2/den2.
-
-    Each numerator and denominator is a list of polynomial coefficients.
+def _pad_polys(polys):
+    """Coefficients of a matrix of polynomials as one array.
 
+    The polynomials, given as a list of lists of coefficient arrays, are
+    stored in an (outputs x inputs x degree) array, aligned on the
+    constant term and padded with leading zeros.
     """
+    width = max(len(p) for row in polys for p in row)
+    dtype = np.result_type(float, *[p for row in polys for p in row])
+    padded = zeros((len(polys), len(polys[0]), width), dtype=dtype)
+    for i, row in enumerate(polys):
+        for j, p in enumerate(row):
+            if len(p):
+                padded[i, j, width - len(p):] = p
+    return padded
 
-    num = polyadd(polymul(num1, den2), polymul(num2, den1))
-    den = polymul(den1, den2)
 
+def _truncate_padded(padded):
+    """Drop the leading columns of zeros from padded coefficients.
+
+    Returns the truncated array, which owns its data, and the order of
+    each polynomial; zero polynomials have order 0.
+    """
+    width = padded.shape[2]
+    nonzero = padded != 0
+    first = np.where(nonzero.any(axis=2), nonzero.argmax(axis=2), width - 1)
+    order = width - 1 - first
+    return padded[:, :, width - order.max() - 1:].copy(), order
+
+
+def _padded_views(padded, order):
+    """Lists of lists of views of the individual polynomials"""
+    width = padded.shape[2]
+    return [[padded[i, j, width - order[i, j] - 1:]
+             for j in range(padded.shape[1])]
+            for i in range(padded.shape[0])]
+
+
+def _polymul_padded(a, b):
+    """Products of padded polynomial arrays, broadcast over all but the
+    last axis"""
+    shape = np.broadcast(a[..., 0], b[..., 0]).shape
+    out = zeros(shape + (a.shape[-1] + b.shape[-1] - 1,),
+                dtype=np.result_type(a, b))
+    for k in range(b.shape[-1]):
+        out[..., k:k + a.shape[-1]] += a * b[..., k:k + 1]
+    return out
+
+
+def _polyadd_padded(a, b):
+    """Sums of padded polynomial arrays, aligned on the constant term"""
+    width = max(a.shape[-1], b.shape[-1])
+    out = zeros(np.broadcast(a[..., 0], b[..., 0]).shape + (width,),
+                dtype=np.result_type(a, b))
+    out[..., width - a.shape[-1]:] += a
+    out[..., width - b.shape[-1]:] += b
+    return out
+
+
+def _polyval_padded(coeffs, s):
+    """Values of padded polynomials at s, with the dimensions of s
+    appended to the leading axes"""
+    s = np.asarray(s)
+    width = coeffs.shape[-1]
+    coeffs = coeffs.reshape(coeffs.shape[:-1] + (1,) * s.ndim + (width,))
+    out = zeros(coeffs.shape[:-s.ndim - 1] + s.shape,
+                dtype=np.result_type(coeffs, s))
+    out += coeffs[..., 0]
+    for k in range(1, width):
+        out = out * s + coeffs[..., k]
+    return out
+
+
+def _root_clusters(r, atol, rtol=0.):
+    """Label the roots in r by clusters of (nearly) coincident roots.
+
+    The roots are sorted on their real parts, split into windows wherever
+    consecutive real parts are further apart than the tolerance, and then
+    sorted on their imaginary parts within each window; runs of
+    consecutive roots closer than atol + rtol * |root| form a cluster.
+    Returns the cluster label of each root, numbered from 0.
+    """
+    r = np.asarray(r)
+    if not len(r):
+        return zeros(0, dtype=int)
+    mag = abs(r)
+
+    def tol(i, j):
+        return atol + rtol * np.maximum(mag[i], mag[j])
+
+    order = np.argsort(r.real, kind='mergesort')
+    window = np.cumsum(np.r_[True, abs(np.diff(r.real[order])) >
+                             tol(order[1:], order[:-1])])
+    sub = np.lexsort((r.imag[order], window))
+    order, window = order[sub], window[sub]
+    new = np.r_[True, (window[1:] != window[:-1]) |
+                (abs(r[order[1:]] - r[order[:-1]]) >
+                 tol(order[1:], order[:-1]))]
+    labels = empty(len(r), dtype=int)
+    labels[order] = np.cumsum(new) - 1
+    return labels
+
+
+def _cluster_ranks(labels):
+    """Rank of each element among the elements with the same label"""
+    order = np.argsort(labels, kind='mergesort')
+    ordered = labels[order]
+    ranks = empty(len(labels), dtype=int)
+    ranks[order] = np.arange(len(labels)) - np.searchsorted(ordered, ordered)
+    return ranks
+
+
+def _match_roots(r1, r2, atol, rtol=0.):
+    """Indices (i1, i2) of the roots shared by r1 and r2, counted with
+    multiplicity; r1[i1] pairs with r2[i2].
+
+    Roots match when they fall in the same cluster of _root_clusters.
+    """
+    labels = _root_clusters(np.r_[r1, r2], atol, rtol)
+    labels1, labels2 = labels[:len(r1)], labels[len(r1):]
+    nclusters = labels.max() + 1 if len(labels) else 0
+    shared = np.minimum(np.bincount(labels1, minlength=nclusters),
+                        np.bincount(labels2, minlength=nclusters))
+    pairs = []
+    for lab in (labels1, labels2):
+        ranks = _cluster_ranks(lab)
+        idx, = nonzero(ranks < shared[lab])
+        pairs.append(idx[np.lexsort((ranks[idx], lab[idx]))])
+    return pairs[0], pairs[1]
+
+
+def _lcd_cofactors(den1, den2, roots1=None, roots2=None, tol=None):
+    """Cofactors q1, q2 of two denominators, such that den1*q2 = den2*q1 is
+    their least common multiple.
+
+    Common factors are found by matching the roots of den1 and den2, which
+    may be given as roots1 and roots2, and are only used if they divide
+    both denominators to within rounding errors; roots that are merely
+    close are not cancelled.  Returns the cofactors and the indices of the
+    roots of den2 that are not shared, or None if the denominators have no
+    factor in common.
+    """
+    if tol is None:
+        tol = sqrt(finfo(float).eps)
+    r1 = roots(den1) if roots1 is None else roots1
+    r2 = roots(den2) if roots2 is None else roots2
+    i1, i2 = _match_roots(r1, r2, tol, tol)
+    if not len(i1):
+        return None
+    common = poly(r1[i1])
+    if np.iscomplexobj(common):
+        # matched roots that are not closed under conjugation
+        return None
+
+    def cofactor(den, rts, keep):
+        # None unless the common factor divides den; the quotient is exact
+        # for simple coefficients, but not accurate for ill-conditioned
+        # denominators, and then the cofactor is built from the remaining
+        # roots instead
+        quotient, remainder = deconvolve(den, common)
+        if abs(remainder).max() > 1000 * finfo(float).eps * abs(den).max():
+            return None
+        fromroots = den[0] * np.atleast_1d(poly(rts[keep])).real
+        if abs(quotient - fromroots).max() <= \
+                1000 * finfo(float).eps * abs(fromroots).max():
+            return quotient
+        return fromroots
+
+    keep1 = np.setdiff1d(np.arange(len(r1)), i1)
+    keep2 = np.setdiff1d(np.arange(len(r2)), i2)
+    q1, q2 = cofactor(den1, r1, keep1), cofactor(den2, r2, keep2)
+    if q1 is None or q2 is None:
+        return None
+    return q1, q2, keep2
+
+
+def _padded_roots(den):
+    """Roots of padded polynomials, padded with nan.
+
+    Returns an array of shape den.shape[:-1] + (den.shape[-1] - 1,).  The
+    roots are the eigenvalues of the companion matrices, as in
+    numpy.roots, found at once for all polynomials of each order.
+    """
+    width = den.shape[-1]
+    out = np.full(den.shape[:-1] + (width - 1,), np.nan, dtype=complex)
+    order = width - 1 - (den != 0).argmax(axis=-1)
+    select = order > 0
+    for n in np.unique(order[select]):
+        idx = nonzero(select & (order == n))
+        coeffs = den[idx][:, width - n - 1:]
+        companion = zeros((len(coeffs), n, n), dtype=coeffs.dtype)
+        companion[:, 0, :] = -coeffs[:, 1:] / coeffs[:, :1]
+        companion[:, np.arange(1, n), np.arange(n - 1)] = 1
+        out[idx + (slice(0, n),)] = np.linalg.eigvals(companion)
+    return out
+
+
+def _may_share_factor(den1, den2, mask, tol):
+    """Whether the padded polynomials den1 and den2 may have a factor in
+    common, for the pairs selected by mask.
+
+    The test is that the Sylvester matrix of the pair, whose determinant
+    is the resultant, is singular relative to tol times its Hadamard
+    bound; it is carried out at once for all pairs of the same orders.
+    """
+    out = zeros(mask.shape, dtype=bool)
+    orders = [d.shape[-1] - 1 - (d != 0).argmax(axis=-1) for d in (den1, den2)]
+    for m, n in set(zip(orders[0][mask], orders[1][mask])):
+        idx = nonzero(mask & (orders[0] == m) & (orders[1] == n))
+        a = den1[idx][:, den1.shape[-1] - m - 1:]
+        b = den2[idx][:, den2.shape[-1] - n - 1:]
+        sylvester = zeros((len(a), m + n, m + n), dtype=a.dtype)
+        for i in range(n):
+            sylvester[:, i, i:i + m + 1] = a
+        for i in range(m):
+            sylvester[:, n + i, i:i + n + 1] = b
+        logdet = np.linalg.slogdet(sylvester)[1]
+        logbound = np.log(np.linalg.norm(sylvester, axis=-1)).sum(axis=-1)
+        out[idx] = logdet <= logbound + np.log(tol)
+    return out
+
+
+def _compress_roots(rts):
+    """Move the nan padding of padded roots to the end, and drop the
+    columns that are nan throughout"""
+    pad = np.isnan(rts)
+    rts = np.take_along_axis(
+        rts, np.argsort(pad, axis=-1, kind='mergesort'), axis=-1)
+    return rts[..., :(~pad).sum(axis=-1).max(initial=0)]
+
+
+def _fracadd_padded(num1, den1, num2, den2, roots1=None, roots2=None):
+    """Sums num1/den1 + num2/den2 of padded fraction arrays.
+
+    Each sum is put on the least common denominator of its summands.
+    Denominators that are equal up to scaling are shared as they are, and
+    zero summands leave the other fraction untouched.  The other pairs are
+    cross multiplied, unless they are found to share a factor, which is
+    tested for all elements at once: by the distance between their roots if
+    these are known, and with _may_share_factor otherwise.  Only those
+    pairs have their common factors removed, by root matching.
+
+    roots1 and roots2 may give the roots of den1 and den2, padded with nan
+    as by _padded_roots.  Returns num, den and the (padded) roots of den;
+    the latter are only known if roots1 and roots2 were given, and are
+    None otherwise.
+    """
+    eps = finfo(float).eps
+    tol = sqrt(eps)
+    shape = np.broadcast(num1[..., 0], den1[..., 0],
+                         num2[..., 0], den2[..., 0]).shape
+    num1, den1, num2, den2 = [
+        a if a.shape[:-1] == shape else np.broadcast_to(
+            a, shape + a.shape[-1:]) for a in (num1, den1, num2, den2)]
+
+    # cross multiplication, where nothing better is found
+    num = _polyadd_padded(_polymul_padded(num1, den2),
+                          _polymul_padded(num2, den1))
+    den = _polymul_padded(den1, den2)
+
+    # denominators equal up to scaling, compared on a common width
+    width = max(den1.shape[-1], den2.shape[-1])
+    lead1 = np.take_along_axis(
+        den1, (den1 != 0).argmax(axis=-1)[..., np.newaxis], axis=-1)
+    lead2 = np.take_along_axis(
+        den2, (den2 != 0).argmax(axis=-1)[..., np.newaxis], axis=-1)
+    scaled1 = _polyadd_padded(den1 / lead1, zeros(width))
+    scaled2 = _polyadd_padded(den2 / lead2, zeros(width))
+    same = (abs(scaled1 - scaled2) <=
+            100 * eps * abs(scaled1).max(axis=-1)[..., np.newaxis]).all(
+                axis=-1)
+    zero1 = ~num1.any(axis=-1)
+    zero2 = ~num2.any(axis=-1)
+    masks = (zero2, zero1 & ~zero2, same & ~zero1 & ~zero2)
+    for mask, n, d in zip(masks, (num1, num2, None), (den1, den2, den1)):
+        if mask.any():
+            if n is None:
+                n = _polyadd_padded(num1[mask],
+                                    num2[mask] * (lead1 / lead2)[mask])
+            else:
+                n = n[mask]
+            num[mask] = _polyadd_padded(n, zeros(num.shape[-1]))
+            den[mask] = _polyadd_padded(d[mask], zeros(den.shape[-1]))
+
+    # pairs that may have common factors
+    cross = ~(zero1 | zero2 | same)
+    cross &= ((den1[..., :-1] != 0).any(axis=-1) &
+              (den2[..., :-1] != 0).any(axis=-1))
+    track = roots1 is not None and roots2 is not None
+    if track:
+        roots1, roots2 = [np.broadcast_to(r, shape + r.shape[-1:])
+                          for r in (roots1, roots2)]
+        rts = np.concatenate([roots1, roots2], axis=-1)
+        for mask, r in zip(masks, (roots1, roots2, roots1)):
+            rts[mask] = np.nan
+            rts[mask, :r.shape[-1]] = r[mask]
+        if cross.any():
+            # roots of den1 close to those of den2
+            r1 = roots1[..., :, np.newaxis]
+            r2 = roots2[..., np.newaxis, :]
+            with np.errstate(invalid='ignore'):
+                cross &= (abs(r1 - r2) <= tol * (
+                    1 + np.maximum(abs(r1), abs(r2)))).any(axis=(-2, -1))
+    elif cross.any():
+        cross &= _may_share_factor(den1, den2, cross, tol)
+
+    # remove the common factors of those pairs
+    for idx in zip(*nonzero(cross)):
+        d1 = np.trim_zeros(den1[idx], 'f')
+        d2 = np.trim_zeros(den2[idx], 'f')
+        if track:
+            r1 = roots1[idx][~np.isnan(roots1[idx])]
+            r2 = roots2[idx][~np.isnan(roots2[idx])]
+        else:
+            r1, r2 = roots(d1), roots(d2)
+        cofactors = _lcd_cofactors(d1, d2, r1, r2, tol)
+        if cofactors is None:
+            continue
+        q1, q2, keep = cofactors
+        n = polyadd(polymul(num1[idx], q2), polymul(num2[idx], q1))
+        d = polymul(d1, q2)
+        num[idx] = 0
+        den[idx] = 0
+        num[idx][num.shape[-1] - len(n):] = n
+        den[idx][den.shape[-1] - len(d):] = d
+        if track:
+            rts[idx] = np.nan
+            rts[idx][:len(r1) + len(keep)] = np.r_[r1, r2[keep]]
+
+    return _truncate_padded(num)[0], _truncate_padded(den)[0], \
+        _compress_roots(rts) if track else None
+
+
+def _matmul_padded(sys1, sys2):
+    """Numerator and denominator of the product of two transfer function
+    matrices, given as padded (num, den) arrays.
+
+    Each element of the product is accumulated from its summands with
+    _fracadd_padded, for all elements at once, so that summands with
+    shared denominators do not inflate the order of the result.  The
+    roots of the denominators of the factors are found once; they give
+    those of the summands and of the accumulated sums."""
+    num1, den1 = sys1
+    num2, den2 = sys2
+    roots1 = _padded_roots(den1)
+    roots2 = _padded_roots(den2)
+    shape = (num1.shape[0], num2.shape[1])
+    num, den, rts = None, None, None
+    for k in range(num1.shape[1]):
+        num_k = _polymul_padded(num1[:, k:k + 1], num2[np.newaxis, k])
+        den_k = _polymul_padded(den1[:, k:k + 1], den2[np.newaxis, k])
+        roots_k = np.concatenate(
+            [np.broadcast_to(roots1[:, k:k + 1], shape + roots1.shape[-1:]),
+             np.broadcast_to(roots2[np.newaxis, k], shape + roots2.shape[-1:])],
+            axis=-1)
+        if num is None:
+            num, den, rts = num_k, den_k, roots_k
+        else:
+            num, den, rts = _fracadd_padded(num, den, num_k, den_k,
+                                            rts, roots_k)
     return num, den
 
 